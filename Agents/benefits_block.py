@@ -1,5 +1,9 @@
 from ..model.schema import BenefitsBlock
 from ..state import AgentState
+from ..utils.llm import bind_llm
+from ..utils.retry import RetryExecutor, RetryError
+from ..utils.prompt_context import compact_prompt, format_value
+from ..utils.incremental import product_fields
 import logging
 
 # Configure logging
@@ -8,11 +12,15 @@ logger = logging.getLogger(__name__)
 
 class BenefitsBlockAgent:
     """Dedicated agent for benefits block"""
+
+    reads = product_fields("benefits", "name")
+    writes = ("benefits_block",)
     
     def __init__(self, llm, max_retries: int = 3):
-        self.structured_llm = llm.with_structured_output(BenefitsBlock)
+        self.structured_llm = bind_llm(llm, BenefitsBlock)
         self.name = "BenefitsBlockAgent"
         self.max_retries = max_retries
+        self.retry = RetryExecutor(self.name, max_retries)
     
     def generate(self, state: AgentState) -> AgentState:
         """Generate benefits block with error handling"""
@@ -24,10 +32,38 @@ class BenefitsBlockAgent:
             }
         
         product = state["product_model"]
+        prompt = self._build_prompt(product)
         
-        prompt = f"""Create a benefits content block for this product.
+        try:
+            benefits_block: BenefitsBlock = self.retry.run(lambda: self.structured_llm.invoke(prompt))
+        except RetryError as e:
+            return self._on_failure(product, e.errors)
+
+        return self._on_success(benefits_block)
 
-            Product Benefits: {product.get('benefits', [])}
+    async def agenerate(self, state: AgentState) -> AgentState:
+        """Async variant of generate — awaits the LLM instead of blocking a thread"""
+        
+        if not state.get("product_model"):
+            errors = [f"[{self.name}] No product model available"]
+            return {
+                "errors":errors
+            }
+        
+        product = state["product_model"]
+        prompt = self._build_prompt(product)
+        
+        try:
+            benefits_block: BenefitsBlock = await self.retry.arun(lambda: self.structured_llm.ainvoke(prompt))
+        except RetryError as e:
+            return self._on_failure(product, e.errors)
+
+        return self._on_success(benefits_block)
+
+    def _build_prompt(self, product: dict) -> str:
+        return compact_prompt(f"""Create a benefits content block for this product.
+
+            Product Benefits: {format_value(product.get('benefits'))}
             Product Name: {product.get('name', '')}
 
             For each benefit, provide:
@@ -35,42 +71,31 @@ class BenefitsBlockAgent:
             2. A detailed description explaining how the product achieves this benefit
 
             Output format: BenefitsBlock with list of BenefitDetail objects.
-        """
-        
-        for attempt in range(self.max_retries):
-            try:
-                logger.info(f"[{self.name}] Attempt {attempt + 1}/{self.max_retries}")
-                
-                benefits_block: BenefitsBlock = self.structured_llm.invoke(prompt)
-                
-                benefits_block = benefits_block.model_dump()
-                logs = [f"[{self.name}] Generated benefits block"]
-                logger.info(f"[{self.name}] Success")
-                
-                return {
-                    "benefits_block":benefits_block,
-                    "logs":logs
-                }
-                
-            except Exception as e:
-                error_msg = [f"[{self.name}] Error on attempt {attempt + 1}: {str(e)}"]
-                logger.error(error_msg)
-                
-                if attempt == self.max_retries - 1:
-                    # Create fallback
-                    benefits_block = {
-                        "block_type": "benefits",
-                        "content": [
-                            {"benefit": b, "description": f"This product helps with {b.lower()}."}
-                            for b in product.get('benefits', ['General skincare'])
-                        ]
-                    }
-                    logs = [f"[{self.name}] Used fallback benefits block"]
+        """)
 
-                    return {
-                        "benefits_block": benefits_block,
-                        "logs": logs,
-                        "errors": error_msg
-                    }
+    def _on_success(self, benefits_block: BenefitsBlock) -> AgentState:
+        benefits_block = benefits_block.model_dump()
+        logs = [f"[{self.name}] Generated benefits block"]
+        logger.info(f"[{self.name}] Success")
         
-        return {"logs": [f"[{self.name}] Unexpected exit"]}
\ No newline at end of file
+        return {
+            "benefits_block":benefits_block,
+            "logs":logs
+        }
+
+    def _on_failure(self, product: dict, error_msg) -> AgentState:
+        # Create fallback
+        benefits_block = {
+            "block_type": "benefits",
+            "content": [
+                {"benefit": b, "description": f"This product helps with {b.lower()}."}
+                for b in product.get('benefits', ['General skincare'])
+            ]
+        }
+        logs = [f"[{self.name}] Used fallback benefits block"]
+
+        return {
+            "benefits_block": benefits_block,
+            "logs": logs,
+            "errors": error_msg
+        }
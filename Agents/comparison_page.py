@@ -1,21 +1,57 @@
 from ..model.schema import ComparisonPage,SkinTypeComparison,ComparisonProduct,ComparisonAnalysis,Recommendation,ComparisonMetadata
 from ..state import AgentState
 from ..logic.deterministic import DeterministicCalculations
+from ..utils.llm import bind_llm
+from ..utils.retry import RetryExecutor, RetryError
+from ..utils.incremental import product_fields
+from ..utils.prompt_context import compact_prompt, format_value
 
-import json
 from datetime import datetime
 
 class ComparisonPageAgent:
     """Agent to build comparison page"""
+
+    reads = product_fields("name", "price", "concentration", "key_ingredients", "benefits", "skin_types") + ("product_b_model",)
+    writes = ("comparison_page",)
+
+    FALLBACK_RECOMMENDATION = "Both products offer effective formulations. Choose based on your skin type and budget."
     
     def __init__(self, llm,max_retries:int = 3):
-        self.structured_llm = llm.with_structured_output(ComparisonPage)
+        self.text_llm = bind_llm(llm)
         self.name = "ComparisonPageAgent"
         self.max_retries = max_retries
+        self.retry = RetryExecutor(self.name, max_retries)
     
     def build(self, state: AgentState) -> AgentState:
         """Build comparison page using structured output"""
         
+        analysis = self._analyze(state)
+        recommendation_prompt = self._build_recommendation_prompt(analysis)
+        
+        # LLM CALL FOR RECOMMENDATION TEXT 
+        try:
+            recommendation_text = self.retry.run(lambda: self.text_llm.invoke(recommendation_prompt))
+        except RetryError as e:
+            return self._assemble(state, analysis, self.FALLBACK_RECOMMENDATION, e.errors)
+        
+        return self._assemble(state, analysis, recommendation_text)
+
+    async def abuild(self, state: AgentState) -> AgentState:
+        """Async variant of build — awaits the LLM instead of blocking a thread"""
+        
+        analysis = self._analyze(state)
+        recommendation_prompt = self._build_recommendation_prompt(analysis)
+        
+        try:
+            recommendation_text = await self.retry.arun(lambda: self.text_llm.ainvoke(recommendation_prompt))
+        except RetryError as e:
+            return self._assemble(state, analysis, self.FALLBACK_RECOMMENDATION, e.errors)
+        
+        return self._assemble(state, analysis, recommendation_text)
+
+    def _analyze(self, state: AgentState) -> ComparisonAnalysis:
+        """Deterministic side-by-side analysis of Product A and Product B"""
+        
         product_a = state["product_model"]
         product_b = state["product_b_model"]
 
@@ -32,8 +68,8 @@ class ComparisonPageAgent:
         
         # 2. Ingredients Comparison (Deterministic)
         ingredients_comparison = DeterministicCalculations.calculate_ingredients_comparison(
-            product_a.get('ingredients', []),
-            product_b.get('ingredients', [])
+            product_a.get('key_ingredients', []),
+            product_b.get('key_ingredients', [])
         )
         
         # 3. Benefits Comparison (Deterministic)
@@ -47,24 +83,27 @@ class ComparisonPageAgent:
             product_a=product_a.get('skin_types', []),
             product_b=product_b.get('skin_types', [])
         )
-        
-        # LLM CALL FOR RECOMMENDATION TEXT 
-        recommendation_prompt = f"""Given this comparison data, provide a brief recommendation summary.
 
-            Price Winner: {price_comparison.winner}
-            Common Ingredients: {ingredients_comparison.common}
-            Common Benefits: {benefits_comparison.common}
+        return ComparisonAnalysis(
+            price=price_comparison,
+            ingredients=ingredients_comparison,
+            benefits=benefits_comparison,
+            skin_types=skin_types_comparison
+        )
+
+    def _build_recommendation_prompt(self, analysis: ComparisonAnalysis) -> str:
+        return compact_prompt(f"""Given this comparison data, provide a brief recommendation summary.
+
+            Price Winner: {analysis.price.winner}
+            Common Ingredients: {format_value(analysis.ingredients.common)}
+            Common Benefits: {format_value(analysis.benefits.common)}
 
             Write a 2-3 sentence analysis helping users choose. Be objective and balanced.
-        """
-        
-        for attempt in range(self.max_retries):
-            try:
-                recommendation_text = self.llm.invoke(recommendation_prompt).content
-                break
-            except Exception as e:
-                if attempt == self.max_retries - 1:
-                    recommendation_text = "Both products offer effective formulations. Choose based on your skin type and budget."
+        """)
+
+    def _assemble(self, state: AgentState, analysis: ComparisonAnalysis, recommendation_text: str, errors=None) -> AgentState:
+        product_a = state["product_model"]
+        product_b = state["product_b_model"]
         
         # Build final comparison page
         comparison_page = ComparisonPage(
@@ -74,7 +113,7 @@ class ComparisonPageAgent:
                     name=product_a.get('name', ''),
                     price=product_a["price"]["amount"] if isinstance(product_a["price"], dict) else product_a["price"],
                     concentration=product_a.get('concentration', ''),
-                    ingredients=product_a.get('ingredients', []),
+                    ingredients=product_a.get('key_ingredients', []),
                     benefits=product_a.get('benefits', []),
                     skin_types=product_a.get('skin_types', [])
                 ),
@@ -82,19 +121,14 @@ class ComparisonPageAgent:
                     name=product_b.get('name', ''),
                     price=product_b["price"]["amount"] if isinstance(product_b["price"], dict) else product_b["price"],
                     concentration=product_b.get('concentration', ''),
-                    ingredients=product_b.get('ingredients', []),
+                    ingredients=product_b.get('key_ingredients', []),
                     benefits=product_b.get('benefits', []),
                     skin_types=product_b.get('skin_types', [])
                 )
             ],
-            comparison=ComparisonAnalysis(
-                price=price_comparison,
-                ingredients=ingredients_comparison,
-                benefits=benefits_comparison,
-                skin_types=skin_types_comparison
-            ),
+            comparison=analysis,
             recommendation=Recommendation(
-                budget_conscious=price_comparison.winner,
+                budget_conscious=analysis.price.winner,
                 analysis=recommendation_text
             ),
             metadata=ComparisonMetadata(
@@ -104,7 +138,11 @@ class ComparisonPageAgent:
         
         comparison_page = comparison_page.model_dump()
         
-        return {
+        result = {
             "comparison_page":comparison_page,
             "logs":[f"[{self.name}] Built comparison page"]
-        }
\ No newline at end of file
+        }
+        if errors:
+            result["logs"].append(f"[{self.name}] Used fallback recommendation")
+            result["errors"] = errors
+        return result
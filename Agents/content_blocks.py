@@ -0,0 +1,126 @@
+from ..model.schema import ContentBlocks
+from ..state import AgentState
+from ..utils.llm import bind_llm
+from ..utils.retry import RetryExecutor, RetryError
+from ..utils.prompt_context import compact_prompt, product_context
+from ..utils.incremental import product_fields
+from ..utils.repair import raw_arguments, validate_with_fixes
+from typing_extensions import Any, Dict, List
+
+import asyncio
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ContentBlocksAgent:
+    """Fused agent: one structured call produces all five content blocks"""
+
+    BLOCKS = tuple(ContentBlocks.model_fields)
+    PRODUCT_FIELDS = ("name", "concentration", "skin_types", "key_ingredients", "benefits", "how_to_use", "side_effects")
+    reads = product_fields(*PRODUCT_FIELDS)
+    writes = BLOCKS
+
+    def __init__(self, llm, block_agents: Dict[str, Any], max_retries: int = 3):
+        # include_raw keeps the tool-call arguments when the bundle as a whole
+        # fails validation, so the valid blocks can still be used
+        self.structured_llm = bind_llm(llm, ContentBlocks, include_raw=True)
+        self.block_agents = block_agents
+        self.name = "ContentBlocksAgent"
+        self.max_retries = max_retries
+        self.retry = RetryExecutor(self.name, max_retries)
+
+    def generate(self, state: AgentState) -> AgentState:
+        """Generate all content blocks in one call; failed blocks fall back to their own agents"""
+
+        if not state.get("product_model"):
+            return self._skip()
+
+        prompt = self._build_prompt(state["product_model"])
+
+        try:
+            result = self.retry.run(lambda: self.structured_llm.invoke(prompt))
+        except RetryError as e:
+            blocks, errors = {}, e.errors
+        else:
+            blocks, errors = self._split(result)
+
+        fallbacks = [self.block_agents[key].generate(state) for key in self.BLOCKS if key not in blocks]
+        return self._merge(blocks, errors, fallbacks)
+
+    async def agenerate(self, state: AgentState) -> AgentState:
+        """Async variant of generate — the per-block fallbacks run concurrently"""
+
+        if not state.get("product_model"):
+            return self._skip()
+
+        prompt = self._build_prompt(state["product_model"])
+
+        try:
+            result = await self.retry.arun(lambda: self.structured_llm.ainvoke(prompt))
+        except RetryError as e:
+            blocks, errors = {}, e.errors
+        else:
+            blocks, errors = self._split(result)
+
+        fallbacks = await asyncio.gather(*(
+            self.block_agents[key].agenerate(state) for key in self.BLOCKS if key not in blocks
+        ))
+        return self._merge(blocks, errors, fallbacks)
+
+    def _skip(self) -> AgentState:
+        return {
+            "errors": [f"[{self.name}] No product model available"]
+        }
+
+    def _build_prompt(self, product: dict) -> str:
+        return compact_prompt(f"""Create all five content blocks for this product page in one response.
+
+            Product:
+            {product_context(product, self.PRODUCT_FIELDS)}
+
+            Provide:
+            1. benefits_block — each benefit with a description of how the product achieves it
+            2. usage_block — main instructions, a 4-5 step breakdown and the usage frequency
+            3. ingredients_block — the primary active ingredient, supporting ingredients and each ingredient's purpose
+            4. safety_block — warnings from the product data, suitable skin types and 3-4 standard precautions
+            5. overview_block — a catchy tagline (15-20 words) and a compelling description (50-100 words)
+
+            Output format: ContentBlocks.
+        """)
+
+    def _split(self, result: Dict[str, Any]):
+        """Validate each block on its own; returns (valid blocks, errors for the rest)"""
+        if result.get("parsed") is not None:
+            return result["parsed"].model_dump(), []
+
+        args = result.get("args") or raw_arguments(result.get("raw")) or {}
+        blocks, errors = {}, []
+        for key in self.BLOCKS:
+            block_schema = ContentBlocks.model_fields[key].annotation
+            block = args.get(key)
+            if not isinstance(block, dict):
+                errors.append(f"[{self.name}] Missing {key}")
+                continue
+            parsed, error = validate_with_fixes(block_schema, block)
+            if parsed is None:
+                errors.append(f"[{self.name}] Invalid {key}: {error.error_count()} validation error(s)")
+            else:
+                blocks[key] = parsed.model_dump()
+        return blocks, errors
+
+    def _merge(self, blocks: Dict[str, Any], errors: List[str], fallbacks: List[AgentState]) -> AgentState:
+        logs = [f"[{self.name}] Generated {len(blocks)}/{len(self.BLOCKS)} blocks in one call"]
+        update: AgentState = {**blocks}
+        for fallback in fallbacks:
+            logs.extend(fallback.get("logs", []))
+            errors = errors + fallback.get("errors", [])
+            update.update({k: v for k, v in fallback.items() if k in self.BLOCKS})
+        if blocks and not fallbacks:
+            logger.info(f"[{self.name}] Success")
+
+        update["logs"] = logs
+        if errors:
+            update["errors"] = errors
+        return update
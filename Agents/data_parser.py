@@ -1,8 +1,10 @@
 from ..state import AgentState
 from ..model.schema import Product
-import json
+from ..utils.llm import bind_llm
+from ..utils.retry import RetryExecutor, RetryError
+from ..utils.prompt_context import compact_json, compact_prompt
+from ..logic.product_parser import ProductParser
 import logging
-from pydantic import ValidationError
 from typing_extensions import Dict,Any
 
 # Configure logging
@@ -11,86 +13,104 @@ logger = logging.getLogger(__name__)
 
 class DataParserAgent:
     """Agent with structured output using Pydantic"""
+
+    reads = ("raw_product_data",)
+    writes = ("product_model",)
     
     def __init__(self, llm, max_retries: int = 3):
         # Create structured LLM that outputs ProductModel
-        self.structured_llm = llm.with_structured_output(Product)
+        self.structured_llm = bind_llm(llm, Product)
         self.name = "DataParserAgent"
         self.max_retries = max_retries
+        self.retry = RetryExecutor(self.name, max_retries)
     
     def parse(self, state: AgentState) -> AgentState:
-        """Parse raw product data using structured output"""
+        """Parse raw product data — rule-based first, structured LLM output only when that is unsure"""
+        
+        product_model, issues = ProductParser.parse(state['raw_product_data'])
+        if not issues:
+            return self._on_fast_path(product_model)
+        
+        logger.info(f"[{self.name}] Falling back to LLM parse: {'; '.join(issues)}")
+        prompt = self._build_prompt(state['raw_product_data'])
+
+        try:
+            product_model: Product = self.retry.run(lambda: self.structured_llm.invoke(prompt))
+        except RetryError as e:
+            return self._on_failure(state, e.errors, f"after {len(e.errors)} attempts")
+
+        return self._on_success(product_model)
+
+    async def aparse(self, state: AgentState) -> AgentState:
+        """Async variant of parse — awaits the LLM instead of blocking a thread"""
         
-        # Create prompt
-        prompt = f"""
+        product_model, issues = ProductParser.parse(state['raw_product_data'])
+        if not issues:
+            return self._on_fast_path(product_model)
+        
+        logger.info(f"[{self.name}] Falling back to LLM parse: {'; '.join(issues)}")
+        prompt = self._build_prompt(state['raw_product_data'])
+
+        try:
+            product_model: Product = await self.retry.arun(lambda: self.structured_llm.ainvoke(prompt))
+        except RetryError as e:
+            return self._on_failure(state, e.errors, f"after {len(e.errors)} attempts")
+
+        return self._on_success(product_model)
+
+    def _build_prompt(self, raw_product_data: Dict[str, Any]) -> str:
+        return compact_prompt(f"""
             Parse this product data into a structured format:
 
             Product Data:
-            {json.dumps(state['raw_product_data'], indent=2)}
+            {compact_json(raw_product_data)}
 
             Instructions:
             1. Normalize all fields
             2. Parse comma-separated values into lists
             3. Extract price value with it's currency symbol
-        """
-        for attempt in range(self.max_retries):
-            try:
-                logger.info(f"[{self.name}] Attempt {attempt + 1}/{self.max_retries}")
-                # Invoke structured LLM - returns ProductModel instance
-                product_model: Product = self.structured_llm.invoke(prompt)
-
-                # Convert to dict for state
-                product_model = product_model.model_dump()
-                logger.info(f"[{self.name}] Success")
-
-                return {
-                    "product_model":product_model,
-                    "logs":[f"[{self.name}] Parsed product data successfully"]
-                }
-            
-            except ValidationError as e:
-                error_msg = [f"[{self.name}] Validation error on attempt {attempt + 1}: {str(e)}"]
-                logger.error(error_msg)
-                
-                if attempt == self.max_retries - 1:
-                    # Final attempt failed - use fallback
-                    state["product_model"] = self._create_fallback_model(state['raw_product_data'])
-                    logs = [f"[{self.name}] Used fallback model after {self.max_retries} attempts"]
-
-                    return {
-                        "product_model":product_model,
-                        "errors":error_msg,
-                        "logs":logs
-                    }
-                    
-            except Exception as e:
-                error_msg = [f"[{self.name}] Unexpected error on attempt {attempt + 1}: {str(e)}"]
-                logger.error(error_msg)
-                
-                if attempt == self.max_retries - 1:
-                    product_model = self._create_fallback_model(state['raw_product_data'])
-                    logs = [f"[{self.name}] Used fallback model after error"]
-
-                    return {
-                        "product_model":product_model,
-                        "logs":logs,
-                        "errors":error_msg
-                    }
-        
-        return {"logs": [f"[{self.name}] Unexpected exit"]}
+        """)
+
+    def _on_success(self, product_model: Product) -> AgentState:
+        # Convert to dict for state
+        product_model = product_model.model_dump()
+        logger.info(f"[{self.name}] Success")
+
+        return {
+            "product_model":product_model,
+            "logs":[f"[{self.name}] Parsed product data successfully"]
+        }
+
+    def _on_fast_path(self, product_model: Dict[str, Any]) -> AgentState:
+        logger.info(f"[{self.name}] Success (rule-based)")
+
+        return {
+            "product_model":product_model,
+            "logs":[f"[{self.name}] Parsed product data deterministically"]
+        }
+
+    def _on_failure(self, state: AgentState, error_msg, reason: str) -> AgentState:
+        # Final attempt failed - use fallback
+        product_model = self._create_fallback_model(state['raw_product_data'])
+        logs = [f"[{self.name}] Used fallback model {reason}"]
+
+        return {
+            "product_model":product_model,
+            "logs":logs,
+            "errors":error_msg
+        }
     
     def _create_fallback_model(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a basic fallback model from raw data"""
-        return {
-            "id": "prod_001",
-            "name": raw_data.get("name", "Unknown Product"),
-            "category": "skincare",
-            "concentration": raw_data.get("concentration", "Unknown"),
-            "skin_types": raw_data.get("skin_type", "All").split(", "),
-            "ingredients": raw_data.get("key_ingredients", "").split(", "),
-            "benefits": raw_data.get("benefits", "").split(", "),
-            "usage_instructions": raw_data.get("how_to_use", "See packaging"),
-            "warnings": raw_data.get("side_effects", "Consult dermatologist"),
-            "price": int(''.join(filter(str.isdigit, str(raw_data.get("price", "0"))))),
-            "currency": "INR"
-        }
\ No newline at end of file
+        product_model, _ = ProductParser.parse(raw_data)
+        defaults = {
+            "name": "Unknown Product",
+            "concentration": "Unknown",
+            "skin_types": ["All"],
+            "how_to_use": "See packaging",
+            "side_effects": "Consult dermatologist",
+        }
+        for field, default in defaults.items():
+            if not product_model.get(field):
+                product_model[field] = default
+        return product_model
@@ -1,7 +1,14 @@
 from ..state import AgentState
-from ..model.schema import FAQPage
+from ..model.schema import FAQPage, FAQSection
+from ..config import config
+from ..utils.llm import bind_llm
+from ..utils.retry import RetryExecutor, RetryError
+from ..utils.prompt_context import compact_json, compact_prompt, product_context
+from typing_extensions import Dict, List, Tuple
 
-import json
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import logging
@@ -10,105 +17,209 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# One FAQ shard: (category, question texts)
+Shard = Tuple[str, List[str]]
+# Answers for a shard: (question -> answer, errors, follow-up calls made)
+ShardResult = Tuple[Dict[str, str], List[str], int]
+
 class FAQPageAgent:
-    """Agent to build FAQ page"""
-    
+    """Agent to build FAQ page — answers each category shard concurrently, assembles the page in code"""
+
+    PRODUCT_FIELDS = ("name", "concentration", "skin_types", "key_ingredients", "benefits", "how_to_use", "side_effects", "price")
+    reads = ("product_model", "questions")
+    writes = ("faq_page",)
+
     def __init__(self, llm, max_retries: int = 3):
-        self.structured_llm = llm.with_structured_output(FAQPage)
+        self.structured_llm = bind_llm(llm, FAQSection)
         self.name = "FAQPageAgent"
         self.max_retries = max_retries
-    
+        self.retry = RetryExecutor(self.name, max_retries)
+
     def build(self, state: AgentState) -> AgentState:
-        """Build FAQ page using structured output"""
-        
-        product = state["product_model"]
-        questions_data = state["questions"]
-        
-        total_questions = questions_data["total_count"]
+        """Build FAQ page: one small structured call per category shard"""
+
+        product = state.get("product_model")
+        questions_data = state.get("questions")
+
+        if not product or not questions_data:
+            return self._skip()
+
         questions_list = questions_data["questions"]
+        shards = self._shard(questions_list)
+
+        # Each worker runs in a copy of this node's context so its calls stay attributed to the node
+        contexts = [contextvars.copy_context() for _ in shards]
+        with ThreadPoolExecutor(max_workers=max(1, min(len(shards), config.FAQ_MAX_PARALLEL_SHARDS))) as pool:
+            results = list(pool.map(lambda ctx, shard: ctx.run(self._answer_shard, product, shard), contexts, shards))
+
+        return self._assemble(product, questions_list, results)
+
+    async def abuild(self, state: AgentState) -> AgentState:
+        """Async variant of build — shards are answered concurrently on the event loop"""
+
+        product = state.get("product_model")
+        questions_data = state.get("questions")
 
         if not product or not questions_data:
-            return {
-                "errors": [f"[{self.name}] Missing product_model or questions"],
-                "logs": [f"[{self.name}] Skipped — insufficient data"]
-            }
+            return self._skip()
 
-        system_prompt = f"""You are the FAQ Page Builder Agent.
+        questions_list = questions_data["questions"]
+        shards = self._shard(questions_list)
 
-            Your ONLY job is to create a structured FAQ page using **ALL {total_questions} questions** provided below.
+        semaphore = asyncio.Semaphore(max(1, config.FAQ_MAX_PARALLEL_SHARDS))
 
-            RULES — FOLLOW EXACTLY:
-            - Use **every single question** from the list. Do not skip, summarize, filter, or discard any.
-            - You MUST output exactly {total_questions} Q&A pairs — no more, no less.
-            - Group questions by their original 'category' field.
-            - Write clear, accurate, friendly answers based ONLY on the provided product data.
-            - Do not add new questions.
-            - Do not remove or rephrase existing questions.
-            - Set metadata.question_count = {total_questions}
-            - Set metadata.generated_at = current ISO timestamp (you can leave placeholder, it will be overwritten)
+        async def answer(shard: Shard):
+            async with semaphore:
+                return await self._aanswer_shard(product, shard)
 
-            This is a strict data preservation step. Losing questions = pipeline failure.
-        """
+        results = await asyncio.gather(*(answer(shard) for shard in shards))
+
+        return self._assemble(product, questions_list, results)
 
-        human_prompt = f"""Product Data:
-            {json.dumps(product, indent=2)}
+    def _skip(self) -> AgentState:
+        return {
+            "errors": [f"[{self.name}] Missing product_model or questions"],
+            "logs": [f"[{self.name}] Skipped — insufficient data"]
+        }
 
-            All {total_questions} Questions (use every one):
-            {json.dumps(questions_list, indent=2)}
+    def _shard(self, questions_list: list) -> List[Shard]:
+        """Group questions by category (first-seen order), splitting large categories"""
+        by_category: Dict[str, List[str]] = {}
+        for q in questions_list:
+            by_category.setdefault(q.get("category", "General"), []).append(q["question"])
 
-            Now build the FAQ page with exactly {total_questions} Q&A pairs.
+        size = max(1, config.FAQ_SHARD_SIZE)
+        return [
+            (category, questions[i:i + size])
+            for category, questions in by_category.items()
+            for i in range(0, len(questions), size)
+        ]
+
+    def _answer_shard(self, product: dict, shard: Shard) -> ShardResult:
         """
+        Answer one shard; returns (question -> answer, errors, follow-up calls).
 
-        messages = [
+        Questions the model dropped or answered blank are re-asked on their
+        own in up to FAQ_GAP_FILL_ROUNDS follow-up calls; answers already
+        received are kept.
+        """
+        category, pending = shard
+        answers, errors, follow_ups = {}, [], 0
+        for gap_round in range(1 + config.FAQ_GAP_FILL_ROUNDS):
+            messages = self._build_messages(product, category, pending, gap_fill=gap_round > 0)
+            try:
+                section: FAQSection = self.retry.run(lambda: self.structured_llm.invoke(messages))
+            except RetryError as e:
+                errors.extend(e.errors)
+                break
+            follow_ups += gap_round > 0
+            answers.update(self._match(section, pending))
+            pending = [q for q in pending if q not in answers]
+            if not pending:
+                break
+        return answers, errors, follow_ups
+
+    async def _aanswer_shard(self, product: dict, shard: Shard) -> ShardResult:
+        category, pending = shard
+        answers, errors, follow_ups = {}, [], 0
+        for gap_round in range(1 + config.FAQ_GAP_FILL_ROUNDS):
+            messages = self._build_messages(product, category, pending, gap_fill=gap_round > 0)
+            try:
+                section: FAQSection = await self.retry.arun(lambda: self.structured_llm.ainvoke(messages))
+            except RetryError as e:
+                errors.extend(e.errors)
+                break
+            follow_ups += gap_round > 0
+            answers.update(self._match(section, pending))
+            pending = [q for q in pending if q not in answers]
+            if not pending:
+                break
+        return answers, errors, follow_ups
+
+    def _build_messages(self, product: dict, category: str, questions: List[str], gap_fill: bool = False) -> list:
+        context = "These questions were missing or left blank in an earlier answer. " if gap_fill else ""
+        system_prompt = compact_prompt(f"""You are the FAQ Page Builder Agent.
+
+            {context}Answer every one of the {len(questions)} "{category}" questions below.
+
+            RULES — FOLLOW EXACTLY:
+            - Return one Q&A pair per question, in the same order.
+            - Copy each question verbatim into `q`. Do not rephrase, merge, skip or add questions.
+            - Write clear, accurate, friendly answers based ONLY on the provided product data.
+            - Set category = "{category}".
+        """)
+
+        human_prompt = compact_prompt(f"""Product Data:
+            {product_context(product, self.PRODUCT_FIELDS)}
+
+            Questions:
+            {compact_json(questions)}
+        """)
+
+        return [
             ("system", system_prompt),
             ("human", human_prompt)
         ]
 
-        for attempt in range(self.max_retries):
-            try:
-                logger.info(f"[{self.name}] Attempt {attempt + 1}/{self.max_retries}")
-                
-                # Returns FAQPage instance
-                faq: FAQPage = self.structured_llm.invoke(messages)
-                
-                # Set timestamp
-                faq.metadata.generated_at = datetime.utcnow().isoformat()
-                
-                faq_page= faq.model_dump()
-                
-                return {
-                    "faq_page":faq_page,
-                    "logs":[f"[{self.name}] Built FAQ page with {faq.metadata.question_count} questions"]
-                }
-            
-            except Exception as e:
-                logger.error(f"[{self.name}] Attempt {attempt} failed: {e}")
-                if attempt == self.max_retries:
-                    # Deterministic fallback — still tries to preserve questions
-                    fallback_sections = {}
-                    for q in questions_list:
-                        cat = q.get("category", "General")
-                        fallback_sections.setdefault(cat, []).append({
-                            "q": q["question"],
-                            "a": f"Refer to product details for {product.get('name', 'this item')}."
-                        })
-                    
-                    fallback_faq = {
-                        "template": "faq_v1",
-                        "product_name": product.get('name'),
-                        "sections": [{"category": c, "questions": qs} for c, qs in fallback_sections.items()],
-                        "metadata": {
-                            "generated_at": datetime.utcnow().isoformat(),
-                            "question_count": total_questions
-                        }
-                    }
-                    
-                    return {
-                        "faq_page": fallback_faq,
-                        "logs": [f"[{self.name}] Used fallback — still preserved all {total_questions} questions"],
-                        "errors": [f"FAQ generation failed after {self.max_retries} attempts"]
-                    }
-
-        return {"logs": [f"[{self.name}] Unexpected exit"]}
-        
-        
\ No newline at end of file
+    @staticmethod
+    def _normalize(question: str) -> str:
+        return " ".join(question.lower().split()).rstrip("?.! ")
+
+    def _match(self, section: FAQSection, questions: List[str]) -> Dict[str, str]:
+        """Pair returned answers with the asked questions; unanswered questions are left out"""
+        returned = [(qa.q, qa.a.strip()) for qa in section.questions]
+        by_text = {self._normalize(q): a for q, a in returned if a}
+
+        answers = {}
+        for index, question in enumerate(questions):
+            answer = by_text.get(self._normalize(question))
+            # Same count back means the order held even if the wording drifted
+            if answer is None and len(returned) == len(questions) and returned[index][1]:
+                answer = returned[index][1]
+            if answer:
+                answers[question] = answer
+        return answers
+
+    def _assemble(self, product: dict, questions_list: list, results: list) -> AgentState:
+        """Build FAQPage sections and question_count in code from the shard answers"""
+        answers: Dict[str, str] = {}
+        errors: List[str] = []
+        follow_ups = 0
+        for shard_answers, shard_errors, shard_follow_ups in results:
+            answers.update(shard_answers)
+            errors.extend(shard_errors)
+            follow_ups += shard_follow_ups
+
+        placeholder = f"Refer to product details for {product.get('name', 'this item')}."
+        sections: Dict[str, list] = {}
+        missing = 0
+        for q in questions_list:
+            answer = answers.get(q["question"])
+            if answer is None:
+                missing += 1
+                answer = placeholder
+            sections.setdefault(q.get("category", "General"), []).append({"q": q["question"], "a": answer})
+
+        faq = FAQPage(
+            product_name=product.get("name", ""),
+            sections=[{"category": c, "questions": qs} for c, qs in sections.items()],
+            metadata={
+                "generated_at": datetime.utcnow().isoformat(),
+                "question_count": len(questions_list)
+            }
+        )
+
+        logs = [f"[{self.name}] Built FAQ page with {len(questions_list)} questions in {len(results)} shard(s)"]
+        if follow_ups:
+            logs.append(f"[{self.name}] Gap-filled missing answers with {follow_ups} follow-up call(s)")
+        if missing:
+            logs.append(f"[{self.name}] Used fallback answers for {missing} question(s)")
+            errors.append(f"[{self.name}] {missing} of {len(questions_list)} question(s) left unanswered")
+
+        update = {
+            "faq_page": faq.model_dump(),
+            "logs": logs
+        }
+        if errors:
+            update["errors"] = errors
+        return update
@@ -1,5 +1,11 @@
 from ..model.schema import IngredientsBlock
 from ..state import AgentState
+from ..utils.llm import bind_llm
+from ..utils.retry import RetryExecutor, RetryError
+from ..utils.prompt_context import compact_prompt, format_value
+from ..utils.incremental import product_fields
+from ..utils.ingredient_memo import IngredientMemo, get_ingredient_memo
+from typing_extensions import Dict, List, Optional
 import logging
 
 # Configure logging
@@ -7,12 +13,17 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class IngredientsBlockAgent:
-    """Dedicated agent for ingredients block"""
+    """Dedicated agent for ingredients block — purposes of known ingredients come from the shared memo"""
+
+    reads = product_fields("concentration", "key_ingredients")
+    writes = ("ingredients_block",)
     
-    def __init__(self, llm, max_retries: int = 3):
-        self.structured_llm = llm.with_structured_output(IngredientsBlock)
+    def __init__(self, llm, max_retries: int = 3, memo: Optional[IngredientMemo] = None):
+        self.structured_llm = bind_llm(llm, IngredientsBlock)
         self.name = "IngredientsBlockAgent"
         self.max_retries = max_retries
+        self.retry = RetryExecutor(self.name, max_retries)
+        self.memo = memo if memo is not None else get_ingredient_memo()
     
     def generate(self, state: AgentState) -> AgentState:
         """Generate ingredients block with error handling"""
@@ -24,56 +35,129 @@ class IngredientsBlockAgent:
             }
         
         product = state["product_model"]
+        known, unknown = self._lookup(product)
+        if not unknown:
+            return self._on_success(product, known, described=0)
+
+        prompt = self._build_prompt(product, unknown)
+        
+        try:
+            ingredients_block: IngredientsBlock = self.retry.run(lambda: self.structured_llm.invoke(prompt))
+        except RetryError as e:
+            return self._on_failure(product, e.errors, known)
+
+        matched, guessed = self._match(ingredients_block, unknown)
+        # Only name matches reach the shared memo; a positional guess is used for this product alone
+        self._remember(unknown, matched)
+        return self._on_success(product, {**known, **guessed, **matched}, described=len(matched) + len(guessed))
+
+    async def agenerate(self, state: AgentState) -> AgentState:
+        """Async variant of generate — awaits the LLM instead of blocking a thread"""
+        
+        if not state.get("product_model"):
+            errors = [f"[{self.name}] No product model available"]
+            return {
+                "errors":errors
+            }
+        
+        product = state["product_model"]
+        known, unknown = self._lookup(product)
+        if not unknown:
+            return self._on_success(product, known, described=0)
+
+        prompt = self._build_prompt(product, unknown)
         
-        prompt = f"""Create an ingredients block for this product.
+        try:
+            ingredients_block: IngredientsBlock = await self.retry.arun(lambda: self.structured_llm.ainvoke(prompt))
+        except RetryError as e:
+            return self._on_failure(product, e.errors, known)
+
+        matched, guessed = self._match(ingredients_block, unknown)
+        # Only name matches reach the shared memo; a positional guess is used for this product alone
+        self._remember(unknown, matched)
+        return self._on_success(product, {**known, **guessed, **matched}, described=len(matched) + len(guessed))
+
+    def _build_prompt(self, product: dict, ingredients: List[str]) -> str:
+        return compact_prompt(f"""Create an ingredients block for this product.
 
             Primary Ingredient: {product.get('concentration', '')}
-            All Ingredients: {product.get('ingredients', [])}
+            All Ingredients: {format_value(product.get('key_ingredients'))}
 
             Provide:
             1. Primary active ingredient
             2. Supporting ingredients (list)
-            3. Details for each ingredient (name and purpose)
+            3. Details (name and purpose) for these ingredients only: {format_value(ingredients)}
 
             Output format: IngredientsBlock.
+        """)
+
+    def _lookup(self, product: dict):
+        """(memo key -> purpose from the memo, the product's ingredient names the LLM must describe)"""
+        names = self._ingredients(product)
+        if self.memo is None:
+            return {}, names
+        return self.memo.lookup(names)
+
+    @staticmethod
+    def _ingredients(product: dict) -> List[str]:
+        """The product's own ingredient names in product order, one per memo key (synonyms folded together)"""
+        names = {}
+        for name in product.get("key_ingredients") or []:
+            names.setdefault(IngredientMemo.key(name), name)
+        return list(names.values())
+
+    def _match(self, ingredients_block: IngredientsBlock, ingredients: List[str]):
         """
+        Purposes the LLM gave for the requested ingredients, by memo key:
+        (matched by normalized name, guessed by position for names that drifted)
+        """
+        by_key = {IngredientMemo.key(detail.name): detail.purpose.strip() for detail in ingredients_block.details}
+        matched = {IngredientMemo.key(name): by_key.get(IngredientMemo.key(name)) for name in ingredients}
+        guessed = {}
+        # Same count back probably means the order held even if the names drifted
+        if len(ingredients_block.details) == len(ingredients):
+            guessed = {key: detail.purpose.strip()
+                       for (key, purpose), detail in zip(matched.items(), ingredients_block.details) if not purpose}
+        return ({key: purpose for key, purpose in matched.items() if purpose},
+                {key: purpose for key, purpose in guessed.items() if purpose})
+
+    def _remember(self, ingredients: List[str], purposes: Dict[str, str]) -> None:
+        if self.memo is not None:
+            self.memo.put_many({name: purposes[IngredientMemo.key(name)]
+                                for name in ingredients if IngredientMemo.key(name) in purposes})
+
+    def _assemble(self, product: dict, purposes: Dict[str, str]) -> dict:
+        """Ingredients block built in code: the primary is the ingredient named in the concentration"""
+        ingredients = self._ingredients(product)
+        concentration = product.get("concentration", "").lower()
+        primary = next((name for name in ingredients
+                        if name.lower() in concentration or IngredientMemo.canonical(name).lower() in concentration),
+                       ingredients[0] if ingredients else product.get("concentration") or "Active ingredient")
+        return IngredientsBlock(
+            primary=primary,
+            supporting=[name for name in ingredients if name != primary],
+            details=[{"name": name, "purpose": purposes.get(IngredientMemo.key(name), "Skin care benefit")}
+                     for name in ingredients],
+        ).model_dump()
+
+    def _on_success(self, product: dict, purposes: Dict[str, str], described: int) -> AgentState:
+        ingredients_block = self._assemble(product, purposes)
+        remembered = len(purposes) - described
+        logs = [f"[{self.name}] Generated ingredients block "
+                f"({remembered} from memo, {described} newly described)"]
+        logger.info(f"[{self.name}] Success")
         
-        for attempt in range(self.max_retries):
-            try:
-                logger.info(f"[{self.name}] Attempt {attempt + 1}/{self.max_retries}")
-                
-                ingredients_block: IngredientsBlock = self.structured_llm.invoke(prompt)
-                
-                ingredients_block = ingredients_block.model_dump()
-                logs = [f"[{self.name}] Generated ingredients block"]
-                logger.info(f"[{self.name}] Success")
-                
-                return {
-                    "ingredients_block":ingredients_block,
-                    "logs":logs
-                }
-                
-            except Exception as e:
-                error_msg = [f"[{self.name}] Error on attempt {attempt + 1}: {str(e)}"]
-                logger.error(error_msg)
-                
-                if attempt == self.max_retries - 1:
-                    ingredients = product.get('ingredients', [])
-                    ingredients_block = {
-                        "block_type": "ingredients",
-                        "primary": product.get('concentration', 'Active ingredient'),
-                        "supporting": ingredients[1:] if len(ingredients) > 1 else [],
-                        "details": [
-                            {"name": ing, "purpose": "Skin care benefit"}
-                            for ing in ingredients
-                        ]
-                    }
-                    logs = [f"[{self.name}] Used fallback ingredients block"]
-
-                    return {
-                        "ingredients_block":ingredients_block,
-                        "logs":logs,
-                        "errors":error_msg
-                    }
-        
-        return {"logs": [f"[{self.name}] Unexpected exit"]}
\ No newline at end of file
+        return {
+            "ingredients_block":ingredients_block,
+            "logs":logs
+        }
+
+    def _on_failure(self, product: dict, error_msg, known: Dict[str, str]) -> AgentState:
+        ingredients_block = self._assemble(product, known)
+        logs = [f"[{self.name}] Used fallback ingredients block"]
+
+        return {
+            "ingredients_block":ingredients_block,
+            "logs":logs,
+            "errors":error_msg
+        }
@@ -1,8 +1,11 @@
 from ..model.schema import OverviewBlock
 from ..state import AgentState
+from ..utils.llm import bind_llm
+from ..utils.retry import RetryExecutor, RetryError
+from ..utils.prompt_context import compact_prompt, product_context
+from ..utils.incremental import product_fields
 
 import logging
-import json
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -10,11 +13,16 @@ logger = logging.getLogger(__name__)
 
 class OverviewBlockAgent:
     """Dedicated agent for overview block"""
+
+    PRODUCT_FIELDS = ("name", "concentration", "skin_types", "key_ingredients", "benefits")
+    reads = product_fields(*PRODUCT_FIELDS)
+    writes = ("overview_block",)
     
     def __init__(self, llm, max_retries: int = 3):
-        self.structured_llm = llm.with_structured_output(OverviewBlock)
+        self.structured_llm = bind_llm(llm, OverviewBlock)
         self.name = "OverviewBlockAgent"
         self.max_retries = max_retries
+        self.retry = RetryExecutor(self.name, max_retries)
     
     def generate(self, state: AgentState) -> AgentState:
         """Generate overview block with error handling"""
@@ -26,49 +34,67 @@ class OverviewBlockAgent:
             }
         
         product = state["product_model"]
+        prompt = self._build_prompt(product)
+        
+        try:
+            overview_block: OverviewBlock = self.retry.run(lambda: self.structured_llm.invoke(prompt))
+        except RetryError as e:
+            return self._on_failure(product, e.errors)
+
+        return self._on_success(overview_block)
+
+    async def agenerate(self, state: AgentState) -> AgentState:
+        """Async variant of generate — awaits the LLM instead of blocking a thread"""
+        
+        if not state.get("product_model"):
+            errors = [f"[{self.name}] No product model available"]
+            return {
+                "errors":errors
+            }
+        
+        product = state["product_model"]
+        prompt = self._build_prompt(product)
         
-        prompt = f"""Create an overview block for this product.
+        try:
+            overview_block: OverviewBlock = await self.retry.arun(lambda: self.structured_llm.ainvoke(prompt))
+        except RetryError as e:
+            return self._on_failure(product, e.errors)
 
-            Product: {json.dumps(product, indent=2)}
+        return self._on_success(overview_block)
+
+    def _build_prompt(self, product: dict) -> str:
+        return compact_prompt(f"""Create an overview block for this product.
+
+            Product:
+            {product_context(product, self.PRODUCT_FIELDS)}
 
             Provide:
             1. A catchy tagline (15-20 words)
             2. A compelling description (50-100 words)
 
             Output format: OverviewBlock.
-        """
+        """)
+
+    def _on_success(self, overview_block: OverviewBlock) -> AgentState:
+        overview_block = overview_block.model_dump()
+        logs = [f"[{self.name}] Generated overview block"]
+        logger.info(f"[{self.name}] Success")
         
-        for attempt in range(self.max_retries):
-            try:
-                logger.info(f"[{self.name}] Attempt {attempt + 1}/{self.max_retries}")
-                
-                overview_block: OverviewBlock = self.structured_llm.invoke(prompt)
-                
-                overview_block = overview_block.model_dump()
-                logs = [f"[{self.name}] Generated overview block"]
-                logger.info(f"[{self.name}] Success")
-                
-                return {
-                    "overview_block":overview_block,
-                    "logs":logs
-                }
-                
-            except Exception as e:
-                error_msg = [f"[{self.name}] Error on attempt {attempt + 1}: {str(e)}"]
-                logger.error(error_msg)
+        return {
+            "overview_block":overview_block,
+            "logs":logs
+        }
 
-                if attempt == self.max_retries - 1:
-                    overview_block = {
-                        "block_type": "overview",
-                        "tagline": f"{product.get('concentration', '')} for {', '.join(product.get('benefits', ['skincare']))}",
-                        "description": f"Experience {product.get('name', 'this product')} formulated for {', '.join(product.get('skin_types', ['all skin types']))}."
-                    }
-                    logs = [f"[{self.name}] Used fallback ingredients block"]
+    def _on_failure(self, product: dict, error_msg) -> AgentState:
+        overview_block = {
+            "block_type": "overview",
+            "tagline": f"{product.get('concentration', '')} for {', '.join(product.get('benefits', ['skincare']))}",
+            "description": f"Experience {product.get('name', 'this product')} formulated for {', '.join(product.get('skin_types', ['all skin types']))}."
+        }
+        logs = [f"[{self.name}] Used fallback ingredients block"]
 
-                    return {
-                        "overview_block":overview_block,
-                        "logs":logs,
-                        "errors":error_msg
-                    }
-        
-        return {"logs": [f"[{self.name}] Unexpected exit"]}
\ No newline at end of file
+        return {
+            "overview_block":overview_block,
+            "logs":logs,
+            "errors":error_msg
+        }
@@ -1,7 +1,10 @@
-from ..model.schema import ProductPage
+from ..model.schema import ProductPage,ProductHero,ProductOverview,ProductPageMetadata,PriceInfo
 from ..state import AgentState
+from ..utils.llm import bind_llm
+from ..utils.retry import RetryExecutor, RetryError
+from ..utils.prompt_context import compact_prompt, format_value
+from pydantic import ValidationError
 from typing_extensions import Dict,Any
-import json
 from datetime import datetime
 import logging
 
@@ -11,80 +14,137 @@ logger = logging.getLogger(__name__)
 
 class ProductPageAgent:
     """Agent to build product page"""
+
+    reads = ("product_model", "benefits_block", "usage_block", "ingredients_block", "safety_block", "overview_block")
+    writes = ("product_page",)
     
     def __init__(self, llm, max_retries: int = 3):
-        self.structured_llm = llm.with_structured_output(ProductPage)
+        # The page is assembled in code; the LLM only writes a missing tagline
+        self.text_llm = bind_llm(llm)
         self.name = "ProductPageAgent"
         self.max_retries = max_retries
+        self.retry = RetryExecutor(self.name, max_retries)
     
     def build(self, state: AgentState) -> AgentState:
-        """Build product page using structured output"""
+        """Assemble the product page from product_model and the generated blocks"""
         
         product = state["product_model"]
 
         if not product:
-            return {
-                "errors": [f"[{self.name}] Missing product_model"],
-                "logs": [f"[{self.name}] Skipped — no product data"]
-            }
+            return self._skip()
+        
+        blocks = self._collect_blocks(state)
+        tagline = blocks["overview"].get("tagline")
+        if tagline:
+            return self._assemble(product, blocks, tagline)
+
+        prompt = self._build_tagline_prompt(product)
+        try:
+            tagline = self.retry.run(lambda: self.text_llm.invoke(prompt))
+        except RetryError as e:
+            return self._assemble(product, blocks, self._fallback_tagline(product), e.errors)
+
+        return self._assemble(product, blocks, tagline)
+
+    async def abuild(self, state: AgentState) -> AgentState:
+        """Async variant of build — awaits the tagline call instead of blocking a thread"""
+        
+        product = state["product_model"]
+
+        if not product:
+            return self._skip()
         
+        blocks = self._collect_blocks(state)
+        tagline = blocks["overview"].get("tagline")
+        if tagline:
+            return self._assemble(product, blocks, tagline)
+
+        prompt = self._build_tagline_prompt(product)
+        try:
+            tagline = await self.retry.arun(lambda: self.text_llm.ainvoke(prompt))
+        except RetryError as e:
+            return self._assemble(product, blocks, self._fallback_tagline(product), e.errors)
+
+        return self._assemble(product, blocks, tagline)
+
+    def _skip(self) -> AgentState:
+        return {
+            "errors": [f"[{self.name}] Missing product_model"],
+            "logs": [f"[{self.name}] Skipped — no product data"]
+        }
+
+    def _collect_blocks(self, state: AgentState) -> Dict[str, Any]:
         # Collect all granular blocks safely
-        blocks = {
+        return {
             "benefits": state.get("benefits_block", {}),
             "usage": state.get("usage_block", {}),
             "ingredients": state.get("ingredients_block", {}),
             "safety": state.get("safety_block", {}),
             "overview": state.get("overview_block", {})
         }
-        
-        prompt = f"""Create a complete product page using the product data and content blocks.
-
-            Product:
-            {json.dumps(product, indent=2)}
-
-            Content Blocks:
-            {json.dumps(blocks, indent=2)}
-
-            Instructions:
-            1. Create Product Model with product name, compelling tagline, and formatted price
-            2. Build overview from product data
-            3. Use benefits from benefits_block
-            4. Use ingredients from ingredients_block
-            5. Use usage from usage_block
-            6. Use safety from safety_block
-            7. Set generated_at to current ISO timestamp
-
-            Compose a professional, complete product page.
-        """
-        for attempt in range(1, self.max_retries + 1):
-            try:
-
-                logger.info(f"[{self.name}] Building product page — attempt {attempt}")
-                # Returns ProductPage instance
-                product_page: ProductPage = self.structured_llm.invoke(prompt)
-                
-                # Set timestamp
-                product_page.metadata.generated_at = datetime.utcnow().isoformat()
-                
-                product_page = product_page.model_dump()
-                
-                return {
-                    "product_page":product_page,
-                    "logs":[f"[{self.name}] Built product page"]
-                }
-            
-            except Exception as e:
-                logger.error(f"[{self.name}] Attempt {attempt} failed: {e}")
-                
-                if attempt == self.max_retries:
-                    fallback_page = self._create_fallback_product_page(product, blocks)
-                    return {
-                        "product_page": fallback_page,
-                        "logs": [f"[{self.name}] Used deterministic fallback product page"],
-                        "errors": [f"Product page generation failed after {self.max_retries} attempts"]
-                    }
-
-        return {"logs": [f"[{self.name}] Unexpected exit"]}
+
+    def _build_tagline_prompt(self, product: dict) -> str:
+        return compact_prompt(f"""Write a catchy tagline (15-20 words) for this product.
+
+            Product: {product.get('name', '')}
+            Concentration: {product.get('concentration', '')}
+            Benefits: {format_value(product.get('benefits'))}
+
+            Reply with the tagline only.
+        """)
+
+    def _fallback_tagline(self, product: dict) -> str:
+        return f"Advanced {product.get('concentration', '')} Formula"
+
+    def _assemble(self, product: dict, blocks: dict, tagline: str, errors=None) -> AgentState:
+        """Compose ProductPage in code — blocks are used as generated, never re-emitted by the LLM"""
+        logs = [f"[{self.name}] Built product page"]
+        errors = list(errors or [])
+        if errors:
+            logs.append(f"[{self.name}] Used fallback tagline")
+
+        try:
+            product_page = ProductPage(
+                hero=ProductHero(
+                    product_name=product.get("name", ""),
+                    tagline=tagline.strip().strip('"'),
+                    price=self._price_info(product["price"])
+                ),
+                overview=ProductOverview(
+                    description=blocks["overview"].get("description")
+                        or f"High-performance skincare solution designed for {', '.join(product.get('skin_types', ['all skin types']))}.",
+                    skin_types=product.get("skin_types", []),
+                    category="skincare"
+                ),
+                benefits=blocks["benefits"].get("content", []),
+                ingredients=blocks["ingredients"],
+                usage=blocks["usage"],
+                safety=blocks["safety"],
+                metadata=ProductPageMetadata(
+                    generated_at=datetime.utcnow().isoformat()
+                )
+            )
+        except ValidationError as e:
+            # A block arrived malformed — keep the page, flag the problem
+            errors.append(f"[{self.name}] Invalid content blocks: {e.error_count()} validation error(s)")
+            return {
+                "product_page": self._create_fallback_product_page(product, blocks),
+                "logs": [f"[{self.name}] Used deterministic fallback product page"],
+                "errors": errors
+            }
+
+        update = {
+            "product_page": product_page.model_dump(),
+            "logs": logs
+        }
+        if errors:
+            update["errors"] = errors
+        return update
+
+    def _price_info(self, price) -> PriceInfo:
+        if isinstance(price, dict):
+            return PriceInfo.model_validate(price)
+        return PriceInfo(amount=price, currency="INR", display=f"₹{int(price):,}")
 
     def _create_fallback_product_page(self, product: dict, blocks: dict) -> Dict[str, Any]:
         """100% deterministic fallback — always returns valid page"""
@@ -94,7 +154,7 @@ class ProductPageAgent:
             "template": "product_page_v1",
             "hero": {
                 "product_name": product.get("name", "Premium Skincare Product"),
-                "tagline": f"Advanced {product.get('concentration', '')} Formula",
+                "tagline": self._fallback_tagline(product),
                 "price": {
                     "amount": price_amount,
                     "currency": "INR",
@@ -1,7 +1,11 @@
 from ..model.schema import Product
 from ..state import AgentState
-from typing_extensions import Dict,Any
-import json
+from ..utils.llm import bind_llm
+from ..utils.retry import RetryExecutor, RetryError
+from ..utils.prompt_context import compact_prompt, product_context
+from ..utils.incremental import product_fields
+from ..logic.competitor_index import CompetitorIndex
+from typing_extensions import Dict,Any,Optional
 import logging
 
 # Configure logging
@@ -9,12 +13,22 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ProductBGeneratorAgent:
-    """Agent to generate fictional competitor"""
+    """Agent to pick the nearest catalog competitor — or generate a fictional one when there is none"""
+
+    # A competitor is chosen by formulation, so a price change keeps Product B
+    PRODUCT_FIELDS = ("name", "concentration", "skin_types", "key_ingredients", "benefits", "how_to_use", "side_effects")
+    reads = product_fields(*PRODUCT_FIELDS)
+    writes = ("product_b_model",)
     
-    def __init__(self, llm, max_retries: int = 3):
-        self.structured_llm = llm.with_structured_output(Product)
+    def __init__(self, llm, max_retries: int = 3, competitors: Optional[CompetitorIndex] = None):
+        self.structured_llm = bind_llm(llm, Product)
         self.name = "ProductBGeneratorAgent"
         self.max_retries = max_retries
+        self.retry = RetryExecutor(self.name, max_retries)
+        self.competitors = competitors
+        if competitors is not None:
+            # The catalog match also weighs the price band
+            self.reads = self.reads + product_fields("price")
     
     def generate(self, state: AgentState) -> AgentState:
         """Generate Product B using structured output"""
@@ -22,16 +36,78 @@ class ProductBGeneratorAgent:
         product_a = state["product_model"]
 
         if not product_a:
-            return {
-                "errors": [f"[{self.name}] Missing product_model"],
-                "logs": [f"[{self.name}] Skipped — no input product"]
-            }
+            return self._skip()
+
+        competitor = self._from_catalog(product_a)
+        if competitor is not None:
+            return competitor
+        
+        prompt = self._build_prompt(product_a)
+
+        try:
+            product_b: Product = self.retry.run(lambda: self.structured_llm.invoke(prompt))
+        except RetryError as e:
+            return self._on_failure(product_a, len(e.errors))
+
+        return self._on_success(product_b)
+
+    async def agenerate(self, state: AgentState) -> AgentState:
+        """Async variant of generate — awaits the LLM instead of blocking a thread"""
+        
+        product_a = state["product_model"]
+
+        if not product_a:
+            return self._skip()
+
+        competitor = self._from_catalog(product_a)
+        if competitor is not None:
+            return competitor
         
-        prompt = f"""
+        prompt = self._build_prompt(product_a)
+
+        try:
+            product_b: Product = await self.retry.arun(lambda: self.structured_llm.ainvoke(prompt))
+        except RetryError as e:
+            return self._on_failure(product_a, len(e.errors))
+
+        return self._on_success(product_b)
+
+    def _skip(self) -> AgentState:
+        return {
+            "errors": [f"[{self.name}] Missing product_model"],
+            "logs": [f"[{self.name}] Skipped — no input product"]
+        }
+
+    def external_inputs(self, state: AgentState) -> Optional[Dict[str, Any]]:
+        """
+        The catalog competitor Product A would get now, so --previous reuses
+        Product B only while that entry is unchanged (the lookup makes no LLM call)
+        """
+        if self.competitors is None or not state.get("product_model"):
+            return None
+        match = self.competitors.nearest(state["product_model"])
+        return match[0] if match is not None else None
+
+    def _from_catalog(self, product_a: Dict[str, Any]) -> Optional[AgentState]:
+        if self.competitors is None:
+            return None
+        match = self.competitors.nearest(product_a)
+        if match is None:
+            return None
+
+        product_b, score = match
+        logger.info(f"[{self.name}] Catalog competitor: {product_b['name']} (score {score})")
+        return {
+            "product_b_model": product_b,
+            "logs": [f"[{self.name}] Selected catalog competitor: {product_b['name']} (score {score})"]
+        }
+
+    def _build_prompt(self, product_a: Dict[str, Any]) -> str:
+        return compact_prompt(f"""
             Create a FICTIONAL competing product (Product B) based on Product A:
 
             Product A:
-            {json.dumps(product_a, indent=2)}
+            {product_context(product_a, self.PRODUCT_FIELDS)}
 
             Requirements for Product B:
             - Different name (make it sound like a competing brand)
@@ -43,45 +119,35 @@ class ProductBGeneratorAgent:
             - Generate unique product ID (e.g., prod_002)
 
             Make it realistic but clearly different from Product A.
-        """
-        for attempt in range(1, self.max_retries + 1):
-            try:
-                logger.info(f"[{self.name}] Generating Product B — attempt {attempt}")
-                # Returns ProductModel instance
-                product_b: Product = self.structured_llm.invoke(prompt)
-                
-                product_b_model = product_b.model_dump()
-                
-                return {
-                    "product_b_model":product_b_model,
-                    "logs":[f"[{self.name}] Generated fictional Product B: {product_b.name}"]
-                }
-            except Exception as e:
-                logger.error(f"[{self.name}] Attempt {attempt} failed: {e}")
-                
-                if attempt == self.max_retries:
-                    fallback = self._create_fallback_product_b(product_a)
-                    return {
-                        "product_b_model": fallback,
-                        "logs": [f"[{self.name}] Used fallback Product B: {fallback['name']}"],
-                        "errors": [f"Product B generation failed after {self.max_retries} attempts"]
-                    }
-
-        return {"logs": [f"[{self.name}] Unexpected exit"]}
+        """)
+
+    def _on_success(self, product_b: Product) -> AgentState:
+        product_b_model = product_b.model_dump()
+        
+        return {
+            "product_b_model":product_b_model,
+            "logs":[f"[{self.name}] Generated fictional Product B: {product_b.name}"]
+        }
+
+    def _on_failure(self, product_a: Dict[str, Any], attempts: int) -> AgentState:
+        fallback = self._create_fallback_product_b(product_a)
+        return {
+            "product_b_model": fallback,
+            "logs": [f"[{self.name}] Used fallback Product B: {fallback['name']}"],
+            "errors": [f"Product B generation failed after {attempts} attempts"]
+        }
 
     def _create_fallback_product_b(self, product_a: Dict[str, Any]) -> Dict[str, Any]:
         """Deterministic fallback — always works"""
         base_price = product_a["price"]["amount"] if isinstance(product_a["price"], dict) else product_a["price"]
         
         return {
-            "id": "prod_002",
             "name": "RadiantGlow Vitamin C Serum",
-            "category": "skincare",
             "concentration": "15% Vitamin C + Ferulic",
             "skin_types": ["Normal", "Combination", "Dry"],
-            "ingredients": ["L-Ascorbic Acid", "Ferulic Acid", "Hyaluronic Acid", "Vitamin E"],
+            "key_ingredients": ["L-Ascorbic Acid", "Ferulic Acid", "Hyaluronic Acid", "Vitamin E"],
             "benefits": ["Brightens skin", "Reduces dark spots", "Boosts collagen", "Hydrates deeply"],
-            "usage_instructions": "Apply 3-4 drops in the morning after cleansing",
-            "warnings": "Patch test recommended. Avoid eye area.",
+            "how_to_use": "Apply 3-4 drops in the morning after cleansing",
+            "side_effects": "Patch test recommended. Avoid eye area.",
             "price": {"amount": int(base_price * 1.35), "currency": "INR", "display": ""},
         }
\ No newline at end of file
@@ -1,7 +1,12 @@
 from ..state import AgentState
 from ..model.schema import QuestionsOutput
-from typing_extensions import Dict,Any
-import json
+from ..utils.llm import bind_llm
+from ..utils.retry import RetryExecutor, RetryError
+from ..utils.prompt_context import compact_prompt, product_context
+from ..utils.incremental import fingerprint, product_fields
+from ..utils.question_library import QuestionLibrary, get_question_library
+from ..config import config
+from typing_extensions import Dict,Any,List,Optional
 import logging
 
 # Configure logging
@@ -9,12 +14,19 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class QuestionGeneratorAgent:
-    """Agent with structured question output"""
+    """Agent with structured question output — seeded categories are served from the question library"""
+
+    # Questions don't depend on price — price answers are written by the FAQ builder
+    PRODUCT_FIELDS = ("name", "concentration", "skin_types", "key_ingredients", "benefits", "how_to_use", "side_effects")
+    reads = product_fields(*PRODUCT_FIELDS)
+    writes = ("questions",)
     
-    def __init__(self, llm, max_retries: int = 3):
-        self.structured_llm = llm.with_structured_output(QuestionsOutput)
+    def __init__(self, llm, max_retries: int = 3, library: Optional[QuestionLibrary] = None):
+        self.structured_llm = bind_llm(llm, QuestionsOutput)
         self.name = "QuestionGeneratorAgent"
         self.max_retries = max_retries
+        self.retry = RetryExecutor(self.name, max_retries)
+        self.library = library if library is not None else get_question_library()
     
     def generate(self, state: AgentState) -> AgentState:
         """Generate questions using structured output"""
@@ -22,12 +34,74 @@ class QuestionGeneratorAgent:
         product = state["product_model"]
 
         if not product:
-            return {
-                "errors": [f"[{self.name}] Missing product_model"],
-                "logs": [f"[{self.name}] Skipped — no product data"]
-            }
+            return self._skip()
+
+        key = fingerprint(state, self.reads)
+        used = self.library.used(key) if self.library is not None else None
+        if used is not None:
+            return self._on_used(used)
+
+        if self._from_library(product):
+            new_ingredients = self.library.new_ingredients(product)
+            extras = []
+            if new_ingredients and config.QUESTION_EXTRAS:
+                prompt = self._build_extras_prompt(product, new_ingredients)
+                try:
+                    extras = self.retry.run(lambda: self.structured_llm.invoke(prompt)).questions
+                except RetryError as e:
+                    logger.warning(f"[{self.name}] No product-specific extras after {len(e.errors)} attempts")
+            return self._on_library(product, key, extras)
+        
+        prompt = self._build_prompt(product)
+
+        try:
+            questions_output: QuestionsOutput = self.retry.run(lambda: self.structured_llm.invoke(prompt))
+        except RetryError as e:
+            return self._on_failure(product, len(e.errors))
+
+        return self._on_success(product, key, questions_output)
+
+    async def agenerate(self, state: AgentState) -> AgentState:
+        """Async variant of generate — awaits the LLM instead of blocking a thread"""
+        
+        product = state["product_model"]
+
+        if not product:
+            return self._skip()
+
+        key = fingerprint(state, self.reads)
+        used = self.library.used(key) if self.library is not None else None
+        if used is not None:
+            return self._on_used(used)
+
+        if self._from_library(product):
+            new_ingredients = self.library.new_ingredients(product)
+            extras = []
+            if new_ingredients and config.QUESTION_EXTRAS:
+                prompt = self._build_extras_prompt(product, new_ingredients)
+                try:
+                    extras = (await self.retry.arun(lambda: self.structured_llm.ainvoke(prompt))).questions
+                except RetryError as e:
+                    logger.warning(f"[{self.name}] No product-specific extras after {len(e.errors)} attempts")
+            return self._on_library(product, key, extras)
         
-        prompt = f"""
+        prompt = self._build_prompt(product)
+
+        try:
+            questions_output: QuestionsOutput = await self.retry.arun(lambda: self.structured_llm.ainvoke(prompt))
+        except RetryError as e:
+            return self._on_failure(product, len(e.errors))
+
+        return self._on_success(product, key, questions_output)
+
+    def _skip(self) -> AgentState:
+        return {
+            "errors": [f"[{self.name}] Missing product_model"],
+            "logs": [f"[{self.name}] Skipped — no product data"]
+        }
+
+    def _build_prompt(self, product: dict) -> str:
+        return compact_prompt(f"""
             Generate AT LEAST 15 user questions about this product across certain categories.
             Example:
             - Category1 (3+ questions)
@@ -38,37 +112,62 @@ class QuestionGeneratorAgent:
             - Category6 (2+ questions)
 
             Product:
-            {json.dumps(product, indent=2)}
+            {product_context(product, self.PRODUCT_FIELDS)}
 
             Generate realistic questions a customer would ask. Base ALL questions on the actual product data.
-        """
+        """)
+
+    def _from_library(self, product: dict) -> bool:
+        return self.library is not None and self.library.is_seeded(QuestionLibrary.category(product))
+
+    def _build_extras_prompt(self, product: dict, ingredients: List[str]) -> str:
+        return compact_prompt(f"""
+            Generate {config.QUESTION_EXTRAS} customer questions specific to this product,
+            about what sets it apart — in particular: {", ".join(ingredients)}.
+            Skip generic questions about usage, safety or price; those are already covered.
+
+            Product:
+            {product_context(product, self.PRODUCT_FIELDS)}
+        """)
 
-        for attempt in range(1, self.max_retries + 1):
-            try:
-                logger.info(f"[{self.name}] Generating questions — attempt {attempt}")
+    def _on_success(self, product: dict, key: str, questions_output: QuestionsOutput) -> AgentState:
+        questions = questions_output.model_dump()
+        if self.library is not None:
+            self.library.add(product, questions["questions"], seed=True)
+            self.library.keep(key, questions["questions"])
         
-                # Returns QuestionsOutput instance
-                questions_output: QuestionsOutput = self.structured_llm.invoke(prompt)
-                
-                questions = questions_output.model_dump()
-                
-                return {
-                    "questions":questions,
-                    "logs":[f"[{self.name}] Generated {questions_output.total_count} questions"]
-                }
-            
-            except Exception as e:
-                logger.error(f"[{self.name}] Attempt {attempt} failed: {e}")
-                
-                if attempt == self.max_retries:
-                    fallback = self._create_fallback_questions(product)
-                    return {
-                        "questions": fallback,
-                        "logs": [f"[{self.name}] Used fallback — 15 questions generated"],
-                        "errors": [f"Question generation failed after {self.max_retries} attempts"]
-                    }
-
-        return {"logs": [f"[{self.name}] Unexpected exit"]}
+        return {
+            "questions":questions,
+            "logs":[f"[{self.name}] Generated {questions_output.total_count} questions"]
+        }
+
+    def _on_used(self, questions: List[Dict[str, str]]) -> AgentState:
+        return {
+            "questions": {"questions": questions, "total_count": len(questions)},
+            "logs": [f"[{self.name}] {len(questions)} questions kept from this product's previous run"]
+        }
+
+    def _on_library(self, product: dict, key: str, extras: list) -> AgentState:
+        extras = [question.model_dump() for question in extras[:config.QUESTION_EXTRAS]]
+        if extras:
+            # Remember the extras and the new ingredients they were asked for
+            self.library.add(product, extras, seed=False)
+        questions = self.library.questions(product) + extras
+        self.library.keep(key, questions)
+
+        return {
+            "questions": {"questions": questions, "total_count": len(questions)},
+            "logs": [f"[{self.name}] {len(questions) - len(extras)} questions from the "
+                     f"{QuestionLibrary.category(product)} library, {len(extras)} product-specific"]
+        }
+
+    def _on_failure(self, product: dict, attempts: int) -> AgentState:
+        fallback = self._create_fallback_questions(product)
+        return {
+            "questions": fallback,
+            "logs": [f"[{self.name}] Used fallback — 15 questions generated"],
+            "errors": [f"Question generation failed after {attempts} attempts"]
+        }
 
     def _create_fallback_questions(self, product: dict) -> Dict[str, Any]:
         """Deterministic fallback — always returns 15 solid questions"""
@@ -1,5 +1,9 @@
 from ..model.schema import SafetyBlock
 from ..state import AgentState
+from ..utils.llm import bind_llm
+from ..utils.retry import RetryExecutor, RetryError
+from ..utils.prompt_context import compact_prompt, format_value
+from ..utils.incremental import product_fields
 import logging
 
 # Configure logging
@@ -8,11 +12,15 @@ logger = logging.getLogger(__name__)
 
 class SafetyBlockAgent:
     """Dedicated agent for safety block"""
+
+    reads = product_fields("side_effects", "skin_types")
+    writes = ("safety_block",)
     
     def __init__(self, llm, max_retries: int = 3):
-        self.structured_llm = llm.with_structured_output(SafetyBlock)
+        self.structured_llm = bind_llm(llm, SafetyBlock)
         self.name = "SafetyBlockAgent"
         self.max_retries = max_retries
+        self.retry = RetryExecutor(self.name, max_retries)
     
     def generate(self, state: AgentState) -> AgentState:
         """Generate safety block with error handling"""
@@ -24,11 +32,39 @@ class SafetyBlockAgent:
             }
         
         product = state["product_model"]
+        prompt = self._build_prompt(product)
         
-        prompt = f"""Create a safety information block for this product.
+        try:
+            safety_block: SafetyBlock = self.retry.run(lambda: self.structured_llm.invoke(prompt))
+        except RetryError as e:
+            return self._on_failure(product, e.errors)
 
-            Warnings: {product.get('warnings', '')}
-            Suitable For: {product.get('skin_types', [])}
+        return self._on_success(safety_block)
+
+    async def agenerate(self, state: AgentState) -> AgentState:
+        """Async variant of generate — awaits the LLM instead of blocking a thread"""
+        
+        if not state.get("product_model"):
+            errors = [f"[{self.name}] No product model available"]
+            return {
+                "errors":errors
+            }
+        
+        product = state["product_model"]
+        prompt = self._build_prompt(product)
+        
+        try:
+            safety_block: SafetyBlock = await self.retry.arun(lambda: self.structured_llm.ainvoke(prompt))
+        except RetryError as e:
+            return self._on_failure(product, e.errors)
+
+        return self._on_success(safety_block)
+
+    def _build_prompt(self, product: dict) -> str:
+        return compact_prompt(f"""Create a safety information block for this product.
+
+            Warnings: {product.get('side_effects', '')}
+            Suitable For: {format_value(product.get('skin_types'))}
 
             Provide:
             1. Warnings from product data
@@ -36,45 +72,34 @@ class SafetyBlockAgent:
             3. Standard precautions (3-4 items)
 
             Output format: SafetyBlock.
-        """
-        
-        for attempt in range(self.max_retries):
-            try:
-                logger.info(f"[{self.name}] Attempt {attempt + 1}/{self.max_retries}")
-                
-                safety_block: SafetyBlock = self.structured_llm.invoke(prompt)
-                
-                safety_block = safety_block.model_dump()
-                logs = [f"[{self.name}] Generated safety block"]
-                logger.info(f"[{self.name}] Success")
-                
-                return {
-                    "safety_block":safety_block,
-                    "logs":logs
-                }
-                
-            except Exception as e:
-                error_msg = [f"[{self.name}] Error on attempt {attempt + 1}: {str(e)}"]
-                logger.error(error_msg)
-                
-                if attempt == self.max_retries - 1:
-                    safety_block = {
-                        "block_type": "safety",
-                        "warnings": product.get('warnings', 'Consult dermatologist if irritation occurs'),
-                        "suitable_for": product.get('skin_types', ['All skin types']),
-                        "precautions": [
-                            "Patch test before first use",
-                            "Avoid contact with eyes",
-                            "Store in cool, dry place",
-                            "Discontinue if irritation occurs"
-                        ]
-                    }
-                    logs = [f"[{self.name}] Used fallback safety block"]
+        """)
 
-                    return {
-                        "safety_block":safety_block,
-                        "logs":logs,
-                        "errors":error_msg
-                    }
+    def _on_success(self, safety_block: SafetyBlock) -> AgentState:
+        safety_block = safety_block.model_dump()
+        logs = [f"[{self.name}] Generated safety block"]
+        logger.info(f"[{self.name}] Success")
         
-        return {"logs": [f"[{self.name}] Unexpected exit"]}
\ No newline at end of file
+        return {
+            "safety_block":safety_block,
+            "logs":logs
+        }
+
+    def _on_failure(self, product: dict, error_msg) -> AgentState:
+        safety_block = {
+            "block_type": "safety",
+            "warnings": product.get('side_effects', 'Consult dermatologist if irritation occurs'),
+            "suitable_for": product.get('skin_types', ['All skin types']),
+            "precautions": [
+                "Patch test before first use",
+                "Avoid contact with eyes",
+                "Store in cool, dry place",
+                "Discontinue if irritation occurs"
+            ]
+        }
+        logs = [f"[{self.name}] Used fallback safety block"]
+
+        return {
+            "safety_block":safety_block,
+            "logs":logs,
+            "errors":error_msg
+        }
@@ -1,5 +1,9 @@
 from ..model.schema import UsageBlock
 from ..state import AgentState
+from ..utils.llm import bind_llm
+from ..utils.retry import RetryExecutor, RetryError
+from ..utils.prompt_context import compact_prompt
+from ..utils.incremental import product_fields
 import logging
 
 # Configure logging
@@ -8,11 +12,15 @@ logger = logging.getLogger(__name__)
 
 class UsageBlockAgent:
     """Dedicated agent for usage block"""
+
+    reads = product_fields("how_to_use")
+    writes = ("usage_block",)
     
     def __init__(self, llm, max_retries: int = 3):
-        self.structured_llm = llm.with_structured_output(UsageBlock)
+        self.structured_llm = bind_llm(llm, UsageBlock)
         self.name = "UsageBlockAgent"
         self.max_retries = max_retries
+        self.retry = RetryExecutor(self.name, max_retries)
     
     def generate(self, state: AgentState) -> AgentState:
         """Generate usage block with error handling"""
@@ -24,10 +32,38 @@ class UsageBlockAgent:
             }
         
         product = state["product_model"]
+        prompt = self._build_prompt(product)
         
-        prompt = f"""Create a usage instructions block for this product.
+        try:
+            usage_block: UsageBlock = self.retry.run(lambda: self.structured_llm.invoke(prompt))
+        except RetryError as e:
+            return self._on_failure(product, e.errors)
 
-            Usage Instructions: {product.get('usage_instructions', '')}
+        return self._on_success(usage_block)
+
+    async def agenerate(self, state: AgentState) -> AgentState:
+        """Async variant of generate — awaits the LLM instead of blocking a thread"""
+        
+        if not state.get("product_model"):
+            errors = [f"[{self.name}] No product model available"]
+            return {
+                "errors":errors
+            }
+        
+        product = state["product_model"]
+        prompt = self._build_prompt(product)
+        
+        try:
+            usage_block: UsageBlock = await self.retry.arun(lambda: self.structured_llm.ainvoke(prompt))
+        except RetryError as e:
+            return self._on_failure(product, e.errors)
+
+        return self._on_success(usage_block)
+
+    def _build_prompt(self, product: dict) -> str:
+        return compact_prompt(f"""Create a usage instructions block for this product.
+
+            Usage Instructions: {product.get('how_to_use', '')}
 
             Provide:
             1. The main instructions
@@ -35,45 +71,34 @@ class UsageBlockAgent:
             3. Usage frequency (morning/evening/daily)
 
             Output format: UsageBlock with instructions, steps array, and frequency.
-        """
-        
-        for attempt in range(self.max_retries):
-            try:
-                logger.info(f"[{self.name}] Attempt {attempt + 1}/{self.max_retries}")
-                
-                usage_block: UsageBlock = self.structured_llm.invoke(prompt)
-                
-                usage_block = usage_block.model_dump()
-                logs = [f"[{self.name}] Generated usage block"]
-                logger.info(f"[{self.name}] Success")
-                
-                return {
-                    "usage_block":usage_block,
-                    "logs":logs
-                }
-                
-            except Exception as e:
-                error_msg = [f"[{self.name}] Error on attempt {attempt + 1}: {str(e)}"]
-                logger.error(error_msg)
-                
-                if attempt == self.max_retries - 1:
-                    usage_block = {
-                        "block_type": "usage",
-                        "instructions": product.get('usage_instructions', 'See packaging'),
-                        "steps": [
-                            "Cleanse your face",
-                            "Apply product",
-                            "Massage gently",
-                            "Follow with moisturizer"
-                        ],
-                        "frequency": "Daily"
-                    }
-                    logs = [f"[{self.name}] Used fallback usage block"]
+        """)
 
-                    return {
-                        "usage_block":usage_block,
-                        "logs":logs,
-                        "errors":error_msg
-                    }
+    def _on_success(self, usage_block: UsageBlock) -> AgentState:
+        usage_block = usage_block.model_dump()
+        logs = [f"[{self.name}] Generated usage block"]
+        logger.info(f"[{self.name}] Success")
         
-        return {"logs": [f"[{self.name}] Unexpected exit"]}
+        return {
+            "usage_block":usage_block,
+            "logs":logs
+        }
+
+    def _on_failure(self, product: dict, error_msg) -> AgentState:
+        usage_block = {
+            "block_type": "usage",
+            "instructions": product.get('how_to_use', 'See packaging'),
+            "steps": [
+                "Cleanse your face",
+                "Apply product",
+                "Massage gently",
+                "Follow with moisturizer"
+            ],
+            "frequency": "Daily"
+        }
+        logs = [f"[{self.name}] Used fallback usage block"]
+
+        return {
+            "usage_block":usage_block,
+            "logs":logs,
+            "errors":error_msg
+        }
@@ -0,0 +1,114 @@
+"""
+Sync vs async node benchmark.
+
+Runs the same catalog through the pipeline twice against FakeChatModel:
+once with blocking nodes driven from a thread pool (graph.invoke per
+product) and once with the async nodes on a single event loop
+(ContentGeneration.astream_catalog). Reports wall time, throughput,
+peak thread count and peak traced Python memory for each path.
+
+Run from the directory that contains the package:
+
+    python -m <package>.benchmarks.bench_async --products 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import logging
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from ..config import config
+from ..main import ContentGeneration
+from .fake_llm import RAW_PRODUCT, FakeChatModel
+
+
+class ThreadSampler:
+    """Samples threading.active_count() in the background and keeps the peak"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, threading.active_count())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_sync(orchestrator: ContentGeneration, products: list, concurrency: int) -> None:
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(orchestrator.execute, products))
+
+
+def run_async(orchestrator: ContentGeneration, products: list, concurrency: int) -> None:
+    async def consume():
+        async for _ in orchestrator.astream_catalog(products, concurrency):
+            pass
+    asyncio.run(consume())
+
+
+def measure(label: str, runner, orchestrator, products, concurrency) -> dict:
+    # Timed pass without tracemalloc, which would slow both paths several-fold
+    with ThreadSampler() as sampler:
+        started = time.perf_counter()
+        runner(orchestrator, products, concurrency)
+        elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    runner(orchestrator, products, concurrency)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "path": label,
+        "seconds": elapsed,
+        "products_per_s": len(products) / elapsed,
+        "peak_threads": sampler.peak,
+        "peak_mib": peak_memory / 2**20,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake LLM latency per call (s)")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    # Measure the pipeline itself: no cache hits, checkpoints or provider budget
+    config.LLM_CACHE_ENABLED = False
+    config.CHECKPOINT_ENABLED = False
+    config.QUESTION_LIBRARY_ENABLED = False
+    config.INGREDIENT_MEMO_ENABLED = False
+    config.LLM_REQUESTS_PER_MINUTE = config.LLM_TOKENS_PER_MINUTE = 0
+    products = [{**RAW_PRODUCT, "name": f"Serum {i}"} for i in range(args.products)]
+    orchestrator = ContentGeneration(llm=FakeChatModel(latency=args.latency))
+
+    # Async first: thread pools created by the sync path would inflate its sample
+    rows = [
+        measure("async", run_async, orchestrator, products, args.concurrency),
+        measure("sync", run_sync, orchestrator, products, args.concurrency),
+    ]
+
+    print(f"{args.products} products, concurrency {args.concurrency}, LLM latency {args.latency}s")
+    print(f"{'path':<6} {'seconds':>8} {'prod/s':>8} {'threads':>8} {'peak MiB':>9}")
+    for row in rows:
+        print(f"{row['path']:<6} {row['seconds']:>8.2f} {row['products_per_s']:>8.1f} "
+              f"{row['peak_threads']:>8} {row['peak_mib']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Catalog-scale comparison benchmark.
+
+Builds synthetic catalogs of 10 to 10k products and times a full N×N pass
+of price differences and ingredient/benefit Jaccard overlaps with the
+bitset engine (CatalogComparison), against the same pass done pair by pair
+with DeterministicCalculations and Python sets. The pairwise baseline is
+quadratic in object construction, so it is skipped above --pairwise-max.
+
+Run from the directory that contains the package:
+
+    python -m <package>.benchmarks.bench_catalog_comparison --sizes 10 100 1000 10000
+"""
+import argparse
+import random
+import time
+
+from ..logic.deterministic import CatalogComparison, DeterministicCalculations
+
+INGREDIENTS = [f"Ingredient {i}" for i in range(400)]
+BENEFITS = [f"Benefit {i}" for i in range(120)]
+
+
+def synthetic_catalog(size: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [{
+        "name": f"Product {i}",
+        "price": {"amount": rng.randrange(199, 2999), "currency": "INR", "display": ""},
+        "key_ingredients": rng.sample(INGREDIENTS, rng.randint(3, 10)),
+        "benefits": rng.sample(BENEFITS, rng.randint(2, 6)),
+    } for i in range(size)]
+
+
+def engine_pass(products: list) -> float:
+    start = time.perf_counter()
+    engine = CatalogComparison(products)
+    for i in range(len(engine)):
+        engine.price_row(i)
+        for field in engine.FIELDS:
+            engine.jaccard_row(i, field)
+    return time.perf_counter() - start
+
+
+def pairwise_pass(products: list) -> float:
+    start = time.perf_counter()
+    for a in products:
+        for b in products:
+            DeterministicCalculations.calculate_price_comparison(
+                a["price"]["amount"], b["price"]["amount"], a["name"], b["name"])
+            for field, compare in (("key_ingredients", DeterministicCalculations.calculate_ingredients_comparison),
+                                   ("benefits", DeterministicCalculations.calculate_benefits_comparison)):
+                result = compare(a[field], b[field])
+                union = len(result.common) + len(result.unique_to_a) + len(result.unique_to_b)
+                len(result.common) / union if union else 1.0
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--pairwise-max", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    print(f"{'products':>9} {'pairs':>12} {'engine s':>9} {'pairs/s':>12} {'pairwise s':>11} {'speedup':>8}")
+    for size in args.sizes:
+        products = synthetic_catalog(size)
+        engine = engine_pass(products)
+        pairwise = pairwise_pass(products) if size <= args.pairwise_max else None
+        pairs = size * size
+        print(f"{size:>9} {pairs:>12} {engine:>9.3f} {pairs / engine:>12,.0f} "
+              + (f"{pairwise:>11.3f} {pairwise / engine:>7.1f}x" if pairwise is not None else f"{'—':>11} {'—':>8}"))
+
+
+if __name__ == "__main__":
+    main()
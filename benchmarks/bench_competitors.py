@@ -0,0 +1,47 @@
+"""
+Competitor index benchmark.
+
+Builds a CompetitorIndex over synthetic catalogs and reports build time
+and the mean and worst nearest-competitor query latency.
+
+Run from the directory that contains the package:
+
+    python -m <package>.benchmarks.bench_competitors --sizes 100 1000 10000
+"""
+import argparse
+import random
+import time
+
+from ..logic.competitor_index import CompetitorIndex
+from .bench_catalog_comparison import synthetic_catalog
+
+SKIN_TYPES = ["Normal", "Oily", "Dry", "Combination", "Sensitive"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    print(f"{'products':>9} {'build ms':>9} {'mean µs':>8} {'max µs':>8} {'matched':>8}")
+    for size in args.sizes:
+        rng = random.Random(size)
+        products = [{**product, "skin_types": rng.sample(SKIN_TYPES, 2)} for product in synthetic_catalog(size)]
+
+        start = time.perf_counter()
+        index = CompetitorIndex.build(products)
+        build = time.perf_counter() - start
+
+        latencies, matched = [], 0
+        for product in rng.sample(products, min(args.queries, size)):
+            start = time.perf_counter()
+            matched += index.nearest(product) is not None
+            latencies.append(time.perf_counter() - start)
+
+        print(f"{size:>9} {build * 1e3:>9.1f} {sum(latencies) / len(latencies) * 1e6:>8.0f} "
+              f"{max(latencies) * 1e6:>8.0f} {matched / len(latencies):>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Fused vs fan-out content block benchmark.
+
+Generates the five content blocks for a catalog of parsed products two
+ways against FakeChatModel: the five per-block agents concurrently
+("fanout") and one ContentBlocks call ("fused"). Reports requests, estimated
+prompt tokens (prompt plus the tool schema resent with every call) and wall
+time for each mode.
+
+The fake model answers every call after the same fixed latency, so wall
+time here reflects request count and queueing only; a real provider also
+spends longer generating the fused call's larger output.
+
+Run from the directory that contains the package:
+
+    python -m <package>.benchmarks.bench_fused --products 100 --latency 0.2
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from ..config import config
+from ..main import ContentGeneration
+from ..logic.product_parser import ProductParser
+from .fake_llm import RAW_PRODUCT, FakeChatModel
+
+
+async def fanout(orchestrator: ContentGeneration, state: dict) -> None:
+    agents = orchestrator.content_blocks_agent.block_agents.values()
+    await asyncio.gather(*(agent.agenerate(state) for agent in agents))
+
+
+async def fused(orchestrator: ContentGeneration, state: dict) -> None:
+    await orchestrator.content_blocks_agent.agenerate(state)
+
+
+def measure(label: str, generate, states: list, latency: float, concurrency: int) -> dict:
+    llm = FakeChatModel(latency=latency)
+    orchestrator = ContentGeneration(llm=llm)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(state):
+        async with semaphore:
+            await generate(orchestrator, state)
+
+    async def run():
+        await asyncio.gather(*(one(state) for state in states))
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - started
+
+    return {
+        "mode": label,
+        "requests": llm.calls,
+        "prompt_tokens": llm.prompt_tokens,
+        "seconds": elapsed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake LLM latency per call (s)")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    # Measure the calls themselves: no cache hits or provider budget
+    config.LLM_CACHE_ENABLED = False
+    config.CHECKPOINT_ENABLED = False
+    config.QUESTION_LIBRARY_ENABLED = False
+    config.INGREDIENT_MEMO_ENABLED = False
+    config.LLM_REQUESTS_PER_MINUTE = config.LLM_TOKENS_PER_MINUTE = 0
+
+    states = []
+    for i in range(args.products):
+        product_model, _ = ProductParser.parse({**RAW_PRODUCT, "name": f"Serum {i}"})
+        states.append({"product_model": product_model})
+
+    rows = [
+        measure("fanout", fanout, states, args.latency, args.concurrency),
+        measure("fused", fused, states, args.latency, args.concurrency),
+    ]
+
+    print(f"{args.products} products, concurrency {args.concurrency}, LLM latency {args.latency}s")
+    print(f"{'mode':<7} {'requests':>9} {'prompt tok':>11} {'tok/prod':>9} {'seconds':>8}")
+    for row in rows:
+        print(f"{row['mode']:<7} {row['requests']:>9} {row['prompt_tokens']:>11} "
+              f"{row['prompt_tokens'] / args.products:>9.0f} {row['seconds']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Ingredient memo benchmark.
+
+Runs IngredientsBlockAgent over a synthetic catalog whose ingredients are
+drawn (with synonyms) from a skewed vocabulary, and prints how many
+products per window still needed an LLM call, with the memo on and off.
+
+Run from the directory that contains the package:
+
+    python -m <package>.benchmarks.bench_ingredient_memo --products 1000
+"""
+import argparse
+import logging
+import random
+import tempfile
+from pathlib import Path
+
+from ..Agents.ingredients_block import IngredientsBlockAgent
+from ..config import config
+from ..utils.ingredient_memo import IngredientMemo
+from .fake_llm import DescribingModel
+
+VOCABULARY = [f"Botanical Extract {i}" for i in range(300)]
+ALIASES = ["L-Ascorbic Acid", "Vitamin C", "Sodium Hyaluronate", "Hyaluronic Acid", "Nicotinamide",
+           "Niacinamide", "Tocopherol", "Vitamin E", "Panthenol", "Salicylic Acid"]
+
+
+def synthetic_products(count: int, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    # Zipf-like: a few ingredients appear everywhere, the long tail rarely
+    weights = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+    return [{
+        "name": f"Product {i}",
+        "concentration": "10% Vitamin C",
+        "key_ingredients": [rng.choice(ALIASES)] + rng.choices(VOCABULARY, weights, k=rng.randint(2, 5)),
+    } for i in range(count)]
+
+
+def run(products: list, window: int, memo: IngredientMemo = None) -> list:
+    llm = DescribingModel()
+    agent = IngredientsBlockAgent(llm, memo=memo)
+    counts, before = [], 0
+    for start in range(0, len(products), window):
+        for product in products[start:start + window]:
+            agent.generate({"product_model": product})
+        counts.append(llm.calls - before)
+        before = llm.calls
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--window", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    config.LLM_CACHE_ENABLED = False
+    config.INGREDIENT_MEMO_ENABLED = False
+    config.LLM_REQUESTS_PER_MINUTE = config.LLM_TOKENS_PER_MINUTE = 0
+
+    products = synthetic_products(args.products)
+    with tempfile.TemporaryDirectory() as tmp:
+        with_memo = run(products, args.window, IngredientMemo(str(Path(tmp) / "memo.sqlite")))
+    without_memo = run(products, args.window)
+
+    print(f"{'products':>12} {'calls (memo)':>13} {'calls (none)':>13}")
+    for index, (memo_calls, plain_calls) in enumerate(zip(with_memo, without_memo)):
+        start = index * args.window
+        print(f"{f'{start}-{start + args.window - 1}':>12} {memo_calls:>13} {plain_calls:>13}")
+    print(f"{'total':>12} {sum(with_memo):>13} {sum(without_memo):>13}")
+
+
+if __name__ == "__main__":
+    main()
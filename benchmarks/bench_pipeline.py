@@ -0,0 +1,112 @@
+"""
+Offline pipeline benchmark — the regression baseline for scheduling and caching changes.
+
+Streams catalogs of 1 to 1000 products through ContentGeneration against
+FakeChatModel with a configurable latency distribution and failure rate,
+and reports wall time, throughput and end-to-end latency percentiles per
+catalog size, then the per-node metrics of the largest run.
+Response cache, checkpoints, rate limiter and the cross-product memo and
+libraries are off unless requested, so every run measures the same work.
+
+Run from the directory that contains the package:
+
+    python -m <package>.benchmarks.bench_pipeline --sizes 1 10 100 1000 --latency 0.05 \\
+        --distribution lognormal --failure-rate 0.02
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from ..config import config
+from ..main import ContentGeneration
+from ..utils.metrics import metrics, percentile
+from ..utils.tracing import tracer
+from .fake_llm import RAW_PRODUCT, FakeChatModel
+
+
+def run(size: int, args) -> dict:
+    llm = FakeChatModel(latency=args.latency, distribution=args.distribution,
+                        failure_rate=args.failure_rate, seed=args.seed)
+    orchestrator = ContentGeneration(llm=llm)
+    products = [{**RAW_PRODUCT, "name": f"Serum {i}"} for i in range(size)]
+    latencies, errors = [], 0
+
+    aexecute = orchestrator.aexecute
+
+    async def timed_aexecute(product_data, previous_state=None):
+        started = time.perf_counter()
+        try:
+            return await aexecute(product_data, previous_state)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    # astream_catalog looks the method up on the instance
+    orchestrator.aexecute = timed_aexecute
+
+    async def consume():
+        nonlocal errors
+        async for _, state in orchestrator.astream_catalog(products, args.concurrency):
+            errors += bool(state.get("errors"))
+
+    metrics.reset()
+    started = time.perf_counter()
+    asyncio.run(consume())
+    elapsed = time.perf_counter() - started
+
+    return {
+        "products": size,
+        "seconds": elapsed,
+        "products_per_s": size / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1e3,
+        "p95_ms": percentile(latencies, 95) * 1e3,
+        "p99_ms": percentile(latencies, 99) * 1e3,
+        "calls": llm.calls,
+        "failures": llm.failures,
+        "with_errors": errors,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean fake LLM latency per call (s)")
+    parser.add_argument("--distribution", choices=FakeChatModel.DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of fake LLM calls that fail (retryable)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--retry-delay", type=float, default=0.0, help="LLM_RETRY_BASE_DELAY for the run (s)")
+    parser.add_argument("--content-blocks", choices=("fanout", "fused"), default=config.CONTENT_BLOCKS_MODE)
+    parser.add_argument("--with-memo", action="store_true", help="Keep the ingredient memo and question library on")
+    parser.add_argument("--trace", default=None, help="Write a Chrome/Perfetto trace of the largest run to this file")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    config.LLM_CACHE_ENABLED = False
+    config.CHECKPOINT_ENABLED = False
+    config.LLM_REQUESTS_PER_MINUTE = config.LLM_TOKENS_PER_MINUTE = 0
+    config.LLM_RETRY_BASE_DELAY = args.retry_delay
+    config.CONTENT_BLOCKS_MODE = args.content_blocks
+    config.INGREDIENT_MEMO_ENABLED = config.QUESTION_LIBRARY_ENABLED = args.with_memo
+
+    print(f"concurrency {args.concurrency}, LLM latency {args.latency}s {args.distribution}, "
+          f"failure rate {args.failure_rate:.1%}, content blocks {args.content_blocks}")
+    print(f"{'products':>9} {'seconds':>8} {'prod/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'calls':>7} {'failed':>7} {'w/ err':>7}")
+    for position, size in enumerate(args.sizes):
+        if args.trace and position == len(args.sizes) - 1:
+            tracer.start()
+        row = run(size, args)
+        print(f"{row['products']:>9} {row['seconds']:>8.2f} {row['products_per_s']:>8.1f} {row['p50_ms']:>8.1f} "
+              f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['calls']:>7} {row['failures']:>7} {row['with_errors']:>7}")
+
+    print(f"\nPer-node metrics, {args.sizes[-1]} products")
+    print(metrics.report())
+    if args.trace:
+        tracer.stop()
+        tracer.write(args.trace)
+        print(f"\nTrace: {args.trace}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Question library benchmark.
+
+Runs QuestionGeneratorAgent over a synthetic catalog of a few product
+categories and reports LLM calls and estimated output tokens with the
+category question library on and off.
+
+Run from the directory that contains the package:
+
+    python -m <package>.benchmarks.bench_question_library --products 1000
+"""
+import argparse
+import logging
+import random
+import tempfile
+from pathlib import Path
+
+from ..Agents.question_generator import QuestionGeneratorAgent
+from ..config import config
+from ..utils.question_library import QuestionLibrary
+from .fake_llm import QuestioningModel
+
+ACTIVES = ["Vitamin C", "Niacinamide", "Retinol", "Hyaluronic Acid", "Salicylic Acid"]
+FORMS = ["Serum", "Cream", "Cleanser"]
+SUPPORTING = [f"Botanical Extract {i}" for i in range(60)]
+
+
+def synthetic_products(count: int, seed: int = 5) -> list:
+    rng = random.Random(seed)
+    products = []
+    for i in range(count):
+        active, form = rng.choice(ACTIVES), rng.choice(FORMS)
+        products.append({
+            "name": f"Brand {i} {active} {form}",
+            "concentration": f"{rng.choice([2, 5, 10, 15])}% {active}",
+            "key_ingredients": [active] + rng.sample(SUPPORTING, 3),
+            "skin_types": ["Oily"], "benefits": ["Brightening"], "how_to_use": "Apply daily", "side_effects": "None",
+        })
+    return products
+
+
+def run(products: list, library: QuestionLibrary = None) -> QuestioningModel:
+    llm = QuestioningModel()
+    agent = QuestionGeneratorAgent(llm, library=library)
+    for product in products:
+        agent.generate({"product_model": product})
+    return llm
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    config.LLM_CACHE_ENABLED = False
+    config.QUESTION_LIBRARY_ENABLED = False
+    config.LLM_REQUESTS_PER_MINUTE = config.LLM_TOKENS_PER_MINUTE = 0
+
+    products = synthetic_products(args.products)
+    without = run(products)
+    with tempfile.TemporaryDirectory() as tmp:
+        library = QuestionLibrary(str(Path(tmp) / "questions.sqlite"))
+        with_library = run(products, library)
+        categories = library.stats()["categories"]
+
+    print(f"{args.products} products, {categories} categories")
+    print(f"{'':>10} {'calls':>7} {'output tokens':>14}")
+    print(f"{'none':>10} {without.calls:>7} {without.output_tokens:>14}")
+    print(f"{'library':>10} {with_library.calls:>7} {with_library.output_tokens:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Tool-schema size per structured-output model, full vs compact.
+
+Prints the estimated tokens of the tool definition sent with every
+structured call for each model in model/schema.py — as LangChain builds it
+from the pydantic model, and as built by utils/compact_schema.py — then the
+per-node prompt totals of a short fake-model run with compact schemas off
+and on.
+
+Run from the directory that contains the package:
+
+    python -m <package>.benchmarks.bench_schemas --products 10
+"""
+import argparse
+import inspect
+
+from pydantic import BaseModel
+
+from ..config import config
+from ..model import schema
+from ..utils.compact_schema import savings_report
+from ..utils.metrics import metrics
+from . import bench_tokens
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    models = [model for _, model in inspect.getmembers(schema, inspect.isclass)
+              if issubclass(model, BaseModel) and model is not BaseModel and model.__module__ == schema.__name__]
+    print(savings_report(models))
+
+    for compact in (False, True):
+        config.LLM_COMPACT_SCHEMAS = compact
+        bench_tokens.main(["--products", str(args.products)])
+        totals = metrics.summary()["total"]
+        print(f"compact schemas {'on' if compact else 'off'}: {totals['prompt_tokens']} prompt tokens\n")
+
+
+if __name__ == "__main__":
+    main()
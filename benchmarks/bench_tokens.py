@@ -0,0 +1,52 @@
+"""
+Per-node token budget of one pipeline run.
+
+Runs a catalog through the pipeline against FakeChatModel and prints the
+prompt and completion tokens each graph node spent, as recorded by
+utils/metrics.py. Prompt tokens include the tool schema sent with every
+structured call; completion tokens are estimated from the fake's output,
+which is placeholder text, so the prompt column is the one to track.
+
+Run from the directory that contains the package:
+
+    python -m <package>.benchmarks.bench_tokens --products 10
+"""
+import argparse
+import asyncio
+import logging
+
+from ..config import config
+from ..main import ContentGeneration
+from ..utils.metrics import metrics
+from .fake_llm import RAW_PRODUCT, FakeChatModel
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    # Count every call: no cache hits, checkpoints, cross-product memo or provider budget
+    config.LLM_CACHE_ENABLED = False
+    config.CHECKPOINT_ENABLED = False
+    config.QUESTION_LIBRARY_ENABLED = False
+    config.INGREDIENT_MEMO_ENABLED = False
+    config.LLM_REQUESTS_PER_MINUTE = config.LLM_TOKENS_PER_MINUTE = 0
+
+    products = [{**RAW_PRODUCT, "name": f"Serum {i}"} for i in range(args.products)]
+    orchestrator = ContentGeneration(llm=FakeChatModel(latency=0))
+
+    async def consume():
+        async for _ in orchestrator.astream_catalog(products):
+            pass
+
+    metrics.reset()
+    asyncio.run(consume())
+
+    print(f"{args.products} products")
+    print(metrics.report())
+
+
+if __name__ == "__main__":
+    main()
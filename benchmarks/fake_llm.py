@@ -0,0 +1,211 @@
+"""
+Offline stand-in for ChatGroq used by the benchmarks.
+
+Structured calls return schema-valid output after a fixed latency, so the
+whole graph runs end to end without network access: pydantic objects for a
+pydantic schema, plain dicts for a dict (compact) schema — as LangChain does.
+Latency can follow a fixed, uniform, exponential or lognormal distribution
+around its mean, and a seeded fraction of calls can fail with a retryable
+provider error, to exercise the retry path under load.
+"""
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from typing import get_args, get_origin
+
+from langchain_core.messages import AIMessage
+from pydantic import BaseModel
+
+from ..model.schema import IngredientsBlock, QuestionsOutput
+from ..utils.rate_limiter import estimate_tokens
+
+# A catalog record as it arrives, before parsing
+RAW_PRODUCT = {
+    "name": "GlowBoost Vitamin C Serum",
+    "concentration": "10% Vitamin C",
+    "skin_type": "Oily, Combination",
+    "key_ingredients": "Vitamin C, Hyaluronic Acid",
+    "benefits": "Brightening, Fades dark spots",
+    "how_to_use": "Apply 2–3 drops in the morning before sunscreen",
+    "side_effects": "Mild tingling for sensitive skin",
+    "price": "₹699",
+}
+
+
+def fake_instance(schema: type[BaseModel], list_size: int = 3) -> BaseModel:
+    """Build a valid instance of `schema` by filling every required field with placeholder data"""
+    values = {}
+    for name, field in schema.model_fields.items():
+        if field.is_required():
+            values[name] = _fake_value(field.annotation, name, list_size)
+    return schema.model_validate(values)
+
+
+def _fake_value(annotation, name: str, list_size: int):
+    if get_origin(annotation) is list:
+        (item_type,) = get_args(annotation)
+        return [_fake_value(item_type, f"{name} {i + 1}", list_size) for i in range(list_size)]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return fake_instance(annotation, list_size).model_dump()
+    if annotation is int:
+        return list_size
+    if annotation is float:
+        return 499.0
+    return f"{name} text"
+
+
+def fake_json(schema: dict, name: str = "value", list_size: int = 3):
+    """Placeholder value for a JSON schema node, filling every required property"""
+    kind = schema.get("type")
+    if kind == "object":
+        return {key: fake_json(prop, key, list_size)
+                for key, prop in schema.get("properties", {}).items() if key in schema.get("required", ())}
+    if kind == "array":
+        return [fake_json(schema.get("items", {}), f"{name} {i + 1}", list_size) for i in range(list_size)]
+    if kind == "integer":
+        return list_size
+    if kind == "number":
+        return 499.0
+    return f"{name} text"
+
+
+class FakeProviderError(Exception):
+    """Retryable stand-in for a provider 5xx"""
+
+    status_code = 503
+
+
+class FakeStructuredLLM:
+    """Result of FakeChatModel.with_structured_output"""
+
+    def __init__(self, parent: "FakeChatModel", schema, include_raw: bool = False):
+        self.parent = parent
+        self.schema = schema
+        self.include_raw = include_raw
+
+    def invoke(self, prompt, config=None, **kwargs):
+        time.sleep(self.parent._delay())
+        self.parent._count(prompt, self.schema)
+        return self._result()
+
+    async def ainvoke(self, prompt, config=None, **kwargs):
+        await asyncio.sleep(self.parent._delay())
+        self.parent._count(prompt, self.schema)
+        return self._result()
+
+    def _result(self):
+        if isinstance(self.schema, dict):
+            name, parsed = self.schema["title"], fake_json(self.schema)
+            args = parsed
+        else:
+            name, parsed = self.schema.__name__, fake_instance(self.schema)
+            args = parsed.model_dump()
+        if not self.include_raw:
+            return parsed
+        raw = AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": "call_fake"}])
+        return {"raw": raw, "parsed": parsed, "parsing_error": None}
+
+
+class FakeChatModel:
+    """Duck-typed chat model: configurable latency and failures, valid structured output, call and prompt-token counting"""
+
+    DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+    def __init__(self, latency: float = 0.05, model_name: str = "fake-llm", distribution: str = "fixed",
+                 failure_rate: float = 0.0, seed: int = 0):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {distribution!r}; expected one of {self.DISTRIBUTIONS}")
+        # `latency` is the mean of the distribution
+        self.latency = latency
+        self.model_name = model_name
+        self.distribution = distribution
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.failures = 0
+        self.prompt_tokens = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def with_structured_output(self, schema, include_raw: bool = False, **kwargs) -> FakeStructuredLLM:
+        return FakeStructuredLLM(self, schema, include_raw)
+
+    def invoke(self, prompt, config=None, **kwargs) -> AIMessage:
+        time.sleep(self._delay())
+        self._count(prompt)
+        return AIMessage(content="Both products are solid choices; pick by skin type and budget.")
+
+    async def ainvoke(self, prompt, config=None, **kwargs) -> AIMessage:
+        await asyncio.sleep(self._delay())
+        self._count(prompt)
+        return AIMessage(content="Both products are solid choices; pick by skin type and budget.")
+
+    def _delay(self) -> float:
+        """One latency sample with mean `latency`"""
+        if self.latency <= 0 or self.distribution == "fixed":
+            return max(0.0, self.latency)
+        with self._lock:
+            if self.distribution == "uniform":
+                return self._random.uniform(0, 2 * self.latency)
+            if self.distribution == "exponential":
+                return self._random.expovariate(1 / self.latency)
+            # Lognormal with sigma 0.5: a long right tail, same mean
+            sigma = 0.5
+            return self._random.lognormvariate(math.log(self.latency) - sigma ** 2 / 2, sigma)
+
+    def _count(self, prompt, schema=None) -> None:
+        """Record one request and its estimated prompt tokens (the tool schema is sent with every structured call); fail it at `failure_rate`"""
+        with self._lock:
+            self.calls += 1
+            failed = self.failure_rate > 0 and self._random.random() < self.failure_rate
+            self.failures += failed
+        if failed:
+            raise FakeProviderError(f"Fake provider error on call {self.calls}")
+        text = prompt if isinstance(prompt, str) else json.dumps(prompt, ensure_ascii=False, default=str)
+        if isinstance(schema, dict):
+            text += json.dumps(schema)
+        elif schema is not None:
+            text += json.dumps(schema.model_json_schema())
+        self.prompt_tokens += estimate_tokens(text)
+
+
+class DescribingModel:
+    """Structured stand-in that describes exactly the ingredients the prompt asks about"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def with_structured_output(self, schema, **kwargs):
+        return self
+
+    def invoke(self, prompt, config=None, **kwargs):
+        self.calls += 1
+        names = prompt.split("these ingredients only:", 1)[1].splitlines()[0].strip().split(", ")
+        return IngredientsBlock(primary=names[0], supporting=names[1:],
+                                details=[{"name": name, "purpose": f"Purpose of {name}"} for name in names])
+
+
+class QuestioningModel:
+    """Structured stand-in: 16 questions for a full request, the requested number of extras otherwise"""
+
+    def __init__(self):
+        self.calls = 0
+        self.output_tokens = 0
+
+    def with_structured_output(self, schema, **kwargs):
+        return self
+
+    def invoke(self, prompt, config=None, **kwargs):
+        self.calls += 1
+        name = prompt.split("name: ", 1)[1].splitlines()[0]
+        if "AT LEAST 15" in prompt:
+            questions = [{"category": "Usage", "question": f"How often should I use {name}, question {i}?"} for i in range(8)]
+            questions += [{"category": "Safety", "question": f"Is generic safety question {i} a concern?"} for i in range(8)]
+        else:
+            count = int(prompt.split("Generate ", 1)[1].split()[0])
+            questions = [{"category": "Ingredients", "question": f"What does {name} extra {i} do?"} for i in range(count)]
+        output = QuestionsOutput(questions=questions, total_count=len(questions))
+        self.output_tokens += estimate_tokens(output.model_dump_json())
+        return output
@@ -4,11 +4,110 @@ from dotenv import load_dotenv
 
 load_dotenv() 
 
+# Simple nodes that default to the small model; everything else uses LLM_MODEL
+SMALL_MODEL_NODES = ("generate_benefits", "generate_usage", "generate_ingredients", "generate_safety",
+                     "generate_overview", "build_product_page")
+
+def _node_models(spec: str) -> dict:
+    """Parse "node=model,node=model" into {node: model}"""
+    pairs = (item.split("=", 1) for item in spec.split(",") if "=" in item)
+    return {node.strip(): model.strip() for node, model in pairs}
+
 class Config:
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     
     # Model selection — changeable per environment
     LLM_MODEL = os.getenv("LLM_MODEL","llama-3.3-70b-versatile")
 
+    # Per-node model routing. LLM_NODE_MODELS overrides single nodes, e.g.
+    # "build_faq=llama-3.1-8b-instant"; set LLM_SMALL_MODEL to LLM_MODEL to
+    # route every node to the large model
+    LLM_SMALL_MODEL = os.getenv("LLM_SMALL_MODEL", "llama-3.1-8b-instant")
+    LLM_NODE_MODELS = {
+        **dict.fromkeys(SMALL_MODEL_NODES, LLM_SMALL_MODEL),
+        **_node_models(os.getenv("LLM_NODE_MODELS", "")),
+    }
+    # Re-ask LLM_MODEL when a routed model's output still fails validation after repair
+    LLM_ESCALATE_ON_INVALID = os.getenv("LLM_ESCALATE_ON_INVALID", "true").lower() in ("1", "true", "yes")
+
+    # Content blocks: "fanout" runs five block agents in parallel, "fused"
+    # asks for all five in one ContentBlocks call (failed blocks fall back)
+    CONTENT_BLOCKS_MODE = os.getenv("CONTENT_BLOCKS_MODE", "fanout").lower()
+
+    # FAQ page — questions are answered in per-category shards of at most
+    # FAQ_SHARD_SIZE questions, FAQ_MAX_PARALLEL_SHARDS calls at a time
+    FAQ_SHARD_SIZE = int(os.getenv("FAQ_SHARD_SIZE", "8"))
+    FAQ_MAX_PARALLEL_SHARDS = int(os.getenv("FAQ_MAX_PARALLEL_SHARDS", "8"))
+    # Follow-up calls per shard that re-ask only the questions left unanswered
+    FAQ_GAP_FILL_ROUNDS = int(os.getenv("FAQ_GAP_FILL_ROUNDS", "2"))
+
+    # Catalog batch mode — product pipelines in flight at once
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+    # Output files — page files are indented for reading; fsync makes each
+    # write durable across power loss as well as crashes, at a cost per file
+    OUTPUT_PRETTY = os.getenv("OUTPUT_PRETTY", "true").lower() in ("1", "true", "yes")
+    OUTPUT_FSYNC = os.getenv("OUTPUT_FSYNC", "false").lower() in ("1", "true", "yes")
+    # Page bundle (--bundle): products per independently decompressible
+    # zstd frame, and the zstd compression level
+    BUNDLE_FRAME_PRODUCTS = int(os.getenv("BUNDLE_FRAME_PRODUCTS", "16"))
+    BUNDLE_COMPRESSION_LEVEL = int(os.getenv("BUNDLE_COMPRESSION_LEVEL", "6"))
+
+    # LLM response cache — identical (model, schema, prompt) requests are
+    # answered from a local SQLite store instead of the provider
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite")
+    LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    LLM_CACHE_MAX_AGE_SECONDS = float(os.getenv("LLM_CACHE_MAX_AGE_SECONDS", str(30 * 24 * 3600)))
+
+    # Provider rate limits shared by every LLM call in the process (0 disables).
+    # Defaults match Groq's free tier for llama-3.3-70b-versatile.
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+    LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "12000"))
+    LLM_RATE_HEADROOM = float(os.getenv("LLM_RATE_HEADROOM", "0.9"))
+    LLM_RATE_BURST_SECONDS = float(os.getenv("LLM_RATE_BURST_SECONDS", "2"))
+    # Completion tokens budgeted per call before the response size is known
+    LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "600"))
+
+    # Retry policy for LLM calls — exponential backoff with full jitter,
+    # never shorter than the provider's Retry-After
+    LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1"))
+    LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "30"))
+
+    # Invalid structured output is fixed locally, then with one short repair
+    # call, before the original prompt is re-sent
+    LLM_REPAIR_ENABLED = os.getenv("LLM_REPAIR_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    # Compact tool schemas (utils/compact_schema.py): bind structured calls with
+    # a minimised schema, validate against the full pydantic model
+    LLM_COMPACT_SCHEMAS = os.getenv("LLM_COMPACT_SCHEMAS", "true").lower() in ("1", "true", "yes")
+    LLM_SCHEMA_DESCRIPTION_CHARS = int(os.getenv("LLM_SCHEMA_DESCRIPTION_CHARS", "60"))
+
+    # Ingredient purposes remembered across products (utils/ingredient_memo.py);
+    # only ingredients not in the memo are sent to the LLM
+    INGREDIENT_MEMO_ENABLED = os.getenv("INGREDIENT_MEMO_ENABLED", "true").lower() in ("1", "true", "yes")
+    INGREDIENT_MEMO_PATH = os.getenv("INGREDIENT_MEMO_PATH", ".cache/ingredient_memo.sqlite")
+
+    # FAQ question templates per product category (utils/question_library.py):
+    # the first QUESTION_LIBRARY_SEEDS products of a category seed it, later
+    # ones get QUESTION_LIBRARY_SIZE rendered templates plus up to
+    # QUESTION_EXTRAS LLM questions when they bring ingredients the category lacks
+    QUESTION_LIBRARY_ENABLED = os.getenv("QUESTION_LIBRARY_ENABLED", "true").lower() in ("1", "true", "yes")
+    QUESTION_LIBRARY_PATH = os.getenv("QUESTION_LIBRARY_PATH", ".cache/question_library.sqlite")
+    QUESTION_LIBRARY_SEEDS = int(os.getenv("QUESTION_LIBRARY_SEEDS", "3"))
+    QUESTION_LIBRARY_SIZE = int(os.getenv("QUESTION_LIBRARY_SIZE", "15"))
+    QUESTION_EXTRAS = int(os.getenv("QUESTION_EXTRAS", "3"))
+
+    # Product B from the catalog: the nearest real competitor by shared
+    # ingredients/benefits, skin types and price band (logic/competitor_index.py);
+    # the LLM only invents one when no product scores COMPETITOR_MIN_SCORE
+    COMPETITOR_INDEX_ENABLED = os.getenv("COMPETITOR_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+    COMPETITOR_PRICE_BAND = float(os.getenv("COMPETITOR_PRICE_BAND", "0.25"))
+    COMPETITOR_MIN_SCORE = int(os.getenv("COMPETITOR_MIN_SCORE", "3"))
+
+    # Graph checkpoints — one thread per product ID, so interrupted runs resume
+    CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "true").lower() in ("1", "true", "yes")
+    CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", ".cache/checkpoints.sqlite")
+
 # Global instance
 config = Config()
\ No newline at end of file
@@ -0,0 +1,112 @@
+import math
+from collections import Counter
+from typing_extensions import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..config import config
+
+
+class CompetitorIndex:
+    """
+    Inverted index for picking a real competitor from the catalog.
+
+    Products are indexed under their ingredients and benefits; skin types
+    and a logarithmic price band are kept per product. A query counts the
+    ingredients (weight 3) and benefits (weight 2) each candidate shares with
+    the product through the posting lists, then scores only the shortlist
+    that skin-type and price-band overlap could still lift to the top — so
+    only products sharing some formulation are ever considered.
+    """
+
+    WEIGHTS = {"key_ingredients": 3, "benefits": 2, "skin_types": 1, "band": 1}
+    # Only formulation overlap makes a product a competitor
+    CANDIDATE_FIELDS = ("key_ingredients", "benefits")
+
+    def __init__(self, band_ratio: Optional[float] = None, min_score: Optional[int] = None):
+        # Prices within a factor of (1 + band_ratio) share a band
+        self.band_ratio = config.COMPETITOR_PRICE_BAND if band_ratio is None else band_ratio
+        self.min_score = config.COMPETITOR_MIN_SCORE if min_score is None else min_score
+        self.products: List[Dict[str, Any]] = []
+        self.prices: List[float] = []
+        self.skin_types: List[frozenset] = []
+        self.bands: List[Optional[int]] = []
+        self.by_name: Dict[str, List[int]] = {}
+        self.postings: Dict[str, Dict[str, List[int]]] = {field: {} for field in self.CANDIDATE_FIELDS}
+
+    @classmethod
+    def build(cls, products: Iterable[Dict[str, Any]], **kwargs) -> "CompetitorIndex":
+        index = cls(**kwargs)
+        for product in products:
+            index.add(product)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def add(self, product: Dict[str, Any]) -> None:
+        """Index a parsed product (a Product model dump)"""
+        position = len(self.products)
+        features = self._features(product)
+        self.products.append(product)
+        self.prices.append(self._amount(product.get("price")))
+        self.skin_types.append(frozenset(features["skin_types"]))
+        self.bands.append(features["band"])
+        self.by_name.setdefault(self._normalize(product.get("name")), []).append(position)
+        for field in self.CANDIDATE_FIELDS:
+            postings = self.postings[field]
+            for term in features[field]:
+                postings.setdefault(term, []).append(position)
+
+    def nearest(self, product: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], int]]:
+        """Closest other product and its score, or None when nothing shares enough with it"""
+        features = self._features(product)
+
+        scores = Counter()
+        for field in self.CANDIDATE_FIELDS:
+            for term in features[field]:
+                posting = self.postings[field].get(term)
+                # Counter.update counts in C; repeating it applies the field weight
+                for _ in range(self.WEIGHTS[field] if posting else 0):
+                    scores.update(posting)
+        # The product itself (or another listing of it) is not its own competitor
+        for position in self.by_name.get(self._normalize(product.get("name")), ()):
+            scores.pop(position, None)
+        if not scores:
+            return None
+
+        skin_types, band, price = features["skin_types"], features["band"], self._amount(product.get("price"))
+        bonus = self.WEIGHTS["skin_types"] * len(skin_types) + self.WEIGHTS["band"]
+        floor = max(scores.values()) - bonus
+        best, best_key = None, None
+        for position, score in scores.items():
+            if score < floor:
+                continue
+            score += self.WEIGHTS["skin_types"] * len(skin_types & self.skin_types[position])
+            # Neighbouring bands count as the same price range
+            if band is not None and self.bands[position] is not None and abs(band - self.bands[position]) <= 1:
+                score += self.WEIGHTS["band"]
+            # Highest score first, then the closest price, then catalog order
+            key = (-score, abs(self.prices[position] - price), position)
+            if best_key is None or key < best_key:
+                best, best_key = position, key
+
+        if -best_key[0] < self.min_score:
+            return None
+        return self.products[best], -best_key[0]
+
+    def _features(self, product: Dict[str, Any]) -> Dict[str, Any]:
+        features = {field: {self._normalize(term) for term in product.get(field) or ()} - {""}
+                    for field in ("key_ingredients", "benefits", "skin_types")}
+        price = self._amount(product.get("price"))
+        features["band"] = math.floor(math.log(price) / math.log1p(self.band_ratio)) if price > 0 else None
+        return features
+
+    @staticmethod
+    def _normalize(term: Any) -> str:
+        return " ".join(str(term or "").lower().split())
+
+    @staticmethod
+    def _amount(price: Any) -> float:
+        try:
+            return float(price["amount"] if isinstance(price, dict) else price or 0)
+        except (TypeError, ValueError, KeyError):
+            return 0.0
@@ -1,4 +1,4 @@
-from typing_extensions import List
+from typing_extensions import Any, Dict, Iterable, List, Sequence, Tuple
 from ..model.schema import PriceComparison,IngredientsComparison,BenefitsComparison
 
 class DeterministicCalculations:
@@ -51,4 +51,95 @@ class DeterministicCalculations:
             common=common,
             unique_to_a=unique_to_a,
             unique_to_b=unique_to_b
-        )
\ No newline at end of file
+        )
+
+
+class Vocabulary:
+    """Interns terms to bit positions so a set of terms becomes one int bitset"""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.terms: List[str] = []
+
+    def encode(self, terms: Iterable[str]) -> int:
+        mask = 0
+        for term in terms:
+            bit = self.index.get(term)
+            if bit is None:
+                bit = self.index[term] = len(self.terms)
+                self.terms.append(term)
+            mask |= 1 << bit
+        return mask
+
+    def decode(self, mask: int) -> List[str]:
+        """Terms in the bitset, sorted like the pairwise comparisons"""
+        terms = []
+        while mask:
+            low = mask & -mask
+            terms.append(self.terms[low.bit_length() - 1])
+            mask ^= low
+        return sorted(terms)
+
+
+class CatalogComparison:
+    """
+    Batch comparison engine for a catalog of products.
+
+    Ingredients and benefits are encoded once as int bitsets over an interned
+    vocabulary, so a pair's overlap is one AND and a popcount instead of two
+    set constructions. Rows of the N×N price-difference and Jaccard matrices
+    are computed in bulk; `compare(i, j)` decodes a pair back into the same
+    PriceComparison, IngredientsComparison and BenefitsComparison objects
+    that DeterministicCalculations builds for two products.
+    """
+
+    FIELDS = ("key_ingredients", "benefits")
+
+    def __init__(self, products: Sequence[Dict[str, Any]]):
+        self.names = [product.get("name", "") for product in products]
+        self.prices = [self._amount(product.get("price")) for product in products]
+        self.vocabularies = {field: Vocabulary() for field in self.FIELDS}
+        self.masks = {
+            field: [self.vocabularies[field].encode(product.get(field) or ()) for product in products]
+            for field in self.FIELDS
+        }
+        self.sizes = {field: [mask.bit_count() for mask in masks] for field, masks in self.masks.items()}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def _amount(price: Any) -> float:
+        return float(price["amount"] if isinstance(price, dict) else price or 0)
+
+    def price_row(self, i: int) -> List[float]:
+        """prices[j] - prices[i] for every j"""
+        price = self.prices[i]
+        return [other - price for other in self.prices]
+
+    def jaccard_row(self, i: int, field: str) -> List[float]:
+        """Jaccard overlap of product i's `field` with every product's"""
+        mask, size = self.masks[field][i], self.sizes[field][i]
+        commons = [(mask & other).bit_count() for other in self.masks[field]]
+        return [common / union if (union := size + other_size - common) else 1.0
+                for common, other_size in zip(commons, self.sizes[field])]
+
+    def price_matrix(self) -> List[List[float]]:
+        return [self.price_row(i) for i in range(len(self))]
+
+    def jaccard_matrix(self, field: str) -> List[List[float]]:
+        return [self.jaccard_row(i, field) for i in range(len(self))]
+
+    def compare(self, i: int, j: int) -> Tuple[PriceComparison, IngredientsComparison, BenefitsComparison]:
+        """Pairwise comparison objects for products i and j"""
+        price = DeterministicCalculations.calculate_price_comparison(
+            self.prices[i], self.prices[j], self.names[i], self.names[j]
+        )
+        ingredients = IngredientsComparison(**self._overlap("key_ingredients", i, j))
+        benefits = BenefitsComparison(**self._overlap("benefits", i, j))
+        return price, ingredients, benefits
+
+    def _overlap(self, field: str, i: int, j: int) -> Dict[str, List[str]]:
+        a, b = self.masks[field][i], self.masks[field][j]
+        decode = self.vocabularies[field].decode
+        return {"common": decode(a & b), "unique_to_a": decode(a & ~b), "unique_to_b": decode(b & ~a)}
@@ -0,0 +1,183 @@
+import re
+from typing_extensions import Any, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+
+from ..model.schema import Product, PriceInfo
+
+
+class ProductParser:
+    """Rule-based parser for raw product records — the LLM is only needed when it is unsure"""
+
+    # Symbols and codes recognised before or after the amount
+    CURRENCIES = {
+        "₹": "INR", "rs.": "INR", "rs": "INR", "inr": "INR",
+        "$": "USD", "usd": "USD",
+        "€": "EUR", "eur": "EUR",
+        "£": "GBP", "gbp": "GBP",
+    }
+
+    SKIN_TYPES = {
+        "normal": "Normal",
+        "oily": "Oily",
+        "dry": "Dry",
+        "combination": "Combination",
+        "combo": "Combination",
+        "sensitive": "Sensitive",
+        "acne-prone": "Acne-prone",
+        "acne prone": "Acne-prone",
+        "mature": "Mature",
+        "all": "All",
+    }
+
+    TEXT_FIELDS = ("name", "concentration", "how_to_use", "side_effects")
+    LIST_FIELDS = ("key_ingredients", "benefits")
+
+    _CURRENCY_PATTERN = re.compile(
+        r"₹|\$|€|£|\b(?:rs\.?|inr|usd|eur|gbp)(?![a-z])", re.IGNORECASE
+    )
+    # One number group: digits joined only by grouping or decimal marks, never by spaces
+    _NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+
+    @classmethod
+    def parse(cls, raw: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Parse a raw record into a Product-shaped dict.
+
+        Returns the best-effort product and the list of confidence issues;
+        the product is only trustworthy when the issue list is empty.
+        """
+        issues: List[str] = []
+        product: Dict[str, Any] = {}
+
+        for field in cls.TEXT_FIELDS:
+            value = raw.get(field)
+            product[field] = str(value).strip() if value is not None else ""
+            if not product[field]:
+                issues.append(f"missing {field}")
+
+        for field in cls.LIST_FIELDS:
+            product[field] = cls.split_list(raw.get(field))
+            if not product[field]:
+                issues.append(f"missing {field}")
+
+        skin_types, unknown = cls.normalize_skin_types(raw.get("skin_types", raw.get("skin_type")))
+        product["skin_types"] = skin_types
+        if not skin_types:
+            issues.append("missing skin_types")
+        if unknown:
+            issues.append(f"unrecognised skin types {unknown}")
+
+        price = cls.parse_price(raw.get("price"))
+        if price is None:
+            issues.append(f"unparsable price {raw.get('price')!r}")
+            product["price"] = {"amount": 0, "currency": "INR", "display": str(raw.get("price", ""))}
+        else:
+            product["price"] = price.model_dump()
+
+        if not issues:
+            try:
+                product = Product.model_validate(product).model_dump()
+            except ValidationError as e:
+                issues.append(f"schema validation failed: {e.error_count()} error(s)")
+
+        return product, issues
+
+    @staticmethod
+    def split_list(value: Any, separators: str = r"[,;|\n]") -> List[str]:
+        """Split a delimited string (or pass through a list) into trimmed, de-duplicated items"""
+        if value is None:
+            return []
+        items = value if isinstance(value, (list, tuple)) else re.split(separators, str(value))
+
+        result, seen = [], set()
+        for item in items:
+            item = str(item).strip().strip(".")
+            if item and item.lower() not in seen:
+                seen.add(item.lower())
+                result.append(item)
+        return result
+
+    @classmethod
+    def normalize_skin_types(cls, value: Any) -> Tuple[List[str], List[str]]:
+        """Map skin types onto canonical names; returns (normalised, unrecognised)"""
+        normalized, unknown = [], []
+        for item in cls.split_list(value, separators=r"[,;|/&\n]|\band\b"):
+            key = re.sub(r"\s+", " ", item.lower())
+            key = re.sub(r"\s*(skin types?|skin)$", "", key).strip()
+            canonical = cls.SKIN_TYPES.get(key)
+            if canonical is None:
+                unknown.append(item)
+                canonical = item.title()
+            if canonical not in normalized:
+                normalized.append(canonical)
+        return normalized, unknown
+
+    @classmethod
+    def parse_price(cls, value: Any) -> Optional[PriceInfo]:
+        """
+        Parse '₹1,299', '$29.99', '1.299,50 €', 699 or a PriceInfo-shaped dict.
+
+        Returns None — so the LLM parses the record instead — unless the text
+        holds exactly one number group, sitting right next to the currency
+        symbol or code when there is one. '₹699 30ml', '30ml for ₹699' and
+        '₹699 - ₹899' are all ambiguous.
+        """
+        if isinstance(value, dict):
+            try:
+                return PriceInfo.model_validate(value)
+            except ValidationError:
+                return None
+        if isinstance(value, bool) or value is None:
+            return None
+        if isinstance(value, (int, float)):
+            price = PriceInfo(amount=value, currency="INR", display="")
+            price.display = price.formatted
+            return price if value > 0 else None
+
+        text = str(value).strip()
+        numbers = list(cls._NUMBER_PATTERN.finditer(text))
+        currencies = list(cls._CURRENCY_PATTERN.finditer(text))
+        if len(numbers) != 1 or len(currencies) > 1:
+            return None
+        number_match = numbers[0]
+        currency_match = currencies[0] if currencies else None
+        if currency_match and not cls._adjacent(text, currency_match, number_match):
+            return None
+
+        amount = cls._parse_amount(number_match.group())
+        if amount is None or amount <= 0:
+            return None
+
+        currency = cls.CURRENCIES[currency_match.group().lower()] if currency_match else "INR"
+        return PriceInfo(amount=amount, currency=currency, display=text)
+
+    @staticmethod
+    def _adjacent(text: str, currency: re.Match, number: re.Match) -> bool:
+        """Whether only whitespace separates the currency from the amount ('₹ 699', '15 GBP')"""
+        if currency.end() <= number.start():
+            return not text[currency.end():number.start()].strip()
+        return not text[number.end():currency.start()].strip()
+
+    @staticmethod
+    def _parse_amount(number: str) -> Optional[float]:
+        """Resolve thousands separators vs decimal marks in a numeric string"""
+        if "," in number and "." in number:
+            # Whichever separator comes last is the decimal mark
+            decimal = "," if number.rfind(",") > number.rfind(".") else "."
+            thousands = "." if decimal == "," else ","
+            number = number.replace(thousands, "").replace(decimal, ".")
+        elif "," in number:
+            groups = number.split(",")
+            # 1,299 / 1,00,000 are grouping; 12,5 is a decimal comma
+            if len(groups[-1]) == 3:
+                number = number.replace(",", "")
+            elif len(groups) == 2:
+                number = number.replace(",", ".")
+            else:
+                return None
+        elif number.count(".") > 1:
+            number = number.replace(".", "")
+        try:
+            return float(number)
+        except ValueError:
+            return None
@@ -1,10 +1,12 @@
 from langgraph.graph import StateGraph,END
 from langchain_groq.chat_models import ChatGroq
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.base import BaseCheckpointSaver
 
 from .state import AgentState
 from .config import config
 
-from typing_extensions import Dict,Any
+from typing_extensions import Dict,Any,AsyncIterator,Callable,Collection,Iterable,Iterator,Mapping,Optional,Set,Tuple
 from .Agents.data_parser import DataParserAgent
 from .Agents.question_generator import QuestionGeneratorAgent
 from .Agents.faq_page import FAQPageAgent
@@ -16,43 +18,98 @@ from .Agents.ingredients_block import IngredientsBlockAgent
 from .Agents.overview_block import OverviewBlockAgent
 from .Agents.safety_block import SafetyBlockAgent
 from .Agents.usage_block import UsageBlockAgent
+from .Agents.content_blocks import ContentBlocksAgent
+from .logic.competitor_index import CompetitorIndex
+from .logic.product_parser import ProductParser
+from .utils.llm_cache import get_llm_cache
+from .utils.ingredient_memo import get_ingredient_memo
+from .utils.question_library import get_question_library
+from .utils.metrics import metrics
+from .utils.bundle import BundleReader, BundleWriter, index_path
+from .utils.output_writer import ResultWriter, product_dir, write_atomic, write_json_atomic, write_pages
+from .utils.tracing import tracer
+from .utils.llm import RoutedModel
+from .utils.incremental import incremental_node
+from .utils.checkpoint import SqliteCheckpointSaver
 
 import os
 import json
 import errno
+import asyncio
+import argparse
+import time
+import xxhash
 from pathlib import Path
 
 class ContentGeneration:
     """Main orchestrator using LangGraph"""
     
-    def __init__(self):
-        # Initialize LLM
-        self.llm = ChatGroq(
-            model=config.LLM_MODEL,     
-            api_key=config.GROQ_API_KEY,
-            # Force-disable any possibility of usage of tools like search 
-            # tools=[],                   
-            # tool_choice={"type": "auto", "disable_parallel_tool_use": True},
-        )
+    def __init__(self, llm=None, checkpointer: Optional[BaseCheckpointSaver] = None,
+                 llm_factory: Optional[Callable[[str], Any]] = None, competitors: Optional[CompetitorIndex] = None):
+        # Initialize LLM (an already-built chat model can be injected). Per-node
+        # routing needs a factory that builds a model by name; an injected
+        # model without one serves every node. A catalog index of competitors
+        # lets Product B be a real product instead of an invented one.
+        if llm_factory is None and llm is None:
+            llm_factory = self._chat_groq
+        self.llm_factory = llm_factory
+        self._models = {}
+        self.llm = llm or self._model(config.LLM_MODEL)
 
         # Initialize all agents
-        self.data_parser = DataParserAgent(self.llm)
-        self.question_generator = QuestionGeneratorAgent(self.llm)
-        self.product_b_generator = ProductBGeneratorAgent(self.llm)
+        self.data_parser = DataParserAgent(self._llm_for("parse_data"))
+        self.question_generator = QuestionGeneratorAgent(self._llm_for("generate_questions"))
+        self.product_b_generator = ProductBGeneratorAgent(self._llm_for("generate_product_b"), competitors=competitors)
 
-        self.benefits_agent = BenefitsBlockAgent(self.llm)
-        self.usage_agent = UsageBlockAgent(self.llm)
-        self.ingredients_agent = IngredientsBlockAgent(self.llm)
-        self.safety_agent = SafetyBlockAgent(self.llm)
-        self.overview_agent = OverviewBlockAgent(self.llm)
+        self.benefits_agent = BenefitsBlockAgent(self._llm_for("generate_benefits"))
+        self.usage_agent = UsageBlockAgent(self._llm_for("generate_usage"))
+        self.ingredients_agent = IngredientsBlockAgent(self._llm_for("generate_ingredients"))
+        self.safety_agent = SafetyBlockAgent(self._llm_for("generate_safety"))
+        self.overview_agent = OverviewBlockAgent(self._llm_for("generate_overview"))
+        self.content_blocks_agent = ContentBlocksAgent(self._llm_for("generate_content_blocks"), {
+            "benefits_block": self.benefits_agent,
+            "usage_block": self.usage_agent,
+            "ingredients_block": self.ingredients_agent,
+            "safety_block": self.safety_agent,
+            "overview_block": self.overview_agent,
+        })
 
-        self.faq_builder = FAQPageAgent(self.llm)
-        self.product_page_builder = ProductPageAgent(self.llm)
-        self.comparison_builder = ComparisonPageAgent(self.llm)
+        self.faq_builder = FAQPageAgent(self._llm_for("build_faq"))
+        self.product_page_builder = ProductPageAgent(self._llm_for("build_product_page"))
+        self.comparison_builder = ComparisonPageAgent(self._llm_for("build_comparison"))
+
+        # Checkpoint store — lets a product's run resume after a crash
+        if checkpointer is None and config.CHECKPOINT_ENABLED:
+            checkpointer = SqliteCheckpointSaver(config.CHECKPOINT_PATH)
+        self.checkpointer = checkpointer
 
         # Build the graph
         self.graph = self._build_graph()
     
+    @staticmethod
+    def _chat_groq(model: str):
+        return ChatGroq(
+            model=model,     
+            api_key=config.GROQ_API_KEY,
+            # Force-disable any possibility of usage of tools like search 
+            # tools=[],                   
+            # tool_choice={"type": "auto", "disable_parallel_tool_use": True},
+        )
+
+    def _model(self, model: str):
+        """One chat model instance per model name"""
+        if model not in self._models:
+            self._models[model] = self.llm_factory(model)
+        return self._models[model]
+
+    def _llm_for(self, node: str):
+        """Model for a graph node: LLM_MODEL unless config routes the node elsewhere"""
+        model = config.LLM_NODE_MODELS.get(node, config.LLM_MODEL)
+        if self.llm_factory is None or model == config.LLM_MODEL:
+            return self.llm
+        escalation = self.llm if config.LLM_ESCALATE_ON_INVALID else None
+        return RoutedModel(self._model(model), escalation=escalation)
+
     def _build_graph(self) -> StateGraph:
         """Build the LangGraph workflow"""
         
@@ -61,23 +118,35 @@ class ContentGeneration:
         def checkpoint(_state):
             return {} 
 
-        # Add nodes
-        workflow.add_node("parse_data", self.data_parser.parse)
+        async def acheckpoint(_state):
+            return {}
+
+        # Add nodes — each pairs the blocking agent method with its async
+        # twin, so graph.invoke stays sync while graph.ainvoke keeps every
+        # branch of the fan-out on the event loop instead of worker threads.
+        # Agent nodes also reuse their previous output when the state fields
+        # they read are unchanged (see utils/incremental.py)
+        workflow.add_node("parse_data", incremental_node("parse_data", self.data_parser, self.data_parser.parse, self.data_parser.aparse))
 
-        workflow.add_node("parse_data_checkpoint", checkpoint)
+        workflow.add_node("parse_data_checkpoint", RunnableLambda(checkpoint, afunc=acheckpoint))
 
-        workflow.add_node("generate_questions", self.question_generator.generate)
-        workflow.add_node("generate_product_b", self.product_b_generator.generate)
+        workflow.add_node("generate_questions", incremental_node("generate_questions", self.question_generator, self.question_generator.generate, self.question_generator.agenerate))
+        workflow.add_node("generate_product_b", incremental_node("generate_product_b", self.product_b_generator, self.product_b_generator.generate, self.product_b_generator.agenerate))
 
-        workflow.add_node("generate_benefits", self.benefits_agent.generate)
-        workflow.add_node("generate_usage", self.usage_agent.generate)
-        workflow.add_node("generate_ingredients", self.ingredients_agent.generate)
-        workflow.add_node("generate_safety", self.safety_agent.generate)
-        workflow.add_node("generate_overview", self.overview_agent.generate)
+        if config.CONTENT_BLOCKS_MODE == "fused":
+            workflow.add_node("generate_content_blocks", incremental_node("generate_content_blocks", self.content_blocks_agent, self.content_blocks_agent.generate, self.content_blocks_agent.agenerate))
+            block_nodes = ["generate_content_blocks"]
+        else:
+            workflow.add_node("generate_benefits", incremental_node("generate_benefits", self.benefits_agent, self.benefits_agent.generate, self.benefits_agent.agenerate))
+            workflow.add_node("generate_usage", incremental_node("generate_usage", self.usage_agent, self.usage_agent.generate, self.usage_agent.agenerate))
+            workflow.add_node("generate_ingredients", incremental_node("generate_ingredients", self.ingredients_agent, self.ingredients_agent.generate, self.ingredients_agent.agenerate))
+            workflow.add_node("generate_safety", incremental_node("generate_safety", self.safety_agent, self.safety_agent.generate, self.safety_agent.agenerate))
+            workflow.add_node("generate_overview", incremental_node("generate_overview", self.overview_agent, self.overview_agent.generate, self.overview_agent.agenerate))
+            block_nodes = ["generate_benefits", "generate_usage", "generate_ingredients", "generate_safety", "generate_overview"]
         
-        workflow.add_node("build_faq", self.faq_builder.build)
-        workflow.add_node("build_product_page", self.product_page_builder.build)
-        workflow.add_node("build_comparison", self.comparison_builder.build)
+        workflow.add_node("build_faq", incremental_node("build_faq", self.faq_builder, self.faq_builder.build, self.faq_builder.abuild))
+        workflow.add_node("build_product_page", incremental_node("build_product_page", self.product_page_builder, self.product_page_builder.build, self.product_page_builder.abuild))
+        workflow.add_node("build_comparison", incremental_node("build_comparison", self.comparison_builder, self.comparison_builder.build, self.comparison_builder.abuild))
 
         # Define edges
         workflow.set_entry_point("parse_data")
@@ -86,20 +155,14 @@ class ContentGeneration:
 
         # All generation agents depend on parser
         workflow.add_edge("parse_data_checkpoint", "generate_questions")
-        workflow.add_edge("parse_data_checkpoint", "generate_benefits")
-        workflow.add_edge("parse_data_checkpoint", "generate_usage")
-        workflow.add_edge("parse_data_checkpoint", "generate_ingredients")
-        workflow.add_edge("parse_data_checkpoint", "generate_safety")
-        workflow.add_edge("parse_data_checkpoint", "generate_overview")
+        for node in block_nodes:
+            workflow.add_edge("parse_data_checkpoint", node)
         workflow.add_edge("parse_data_checkpoint", "generate_product_b")
         
         # Page builders depend on their respective inputs
         workflow.add_edge("generate_questions", "build_faq")
-        workflow.add_edge("generate_benefits", "build_product_page")
-        workflow.add_edge("generate_usage", "build_product_page")
-        workflow.add_edge("generate_ingredients", "build_product_page")
-        workflow.add_edge("generate_safety", "build_product_page")
-        workflow.add_edge("generate_overview", "build_product_page")
+        for node in block_nodes:
+            workflow.add_edge(node, "build_product_page")
         workflow.add_edge("generate_product_b", "build_comparison")
         
         # All end
@@ -107,12 +170,11 @@ class ContentGeneration:
         workflow.add_edge("build_product_page", END)
         workflow.add_edge("build_comparison", END)
 
-        return workflow.compile()
+        return workflow.compile(checkpointer=self.checkpointer)
     
-    def execute(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute the entire pipeline"""
-            
-        initial_state = {
+    def _initial_state(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Fresh pipeline state for one product"""
+        return {
             "raw_product_data": product_data,
             "product_model": {},
             "product_b_model": {},
@@ -121,18 +183,383 @@ class ContentGeneration:
             "faq_page": {},
             "product_page": {},
             "comparison_page": {},
+            "input_fingerprints": {},
             "logs": [],
             "errors": []
         }
+
+    def _run_config(self, thread_id: str, previous_state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        # Checkpoints are keyed by product ID: one LangGraph thread per product
+        return {"configurable": {"thread_id": thread_id, "previous_state": previous_state}}
+
+    def execute(self, product_data: Dict[str, Any], previous_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Execute the entire pipeline.
+
+        Pass the final state of an earlier run as `previous_state` to re-execute
+        only the nodes whose inputs changed and reuse prior outputs for the rest.
+        Any checkpoint left for this product by an earlier run is discarded.
+        """
+        thread_id = product_id(product_data)
+        if self.checkpointer is not None:
+            self.checkpointer.delete_thread(thread_id)
         
         # Run the graph
-        final_state = self.graph.invoke(initial_state)
+        with tracer.span("pipeline", "product", track="pipeline", product_id=thread_id):
+            final_state = self.graph.invoke(self._initial_state(product_data), self._run_config(thread_id, previous_state))
         
         return final_state
 
-def main():
+    async def aexecute(self, product_data: Dict[str, Any], previous_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Execute the entire pipeline on the running event loop"""
+        thread_id = product_id(product_data)
+        if self.checkpointer is not None:
+            await self.checkpointer.adelete_thread(thread_id)
+        with tracer.span("pipeline", "product", track="pipeline", product_id=thread_id):
+            return await self.graph.ainvoke(self._initial_state(product_data), self._run_config(thread_id, previous_state))
+
+    def resume(self, thread_id: str, previous_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Continue a product's run from its last checkpoint.
+
+        Nodes that completed before the interruption — including finished
+        branches of a partially completed fan-out — are not executed again.
+        A run that already finished returns its final state unchanged.
+        """
+        self._require_checkpointer()
+        run_config = self._run_config(thread_id, previous_state)
+        snapshot = self.graph.get_state(run_config)
+        if not snapshot.values:
+            raise KeyError(f"No checkpoint for product {thread_id!r}")
+        if not snapshot.next:
+            return snapshot.values
+        with tracer.span("pipeline (resumed)", "product", track="pipeline", product_id=thread_id):
+            return self.graph.invoke(None, run_config)
+
+    async def aresume(self, thread_id: str, previous_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async variant of resume"""
+        self._require_checkpointer()
+        run_config = self._run_config(thread_id, previous_state)
+        snapshot = await self.graph.aget_state(run_config)
+        if not snapshot.values:
+            raise KeyError(f"No checkpoint for product {thread_id!r}")
+        if not snapshot.next:
+            return snapshot.values
+        with tracer.span("pipeline (resumed)", "product", track="pipeline", product_id=thread_id):
+            return await self.graph.ainvoke(None, run_config)
+
+    async def arelease_checkpoint(self, thread_id: str) -> bool:
+        """
+        Delete a product's checkpoints once its run has finished. A thread
+        whose run was interrupted is kept so it can be resumed.
+        """
+        if self.checkpointer is None:
+            return False
+        snapshot = await self.graph.aget_state(self._run_config(thread_id, None))
+        if snapshot.next:
+            return False
+        await self.checkpointer.adelete_thread(thread_id)
+        return True
+
+    def _require_checkpointer(self) -> None:
+        if self.checkpointer is None:
+            raise RuntimeError("Checkpointing is disabled (CHECKPOINT_ENABLED=false); nothing to resume")
+
+    async def _aexecute_or_resume(self, product_data: Dict[str, Any], previous_state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Resume the product's checkpointed run if it was for the same input, else start fresh"""
+        thread_id = product_id(product_data)
+        if self.checkpointer is not None:
+            snapshot = await self.graph.aget_state(self._run_config(thread_id, previous_state))
+            if snapshot.values.get("raw_product_data") == product_data:
+                return await self.aresume(thread_id, previous_state)
+        return await self.aexecute(product_data, previous_state)
+
+    async def astream_catalog(
+        self,
+        products: Iterable[Dict[str, Any]],
+        concurrency: Optional[int] = None,
+        previous_states: Optional[Mapping[str, Dict[str, Any]]] = None,
+        resume: bool = False,
+        skip: Collection[str] = (),
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Run one graph per product with at most `concurrency` in flight.
+
+        Yields (index, final_state) in completion order. Products are pulled
+        from `products` lazily, so a large catalog is never held in memory.
+        A product whose graph raises still yields a state carrying the error.
+        `previous_states` maps product_id to the final state of an earlier run
+        for incremental regeneration. With `resume`, products whose checkpoint
+        matches their input continue from it instead of starting over, so an
+        interrupted catalog job only pays for the work it had not finished.
+        Products whose product_id is in `skip` (already written by the
+        interrupted job) are not run at all.
+        """
+        previous_states = previous_states or {}
+        concurrency = max(1, concurrency or config.BATCH_CONCURRENCY)
+        pending = {}
+        products = iter(enumerate(products))
+
+        def refill():
+            for index, product_data in products:
+                if product_id(product_data) in skip:
+                    continue
+                previous_state = previous_states.get(product_id(product_data))
+                run = self._aexecute_or_resume if resume else self.aexecute
+                # The task copies the context, so its spans land on the product's own trace process
+                with tracer.process(product_id(product_data)):
+                    pending[asyncio.ensure_future(run(product_data, previous_state))] = (index, product_data)
+                if len(pending) >= concurrency:
+                    return
+
+        refill()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index, product_data = pending.pop(task)
+                if task.exception() is not None:
+                    yield index, {
+                        "raw_product_data": product_data,
+                        "errors": [f"[ContentGeneration] Pipeline failed: {task.exception()}"],
+                        "interrupted": True,
+                    }
+                else:
+                    yield index, task.result()
+            refill()
+
+
+# State keys carried between runs for incremental regeneration
+REUSABLE_STATE_KEYS = (
+    "product_model", "product_b_model", "questions",
+    "benefits_block", "usage_block", "ingredients_block", "safety_block", "overview_block",
+    "faq_page", "product_page", "comparison_page", "input_fingerprints",
+)
+
+
+# Fields that tell SKUs apart when a catalog record carries no `id`. Price
+# and descriptive copy are left out, so editing them keeps the identifier
+# and --previous can still reuse the product's earlier outputs.
+IDENTITY_FIELDS = ("name", "concentration", "size", "volume", "variant")
+
+
+def product_id(product_data: Dict[str, Any]) -> str:
+    """
+    Stable product identifier: the catalog `id`, or a hash of the product's
+    normalized identity fields — two sizes or strengths of one product
+    never share an identifier.
+    """
+    if product_data.get("id"):
+        return str(product_data["id"])
+    identity = "\x1f".join(" ".join(str(product_data.get(field) or "").lower().split())
+                           for field in IDENTITY_FIELDS)
+    return f"prod_{xxhash.xxh64_hexdigest(identity)[:12]}"
+
+
+def read_previous_states(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    product_id -> reusable state from an earlier catalog results file.
+    Slim records written alongside a page bundle get their pages back from it.
+    """
+    states, bundles = {}, {}
+    for record in read_catalog(path):
+        state = record.get("state")
+        if not state or record.get("interrupted"):
+            continue
+        if record.get("bundle"):
+            if record["bundle"] not in bundles:
+                bundles[record["bundle"]] = BundleReader(record["bundle"])
+            bundle = bundles[record["bundle"]]
+            if record["product_id"] in bundle:
+                state = {**state, **bundle.pages(record["product_id"])}
+        states[record["product_id"]] = state
+    return states
+
+
+def finished_products(path: str) -> Set[str]:
+    """
+    product_ids an earlier run of a results file got through: the latest
+    record of each product, unless its pipeline was interrupted (its
+    checkpoint is kept for --resume) or, for a slim record, its pages never
+    reached the bundle index. A half-written last line is ignored.
+    """
+    latest, bundles = {}, {}
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            latest[record["product_id"]] = record
+
+    def in_bundle(record) -> bool:
+        if not record.get("bundle"):
+            return True
+        if record["bundle"] not in bundles:
+            exists = os.path.exists(index_path(record["bundle"]))
+            bundles[record["bundle"]] = BundleReader(record["bundle"]) if exists else ()
+        return record["product_id"] in bundles[record["bundle"]]
+
+    return {pid for pid, record in latest.items() if not record.get("interrupted") and in_bundle(record)}
+
+
+def build_competitor_index(products: Iterable[Dict[str, Any]]) -> CompetitorIndex:
+    """Index the catalog products the rule-based parser is sure about"""
+    index = CompetitorIndex()
+    for raw in products:
+        product, issues = ProductParser.parse(raw)
+        if not issues:
+            index.add(product)
+    return index
+
+
+def read_catalog(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield product dicts from a JSONL catalog, one product per line"""
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON line: {e}") from e
+
+
+def write_metrics(run: Dict[str, Any], json_path: Optional[str] = None, prom_path: Optional[str] = None) -> None:
+    """Write the run's per-node metrics as a JSON summary and/or Prometheus text"""
+    if json_path:
+        write_json_atomic(json_path, {"run": run, **metrics.summary()})
+        print(f"  ✓: Metrics summary: {json_path}")
+    if prom_path:
+        write_atomic(prom_path, metrics.prometheus().encode())
+        print(f"  ✓: Prometheus metrics: {prom_path}")
+
+
+def write_trace(path: Optional[str]) -> None:
+    """Write the recorded trace events, if tracing was started, for chrome://tracing or Perfetto"""
+    if path and tracer.enabled:
+        tracer.stop()
+        tracer.write(path)
+        print(f"  ✓: Trace: {path}")
+
+
+async def run_catalog(catalog_path: str, output_path: str, concurrency: int,
+                      previous_path: Optional[str] = None, resume: bool = False,
+                      metrics_json: Optional[str] = None, metrics_prom: Optional[str] = None,
+                      pages_dir: Optional[str] = None, bundle_path: Optional[str] = None) -> None:
+    """Stream a JSONL catalog through the pipeline, appending results as they finish"""
+    started = time.time()
+    competitors = None
+    if config.COMPETITOR_INDEX_ENABLED:
+        competitors = build_competitor_index(read_catalog(catalog_path))
+        print(f" Indexed {len(competitors)} catalog products as competitors")
+    orchestrator = ContentGeneration(competitors=competitors)
+    previous_states = read_previous_states(previous_path) if previous_path else None
+    # A resumed job keeps what the interrupted one wrote and only runs the rest
+    finished = finished_products(output_path) if resume else set()
+    if finished:
+        print(f" Resuming: {len(finished)} products already in {output_path}")
+
+    completed = failed = 0
+    # Serialisation and disk writes run on the writer's thread, off the event loop
+    bundle = BundleWriter(bundle_path, append=resume) if bundle_path else None
+    with ResultWriter(output_path, pages_dir, bundle, append=resume) as writer:
+        async for index, results in orchestrator.astream_catalog(read_catalog(catalog_path), concurrency,
+                                                                 previous_states, resume, skip=finished):
+            record = {
+                "index": index,
+                "product_id": product_id(results["raw_product_data"]),
+                "faq_page": results.get("faq_page", {}),
+                "product_page": results.get("product_page", {}),
+                "comparison_page": results.get("comparison_page", {}),
+                "errors": results.get("errors", []),
+                "interrupted": bool(results.get("interrupted")),
+                "state": {key: results.get(key) for key in REUSABLE_STATE_KEYS},
+            }
+            # Checkpoints go only once a product's output is on disk — with a
+            # bundle, when the frame holding its pages has been written
+            for done in await writer.awrite(record):
+                await orchestrator.arelease_checkpoint(done)
+
+            completed += 1
+            failed += bool(record["errors"])
+            print(f"  ✓: [{completed}] {record['product_id']} ({len(record['errors'])} errors)")
+        for done in await writer.aflush():
+            await orchestrator.arelease_checkpoint(done)
+
+    print(f"\n Finished {completed} products ({failed} with errors) → {output_path}")
+    if pages_dir:
+        print(f" Page files by product ID → {pages_dir}")
+    if bundle is not None:
+        ratio = bundle.raw_bytes / max(1, bundle.compressed_bytes)
+        print(f" Page bundle: {bundle.compressed_bytes} bytes ({ratio:.1f}x compressed) → {bundle_path}")
+
+    cache = get_llm_cache()
+    if cache is not None:
+        stats = cache.stats()
+        print(f" LLM cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%}), {stats['entries']} entries")
+
+    memo = get_ingredient_memo()
+    if memo is not None:
+        stats = memo.stats()
+        print(f" Ingredient memo: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} ingredients")
+
+    library = get_question_library()
+    if library is not None:
+        stats = library.stats()
+        print(f" Question library: {stats['seeded']} of {stats['categories']} categories seeded")
+
+    print("\n Per-node metrics:")
+    print(metrics.report())
+    write_metrics({"mode": "catalog", "started_at": started, "seconds": round(time.time() - started, 3),
+                   "products": completed, "with_errors": failed}, metrics_json, metrics_prom)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Multi-agent product content generation")
+    parser.add_argument("--catalog", help="JSONL file with one product per line (batch mode)")
+    parser.add_argument("--concurrency", type=int, default=config.BATCH_CONCURRENCY,
+                        help="Maximum number of product pipelines in flight (batch mode)")
+    parser.add_argument("--out", default=None,
+                        help="JSONL results file for batch mode (default: output/catalog_results.jsonl)")
+    parser.add_argument("--pages-dir", default=None,
+                        help="Also write each product's page files to <dir>/<product id>/ (batch mode)")
+    parser.add_argument("--bundle", default=None,
+                        help="Append every page to this zstd-compressed, indexed JSONL bundle; results records then "
+                             "keep no page bodies (batch mode)")
+    parser.add_argument("--previous", default=None,
+                        help="Results file of an earlier batch run; unchanged nodes reuse its outputs")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted batch run: products already in --out are kept and skipped, "
+                             "the rest continue from their last checkpoint")
+    parser.add_argument("--metrics-json", default=None,
+                        help="Write a JSON summary of per-node metrics for the run to this file")
+    parser.add_argument("--metrics-prom", default=None,
+                        help="Write per-node metrics in Prometheus text format to this file")
+    parser.add_argument("--trace", default=None,
+                        help="Write a Chrome/Perfetto trace of nodes, LLM calls and retries to this file")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main execution function"""
     
+    args = parse_args(argv)
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    if args.trace:
+        tracer.start()
+
+    if args.catalog:
+        print(f"\n\nCatalog batch mode — concurrency {args.concurrency}")
+        print("=" * 60)
+        output_path = args.out or str(Path(current_dir) / "output" / "catalog_results.jsonl")
+        asyncio.run(run_catalog(args.catalog, output_path, args.concurrency, args.previous, args.resume,
+                                args.metrics_json, args.metrics_prom, args.pages_dir, args.bundle))
+        write_trace(args.trace)
+        return
+
     PRODUCT_DATA = {
         "name": "GlowBoost Vitamin C Serum",
         "concentration": "10% Vitamin C",
@@ -150,41 +577,30 @@ def main():
     orchestrator = ContentGeneration()
     
     print("\n Executing pipeline with structured outputs...\n")
+    started = time.time()
     results = orchestrator.execute(PRODUCT_DATA)
+    write_metrics({"mode": "single", "started_at": started, "seconds": round(time.time() - started, 3),
+                   "products": 1, "with_errors": int(bool(results.get("errors")))},
+                  args.metrics_json, args.metrics_prom)
+    write_trace(args.trace)
     
-    # Save outputs
-    current_dir = os.path.dirname(os.path.abspath(__file__))
+    # Save outputs — one directory per product, so products never overwrite each other
     output_dir = Path(current_dir) / "output"
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    outputs = {
-        "faq.json": results["faq_page"],
-        "product_page.json": results["product_page"],
-        "comparison_page.json": results["comparison_page"]
-    }
     
     print("\n Saving outputs:")
     print("-" * 60)
-    for filename, content in outputs.items():
-        filepath = output_dir / filename
-        save_json_safely(content, filepath)
+    save_pages_safely(output_dir, product_id(PRODUCT_DATA), results)
 
-def save_json_safely(data: dict, filepath: str) -> None:
+def save_pages_safely(output_dir: Path, pid: str, results: Dict[str, Any]) -> None:
     """
-    Safely save JSON with proper error handling and user-friendly messages.
+    Safely save a product's pages with proper error handling and user-friendly messages.
+    Each file is written to a temporary file and renamed into place, so a
+    crash never leaves a truncated page behind.
     """
+    filepath = product_dir(output_dir, pid)
     try:
-        # Ensure parent directory exists
-        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
-
-        # Write with atomic safety (temp file + rename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        
-        # Atomic replace (avoids partial writes)
-        os.replace(filepath, filepath)
-        
-        print(f"  ✓: Saved: {filepath}")
+        for saved in write_pages(output_dir, pid, results):
+            print(f"  ✓: Saved: {saved}")
 
     except PermissionError as e:
         print(f"  Failed: Permission denied: Cannot write to {filepath}")
@@ -27,6 +27,9 @@ class AgentState(TypedDict):
     product_page: Dict[str, Any]
     comparison_page: Dict[str, Any]
     
+    # Incremental regeneration — node name -> fingerprint of the inputs it read
+    input_fingerprints: Annotated[dict, lambda x, y: {**x, **y}]
+    
     # Metadata
     logs: Annotated[List[str], add]
     errors: Annotated[List[str], add]
\ No newline at end of file
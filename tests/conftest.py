@@ -1,5 +1,22 @@
 import pytest
-from pathlib import Path
+
+from ..benchmarks.fake_llm import RAW_PRODUCT, DescribingModel, QuestioningModel
+
+
+@pytest.fixture
+def raw_product():
+    return dict(RAW_PRODUCT)
+
+
+@pytest.fixture
+def describing_model():
+    return DescribingModel()
+
+
+@pytest.fixture
+def questioning_model():
+    return QuestioningModel()
+
 
 @pytest.fixture
 def sample_product_data():
@@ -12,4 +29,28 @@ def sample_product_data():
         "how_to_use": "Apply 3-4 drops in the morning",
         "side_effects": "Mild tingling possible",
         "price": {"amount": 899, "currency": "INR", "display": "₹899"}
-    }
\ No newline at end of file
+    }
+
+@pytest.fixture(autouse=True)
+def no_persistent_state(monkeypatch):
+    """Keep tests off the response cache, ingredient memo, question library, checkpoint store, rate limiter and retry backoff unless a test opts in"""
+    from ..config import config
+    monkeypatch.setattr(config, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "INGREDIENT_MEMO_ENABLED", False)
+    monkeypatch.setattr(config, "QUESTION_LIBRARY_ENABLED", False)
+    monkeypatch.setattr(config, "CHECKPOINT_ENABLED", False)
+    monkeypatch.setattr(config, "LLM_REQUESTS_PER_MINUTE", 0)
+    monkeypatch.setattr(config, "LLM_TOKENS_PER_MINUTE", 0)
+    monkeypatch.setattr(config, "LLM_RETRY_BASE_DELAY", 0)
+
+
+@pytest.fixture
+def offline_llm():
+    """Chat model stand-in whose every call fails, so agents take their deterministic fallbacks"""
+    from unittest.mock import MagicMock, AsyncMock
+
+    llm = MagicMock()
+    for runnable in (llm, llm.with_structured_output.return_value):
+        runnable.invoke.side_effect = ConnectionError("offline")
+        runnable.ainvoke = AsyncMock(side_effect=ConnectionError("offline"))
+    return llm
@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+from ..main import ContentGeneration, product_id, read_catalog
+from ..benchmarks.fake_llm import FakeChatModel, FakeStructuredLLM
+
+
+def _collect(orchestrator, products, concurrency):
+    async def run():
+        return [item async for item in orchestrator.astream_catalog(products, concurrency)]
+    return asyncio.run(run())
+
+
+def test_catalog_yields_every_product(offline_llm, raw_product):
+    orchestrator = ContentGeneration(llm=offline_llm)
+    products = [{**raw_product, "name": f"Serum {i}"} for i in range(5)]
+
+    results = _collect(orchestrator, iter(products), concurrency=2)
+
+    assert sorted(index for index, _ in results) == list(range(5))
+    for index, state in results:
+        assert state["raw_product_data"]["name"] == f"Serum {index}"
+        assert state["product_page"]["hero"]["product_name"] == f"Serum {index}"
+
+
+def test_catalog_bounds_in_flight_pipelines(offline_llm, raw_product, monkeypatch):
+    orchestrator = ContentGeneration(llm=offline_llm)
+    in_flight = peak = 0
+
+    async def fake_aexecute(product_data, previous_state=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"raw_product_data": product_data}
+
+    monkeypatch.setattr(orchestrator, "aexecute", fake_aexecute)
+    results = _collect(orchestrator, [raw_product] * 10, concurrency=3)
+
+    assert len(results) == 10
+    assert peak == 3
+
+
+def test_catalog_reports_failed_product_without_stopping(offline_llm, monkeypatch):
+    orchestrator = ContentGeneration(llm=offline_llm)
+
+    async def fake_aexecute(product_data, previous_state=None):
+        if product_data["name"] == "bad":
+            raise RuntimeError("boom")
+        return {"raw_product_data": product_data, "errors": []}
+
+    monkeypatch.setattr(orchestrator, "aexecute", fake_aexecute)
+    results = dict(_collect(orchestrator, [{"name": "ok"}, {"name": "bad"}], concurrency=2))
+
+    assert results[0]["errors"] == []
+    assert "boom" in results[1]["errors"][0]
+
+
+def test_read_catalog_skips_blank_lines(tmp_path, raw_product):
+    catalog = tmp_path / "catalog.jsonl"
+    catalog.write_text(json.dumps(raw_product) + "\n\n" + json.dumps({"id": "sku-1"}) + "\n")
+
+    products = list(read_catalog(str(catalog)))
+
+    assert len(products) == 2
+    assert product_id(products[1]) == "sku-1"
+    assert product_id(products[0]) == product_id(dict(raw_product))
+
+
+def test_async_path_never_calls_blocking_llm(raw_product, monkeypatch):
+    llm = FakeChatModel(latency=0)
+
+    def blocking_call(*args, **kwargs):
+        raise AssertionError("sync LLM call on the async path")
+
+    monkeypatch.setattr(FakeStructuredLLM, "invoke", blocking_call)
+    monkeypatch.setattr(llm, "invoke", blocking_call)
+    orchestrator = ContentGeneration(llm=llm)
+
+    state = asyncio.run(orchestrator.aexecute(raw_product))
+
+    assert state["errors"] == []
+    assert state["faq_page"]["template"] == "faq_v1"
+    # 9 generation calls — parse_data and build_product_page need no LLM
+    assert llm.calls == 9
+
+
+def test_same_name_skus_get_distinct_ids(raw_product):
+    strong = {**raw_product, "concentration": "20% Vitamin C"}
+    travel = {**raw_product, "size": "10ml"}
+
+    ids = {product_id(raw_product), product_id(strong), product_id(travel)}
+
+    assert len(ids) == 3
+    # Price and copy edits keep the identifier, so --previous still matches the product
+    assert product_id({**raw_product, "price": "₹749", "benefits": "Brightening"}) == product_id(raw_product)
+    assert product_id({**raw_product, "name": "  glowboost VITAMIN C  serum"}) == product_id(raw_product)
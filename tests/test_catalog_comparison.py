@@ -0,0 +1,30 @@
+from ..logic.deterministic import CatalogComparison, DeterministicCalculations
+
+PRODUCTS = [
+    {"name": "Serum A", "price": {"amount": 699, "currency": "INR", "display": "₹699"},
+     "key_ingredients": ["Vitamin C", "Hyaluronic Acid"], "benefits": ["Brightening", "Hydration"]},
+    {"name": "Serum B", "price": 899,
+     "key_ingredients": ["Vitamin C", "Niacinamide", "Zinc"], "benefits": ["Brightening"]},
+    {"name": "Serum C", "price": 499, "key_ingredients": [], "benefits": []},
+]
+
+
+def test_pairs_match_the_two_product_calculations():
+    engine = CatalogComparison(PRODUCTS)
+    a, b = PRODUCTS[0], PRODUCTS[1]
+
+    price, ingredients, benefits = engine.compare(0, 1)
+
+    assert price == DeterministicCalculations.calculate_price_comparison(699.0, 899.0, "Serum A", "Serum B")
+    assert ingredients == DeterministicCalculations.calculate_ingredients_comparison(a["key_ingredients"], b["key_ingredients"])
+    assert benefits == DeterministicCalculations.calculate_benefits_comparison(a["benefits"], b["benefits"])
+
+
+def test_rows_hold_price_deltas_and_jaccard_overlaps():
+    engine = CatalogComparison(PRODUCTS)
+
+    assert engine.price_row(0) == [0.0, 200.0, -200.0]
+    assert engine.jaccard_row(0, "key_ingredients") == [1.0, 0.25, 0.0]
+    assert engine.jaccard_matrix("benefits")[1] == [0.5, 1.0, 0.0]
+    # Two empty sets are treated as identical
+    assert engine.jaccard_row(2, "benefits")[2] == 1.0
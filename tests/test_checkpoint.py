@@ -0,0 +1,165 @@
+import asyncio
+import json
+
+import pytest
+
+from ..Agents.faq_page import FAQPageAgent
+from ..benchmarks.fake_llm import FakeChatModel
+from ..config import config
+from ..main import ContentGeneration, finished_products, product_id, read_previous_states, run_catalog
+from ..utils.bundle import BundleReader, BundleWriter
+from ..utils.checkpoint import SqliteCheckpointSaver
+
+
+@pytest.fixture
+def product(raw_product):
+    return {"id": "sku-42", **raw_product}
+
+
+@pytest.fixture
+def crashing_faq(monkeypatch):
+    """FAQ builder that dies until `crash["enabled"]` is cleared"""
+    crash = {"enabled": True}
+    original = FAQPageAgent.build
+
+    def build(self, state):
+        if crash["enabled"]:
+            raise RuntimeError("process killed")
+        return original(self, state)
+
+    monkeypatch.setattr(FAQPageAgent, "build", build)
+    return crash
+
+
+def _orchestrator(tmp_path):
+    checkpointer = SqliteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"))
+    return ContentGeneration(llm=FakeChatModel(latency=0), checkpointer=checkpointer)
+
+
+def test_resume_skips_completed_nodes(tmp_path, product, crashing_faq):
+    orchestrator = _orchestrator(tmp_path)
+    with pytest.raises(RuntimeError):
+        orchestrator.execute(product)
+    calls_before_crash = orchestrator.llm.calls
+
+    # A new process: fresh orchestrator, same checkpoint file
+    crashing_faq["enabled"] = False
+    resumed = _orchestrator(tmp_path)
+    state = resumed.resume(product_id(product))
+
+    assert calls_before_crash == 8
+    assert resumed.llm.calls == 1
+    assert state["faq_page"]["template"] == "faq_v1"
+    assert state["product_page"] and state["comparison_page"]
+
+
+def test_resume_of_finished_run_returns_final_state(tmp_path, product):
+    orchestrator = _orchestrator(tmp_path)
+    final_state = orchestrator.execute(product)
+    calls = orchestrator.llm.calls
+
+    assert orchestrator.resume("sku-42") == final_state
+    assert orchestrator.llm.calls == calls
+
+
+def test_catalog_resume_only_reruns_unfinished_work(tmp_path, product, crashing_faq):
+    orchestrator = _orchestrator(tmp_path)
+    with pytest.raises(RuntimeError):
+        orchestrator.execute(product)
+
+    crashing_faq["enabled"] = False
+    resumed = _orchestrator(tmp_path)
+
+    async def run():
+        return [state async for _, state in resumed.astream_catalog([product], resume=True)]
+
+    (state,) = asyncio.run(run())
+    assert resumed.llm.calls == 1
+    assert state["faq_page"]
+
+
+def test_resume_without_checkpoint_raises(tmp_path):
+    with pytest.raises(KeyError):
+        _orchestrator(tmp_path).resume("unknown")
+
+
+def test_only_unfinished_checkpoints_are_kept(tmp_path, product, crashing_faq):
+    orchestrator = _orchestrator(tmp_path)
+    with pytest.raises(RuntimeError):
+        orchestrator.execute(product)
+
+    assert asyncio.run(orchestrator.arelease_checkpoint("sku-42")) is False
+    assert orchestrator.graph.get_state(orchestrator._run_config("sku-42", None)).next
+
+    crashing_faq["enabled"] = False
+    orchestrator.resume("sku-42")
+
+    assert asyncio.run(orchestrator.arelease_checkpoint("sku-42")) is True
+    with pytest.raises(KeyError):
+        orchestrator.resume("sku-42")
+
+
+@pytest.fixture
+def catalog(tmp_path, raw_product, monkeypatch):
+    """(model every run_catalog orchestrator gets, 4-product catalog file), with checkpoints on"""
+    llm = FakeChatModel(latency=0)
+    monkeypatch.setattr(ContentGeneration, "_chat_groq", staticmethod(lambda model: llm))
+    monkeypatch.setattr(config, "CHECKPOINT_ENABLED", True)
+    monkeypatch.setattr(config, "CHECKPOINT_PATH", str(tmp_path / "checkpoints.sqlite"))
+    path = tmp_path / "catalog.jsonl"
+    path.write_text("".join(json.dumps({**raw_product, "name": f"Serum {i}"}) + "\n" for i in range(4)))
+    return llm, path
+
+
+def test_resumed_catalog_keeps_finished_products(tmp_path, catalog, monkeypatch):
+    llm, catalog = catalog
+    results = tmp_path / "results.jsonl"
+    original = FAQPageAgent.abuild
+
+    async def abuild(self, state):
+        if state["product_model"]["name"] == "Serum 3":
+            raise RuntimeError("process killed")
+        return await original(self, state)
+
+    monkeypatch.setattr(FAQPageAgent, "abuild", abuild)
+    asyncio.run(run_catalog(str(catalog), str(results), concurrency=2))
+    # The kill also tore the line being appended
+    with open(results, "ab") as f:
+        f.write(b'{"index": 3, "product_')
+    first = [json.loads(line) for line in results.read_text().splitlines()[:4]]
+    llm.calls = 0
+
+    monkeypatch.setattr(FAQPageAgent, "abuild", original)
+    asyncio.run(run_catalog(str(catalog), str(results), concurrency=2, resume=True))
+
+    # Only Serum 3's FAQ is built again; the other products are neither rerun nor lost
+    assert llm.calls == 1
+    records = [json.loads(line) for line in results.read_text().splitlines()]
+    assert records[:4] == first
+    assert records[4]["state"]["product_model"]["name"] == "Serum 3" and records[4]["faq_page"]
+    assert not records[4]["interrupted"]
+    assert finished_products(str(results)) == {record["product_id"] for record in first}
+
+
+def test_products_in_an_unwritten_bundle_frame_are_resumed(tmp_path, catalog, monkeypatch):
+    llm, catalog = catalog
+    results, bundle = tmp_path / "results.jsonl", tmp_path / "pages.jsonl.zst"
+
+    # Killed before the frame (up to BUNDLE_FRAME_PRODUCTS products) reached the bundle
+    def killed(self):
+        raise RuntimeError("process killed")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(BundleWriter, "_flush", killed)
+        with pytest.raises(RuntimeError):
+            asyncio.run(run_catalog(str(catalog), str(results), concurrency=2, bundle_path=str(bundle)))
+    assert len(results.read_text().splitlines()) == 4
+    assert finished_products(str(results)) == set()
+    llm.calls = 0
+
+    asyncio.run(run_catalog(str(catalog), str(results), concurrency=2, resume=True, bundle_path=str(bundle)))
+
+    # Every product's checkpoint was kept, so the pages come back without a call
+    assert llm.calls == 0
+    assert len(BundleReader(bundle)) == 4
+    assert all(state["faq_page"] for state in read_previous_states(str(results)).values())
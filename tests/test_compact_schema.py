@@ -0,0 +1,38 @@
+import json
+
+from ..benchmarks.fake_llm import FakeChatModel
+from ..config import config
+from ..model.schema import FAQPage, ProductPage, Question, UsageBlock
+from ..utils.compact_schema import compact_schema, schema_tokens
+from ..utils.llm import bind_llm
+
+
+def test_compact_schema_is_inlined_and_trimmed():
+    schema = compact_schema(ProductPage)
+    text = json.dumps(schema)
+
+    assert "$ref" not in text and "$defs" not in text
+    assert "examples" not in text and "default" not in text
+    assert schema["title"] == "ProductPage"
+    assert schema["properties"]["hero"]["properties"]["price"]["required"] == ["amount", "display"]
+    # "Product name" only restates `product_name`; the example list is cut from Question.category
+    assert "description" not in schema["properties"]["hero"]["properties"]["product_name"]
+    assert compact_schema(Question)["properties"]["category"]["description"] == "Type of question"
+    assert compact_schema(ProductPage) is schema
+
+
+def test_compact_schema_is_smaller_for_nested_models():
+    for model in (ProductPage, FAQPage):
+        assert schema_tokens(compact_schema(model)) < schema_tokens(model)
+
+
+def test_compact_output_is_validated_against_the_full_model(monkeypatch):
+    llm = FakeChatModel(latency=0)
+    usage = bind_llm(llm, UsageBlock, cache=None, limiter=None).invoke("usage prompt")
+
+    # Defaults dropped from the wire schema are still filled in by pydantic
+    assert isinstance(usage, UsageBlock) and usage.block_type == "usage"
+
+    monkeypatch.setattr(config, "LLM_COMPACT_SCHEMAS", False)
+    full = bind_llm(llm, UsageBlock, cache=None, limiter=None)
+    assert full.bound_schema is UsageBlock
@@ -0,0 +1,59 @@
+from ..benchmarks.fake_llm import RAW_PRODUCT, FakeChatModel
+from ..logic.competitor_index import CompetitorIndex
+from ..main import ContentGeneration, build_competitor_index
+
+CATALOG = [
+    {**RAW_PRODUCT, "name": "GlowBoost Vitamin C Serum"},
+    {**RAW_PRODUCT, "name": "Clear Niacinamide Serum", "key_ingredients": "Niacinamide, Zinc",
+     "benefits": "Oil control", "price": "₹599"},
+    {**RAW_PRODUCT, "name": "Bright C Serum", "key_ingredients": "Vitamin C, Ferulic Acid",
+     "benefits": "Brightening", "price": "₹749"},
+    {**RAW_PRODUCT, "name": "Premium C Serum", "key_ingredients": "Vitamin C, Ferulic Acid",
+     "benefits": "Brightening", "price": "₹2499"},
+]
+
+
+def test_nearest_competitor_shares_formulation_and_price_band():
+    index = build_competitor_index(CATALOG)
+    product = index.products[0]
+
+    competitor, score = index.nearest(product)
+
+    # Same overlap as Premium C, but only Bright C is in the same price band
+    assert competitor["name"] == "Bright C Serum"
+    assert score == 3 + 2 + 2 + 1
+
+
+def test_no_candidate_without_shared_formulation():
+    index = CompetitorIndex.build([
+        {"name": "A", "key_ingredients": ["Retinol"], "benefits": ["Anti-aging"], "skin_types": ["Oily"], "price": 500},
+        {"name": "B", "key_ingredients": ["Zinc"], "benefits": ["Oil control"], "skin_types": ["Oily"], "price": 500},
+    ])
+
+    assert index.nearest(index.products[0]) is None
+
+
+def test_catalog_competitor_replaces_the_product_b_call():
+    plain_llm, indexed_llm = FakeChatModel(latency=0), FakeChatModel(latency=0)
+
+    ContentGeneration(llm=plain_llm).execute(CATALOG[0])
+    state = ContentGeneration(llm=indexed_llm, competitors=build_competitor_index(CATALOG)).execute(CATALOG[0])
+
+    assert indexed_llm.calls == plain_llm.calls - 1
+    assert state["product_b_model"]["name"] == "Bright C Serum"
+    assert state["comparison_page"]["products"][1]["name"] == "Bright C Serum"
+
+
+def test_changed_competitor_entry_invalidates_product_b():
+    index = build_competitor_index(CATALOG)
+    first = ContentGeneration(llm=FakeChatModel(latency=0), competitors=index).execute(CATALOG[0])
+
+    # Bright C is still the nearest competitor, at a new price
+    repriced = [*CATALOG[:2], {**CATALOG[2], "price": "₹899"}, CATALOG[3]]
+    orchestrator = ContentGeneration(llm=FakeChatModel(latency=0), competitors=build_competitor_index(repriced))
+    second = orchestrator.execute(CATALOG[0], previous_state=first)
+
+    assert second["product_b_model"]["name"] == "Bright C Serum"
+    assert second["comparison_page"]["products"][1]["price"] == 899
+    # Nothing else about the product changed, and it still reused its FAQ
+    assert second["faq_page"] == first["faq_page"]
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from ..Agents.content_blocks import ContentBlocksAgent
+from ..benchmarks.fake_llm import FakeChatModel, fake_instance
+from ..config import config
+from ..main import ContentGeneration
+from ..model.schema import ContentBlocks
+from ..utils.compact_schema import compact_schema
+
+
+class ToolUseFailed(Exception):
+    status_code = 400
+
+    def __init__(self, args):
+        super().__init__("tool_use_failed")
+        self.body = {"error": {"code": "tool_use_failed", "failed_generation": json.dumps(args)}}
+
+
+class PartlyInvalidBlocks:
+    """Structured runnable whose ContentBlocks output has an invalid usage block"""
+
+    def __init__(self, parent):
+        self.parent = parent
+
+    def invoke(self, prompt, config=None, **kwargs):
+        self.parent.calls += 1
+        args = fake_instance(ContentBlocks).model_dump()
+        args["usage_block"] = {"instructions": "Apply daily"}
+        if self.parent.rejected:
+            # The provider refuses the tool call and hands back the generation
+            raise ToolUseFailed(args)
+        raw = AIMessage(content="", tool_calls=[{"name": "ContentBlocks", "args": args, "id": "call_1"}])
+        return {"raw": raw, "parsed": None, "parsing_error": ValueError("usage_block invalid")}
+
+
+class PartlyInvalidModel(FakeChatModel):
+    rejected = False
+
+    def with_structured_output(self, schema, include_raw=False, **kwargs):
+        if schema in (ContentBlocks, compact_schema(ContentBlocks)):
+            return PartlyInvalidBlocks(self)
+        return super().with_structured_output(schema, include_raw, **kwargs)
+
+
+def test_fused_mode_fills_every_block_with_one_call(raw_product, monkeypatch):
+    monkeypatch.setattr(config, "CONTENT_BLOCKS_MODE", "fused")
+    llm = FakeChatModel(latency=0)
+
+    state = ContentGeneration(llm=llm).execute(raw_product)
+
+    # fused blocks, questions, product B, FAQ, comparison text
+    assert llm.calls == 5
+    for key in ContentBlocksAgent.BLOCKS:
+        assert state[key]["block_type"]
+    assert state["product_page"]
+
+
+@pytest.mark.parametrize("rejected", [False, True])
+def test_only_invalid_blocks_fall_back_to_their_agents(raw_product, rejected):
+    llm = PartlyInvalidModel(latency=0)
+    llm.rejected = rejected
+    orchestrator = ContentGeneration(llm=llm)
+    product_model = orchestrator.data_parser.parse({"raw_product_data": raw_product})["product_model"]
+
+    update = orchestrator.content_blocks_agent.generate({"product_model": product_model})
+
+    # Fused call, one (unsuccessful) repair call, then the usage agent on its own
+    assert llm.calls == 3
+    assert update["usage_block"]["steps"]
+    assert update["benefits_block"]["content"]
+    assert update["errors"] == ["[ContentBlocksAgent] Invalid usage_block: 2 validation error(s)"]
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import time
+
+from ..Agents.faq_page import FAQPageAgent
+from ..config import config
+from ..model.schema import FAQSection
+from ..utils.compact_schema import compact_schema
+
+
+class EchoFAQModel:
+    """Answers every question in an FAQ shard prompt, optionally dropping some"""
+
+    def __init__(self, latency=0.0, drop=()):
+        self.latency = latency
+        self.drop = set(drop)
+        self.prompts = []
+
+    def with_structured_output(self, schema, **kwargs):
+        assert schema in (FAQSection, compact_schema(FAQSection))
+        return self
+
+    def _answer(self, messages):
+        human = messages[-1][1]
+        questions = json.loads(human.split("Questions:", 1)[1])
+        self.prompts.append(questions)
+        return FAQSection(category="any", questions=[
+            {"q": q, "a": f"Answer to {q}"} for q in questions if q not in self.drop
+        ])
+
+    def invoke(self, messages, config=None, **kwargs):
+        time.sleep(self.latency)
+        return self._answer(messages)
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self._answer(messages)
+
+
+def _questions(per_category, categories=("Usage", "Safety", "Purchase")):
+    return {
+        "questions": [
+            {"category": c, "question": f"{c} question {i}?"}
+            for c in categories for i in range(per_category)
+        ],
+        "total_count": per_category * len(categories),
+    }
+
+
+def test_sections_are_assembled_per_category(sample_product_data):
+    llm = EchoFAQModel()
+    state = {"product_model": sample_product_data, "questions": _questions(2)}
+
+    result = FAQPageAgent(llm).build(state)
+    faq = result["faq_page"]
+
+    assert len(llm.prompts) == 3
+    assert [s["category"] for s in faq["sections"]] == ["Usage", "Safety", "Purchase"]
+    assert faq["sections"][1]["questions"][0] == {"q": "Safety question 0?", "a": "Answer to Safety question 0?"}
+    assert faq["metadata"]["question_count"] == 6
+    assert "errors" not in result
+
+
+def test_shards_run_concurrently_and_scale_past_100_questions(sample_product_data, monkeypatch):
+    monkeypatch.setattr(config, "FAQ_SHARD_SIZE", 10)
+    monkeypatch.setattr(config, "FAQ_MAX_PARALLEL_SHARDS", 16)
+    llm = EchoFAQModel(latency=0.1)
+    state = {"product_model": sample_product_data, "questions": _questions(40)}
+
+    started = time.perf_counter()
+    faq = asyncio.run(FAQPageAgent(llm).abuild(state))["faq_page"]
+    elapsed = time.perf_counter() - started
+
+    assert len(llm.prompts) == 12
+    assert max(len(p) for p in llm.prompts) == 10
+    assert faq["metadata"]["question_count"] == 120
+    # Twelve 0.1s shards in parallel finish in roughly one shard's time
+    assert elapsed < 0.6
+
+
+class ForgetfulFAQModel(EchoFAQModel):
+    """Drops the given questions the first time they are asked"""
+
+    def _answer(self, messages):
+        section = super()._answer(messages)
+        self.drop.clear()
+        return section
+
+
+def test_follow_up_asks_only_for_missing_answers(sample_product_data):
+    llm = ForgetfulFAQModel(drop={"Usage question 1?", "Usage question 3?"})
+    state = {"product_model": sample_product_data, "questions": _questions(5, categories=("Usage",))}
+
+    result = FAQPageAgent(llm).build(state)
+    answers = [qa["a"] for qa in result["faq_page"]["sections"][0]["questions"]]
+
+    assert llm.prompts[1] == ["Usage question 1?", "Usage question 3?"]
+    assert answers == [f"Answer to Usage question {i}?" for i in range(5)]
+    assert "errors" not in result
@@ -0,0 +1,70 @@
+from ..Agents.ingredients_block import IngredientsBlockAgent
+from ..model.schema import IngredientDetail
+from ..utils.ingredient_memo import IngredientMemo
+
+
+def _product(*ingredients):
+    return {"product_model": {"name": "Serum", "concentration": "10% Vitamin C", "key_ingredients": list(ingredients)}}
+
+
+def test_synonyms_share_one_canonical_entry():
+    assert IngredientMemo.canonical("L-Ascorbic  Acid") == "Vitamin C"
+    assert IngredientMemo.key("sodium hyaluronate") == IngredientMemo.key("Hyaluronic Acid")
+    assert IngredientMemo.canonical("Centella Asiatica") == "Centella Asiatica"
+
+
+def test_only_unseen_ingredients_reach_the_llm(tmp_path, describing_model):
+    llm = describing_model
+    agent = IngredientsBlockAgent(llm, memo=IngredientMemo(str(tmp_path / "memo.sqlite")))
+
+    agent.generate(_product("Vitamin C", "Hyaluronic Acid"))
+    block = agent.generate(_product("L-Ascorbic Acid", "Sodium Hyaluronate"))["ingredients_block"]
+    assert llm.calls == 1
+    # Purposes come from the memo, names stay the product's own
+    assert block["primary"] == "L-Ascorbic Acid"
+    assert block["details"][1] == {"name": "Sodium Hyaluronate", "purpose": "Purpose of Hyaluronic Acid"}
+
+    agent.generate(_product("Vitamin C", "Niacinamide"))
+    assert llm.calls == 2
+
+    # The memo survives a restart
+    reopened = IngredientMemo(str(tmp_path / "memo.sqlite"))
+    known, unknown = reopened.lookup(["nicotinamide", "Zinc PCA"])
+    assert known == {IngredientMemo.key("Niacinamide"): "Purpose of Niacinamide"}
+    assert unknown == ["Zinc PCA"]
+
+
+def test_case_mismatch_still_uses_the_remembered_purpose(tmp_path, describing_model):
+    llm = describing_model
+    agent = IngredientsBlockAgent(llm, memo=IngredientMemo(str(tmp_path / "memo.sqlite")))
+
+    agent.generate(_product("Vitamin C", "Centella Asiatica"))
+    result = agent.generate(_product("vitamin c", "centella asiatica", "bha"))
+
+    assert llm.calls == 2
+    assert "errors" not in result
+    assert result["ingredients_block"]["details"] == [
+        {"name": "vitamin c", "purpose": "Purpose of Vitamin C"},
+        {"name": "centella asiatica", "purpose": "Purpose of Centella Asiatica"},
+        {"name": "bha", "purpose": "Purpose of bha"},
+    ]
+
+
+def test_positional_guesses_never_reach_the_memo(tmp_path, describing_model, monkeypatch):
+    memo = IngredientMemo(str(tmp_path / "memo.sqlite"))
+    agent = IngredientsBlockAgent(describing_model, memo=memo)
+    described = describing_model.invoke
+
+    def renamed(prompt, **kwargs):
+        # Same count back, but with drifted names in a different order
+        block = described(prompt, **kwargs)
+        return block.model_copy(update={"details": [
+            IngredientDetail(name="Ingredient B", purpose="Purpose of Ferulic Acid"),
+            IngredientDetail(name="Ingredient A", purpose="Purpose of Centella Asiatica"),
+        ]})
+
+    monkeypatch.setattr(describing_model, "invoke", renamed)
+    block = agent.generate(_product("Centella Asiatica", "Ferulic Acid"))["ingredients_block"]
+
+    assert [detail["name"] for detail in block["details"]] == ["Centella Asiatica", "Ferulic Acid"]
+    assert memo.lookup(["Centella Asiatica", "Ferulic Acid"]) == ({}, ["Centella Asiatica", "Ferulic Acid"])
@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+from ..benchmarks.fake_llm import FakeChatModel
+from ..model.schema import BenefitsBlock
+from ..utils.llm import bind_llm
+from ..utils.llm_cache import LLMCache
+
+
+def _cache(tmp_path, **overrides):
+    settings = {"max_bytes": 1024 * 1024, "max_age_seconds": 3600}
+    settings.update(overrides)
+    return LLMCache(str(tmp_path / "cache.sqlite"), **settings)
+
+
+def test_key_depends_on_model_schema_and_prompt():
+    key = LLMCache.make_key("model-a", "schema", "prompt")
+
+    assert key == LLMCache.make_key("model-a", "schema", "prompt")
+    assert key != LLMCache.make_key("model-b", "schema", "prompt")
+    assert key != LLMCache.make_key("model-a", "other", "prompt")
+    assert key != LLMCache.make_key("model-a", "schema", [("human", "prompt")])
+
+
+def test_repeat_structured_call_is_served_from_cache(tmp_path):
+    llm = FakeChatModel(latency=0)
+    runner = bind_llm(llm, BenefitsBlock, cache=_cache(tmp_path))
+
+    first = runner.invoke("benefits for GlowBoost")
+    second = asyncio.run(runner.ainvoke("benefits for GlowBoost"))
+
+    assert isinstance(second, BenefitsBlock)
+    assert second == first
+    assert llm.calls == 1
+    assert runner.cache.stats()["hits"] == 1
+    assert runner.cache.stats()["misses"] == 1
+
+
+def test_cache_survives_reopen(tmp_path):
+    llm = FakeChatModel(latency=0)
+    bind_llm(llm, cache=_cache(tmp_path)).invoke("recommend")
+
+    reopened = bind_llm(llm, cache=_cache(tmp_path))
+    text = reopened.invoke("recommend")
+
+    assert isinstance(text, str)
+    assert llm.calls == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = _cache(tmp_path, max_age_seconds=0.01)
+    cache.put("k", "v")
+    time.sleep(0.02)
+
+    assert cache.get("k") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_size_budget_evicts_least_recently_used(tmp_path):
+    cache = _cache(tmp_path, max_bytes=300)
+    cache.put("old", "x" * 100)
+    cache.put("recent", "y" * 100)
+    cache.get("old")
+    cache.put("new", "z" * 150)
+
+    assert cache.get("recent") is None
+    assert cache.get("old") == "x" * 100
+    assert cache.stats()["bytes"] <= 300
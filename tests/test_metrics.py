@@ -0,0 +1,64 @@
+from ..benchmarks.fake_llm import FakeChatModel
+from ..main import ContentGeneration
+from ..model.schema import UsageBlock
+from ..utils.llm import bind_llm
+from ..utils.metrics import MetricsRegistry, NodeRun, metrics, node_run
+from ..utils.retry import RetryExecutor
+
+
+def test_node_run_collects_calls_retries_and_wall_time():
+    metrics.reset()
+    runner = bind_llm(FakeChatModel(latency=0, model_name="fake-8b"), UsageBlock, cache=None, limiter=None)
+    executor = RetryExecutor("UsageBlockAgent", max_attempts=3, base_delay=0)
+    outcomes = iter([ConnectionError("dropped"), None])
+
+    def call():
+        error = next(outcomes)
+        if error:
+            raise error
+        return runner.invoke("usage prompt")
+
+    with node_run("generate_usage"):
+        executor.run(call)
+    runner.invoke("outside any node")
+
+    stats = metrics.summary()["nodes"]
+    assert set(stats) == {"generate_usage", "unattributed"}
+    usage = stats["generate_usage"]
+    assert (usage["runs"], usage["attempts"], usage["retries"], usage["llm_calls"]) == (1, 2, 1, 1)
+    assert usage["models"] == {"fake-8b": 1}
+    assert usage["prompt_tokens"] > 0 and usage["completion_tokens"] > 0
+    assert usage["wall_seconds"] > 0
+
+
+def test_pipeline_records_every_node_and_fallbacks(sample_product_data, offline_llm):
+    metrics.reset()
+    ContentGeneration(llm=FakeChatModel(latency=0)).execute(sample_product_data)
+    healthy = metrics.summary()
+
+    assert {"parse_data", "generate_questions", "build_faq", "build_product_page"} <= set(healthy["nodes"])
+    assert healthy["total"]["fallbacks"] == 0
+    assert healthy["total"]["llm_calls"] > 0
+
+    metrics.reset()
+    ContentGeneration(llm=offline_llm).execute(sample_product_data)
+    assert metrics.summary()["total"]["fallbacks"] > 0
+
+
+def test_prometheus_export_has_cumulative_buckets():
+    registry = MetricsRegistry()
+    for seconds in (0.003, 0.2, 0.2, 120.0):
+        run = NodeRun("build_faq")
+        run.add(runs=1, wall_seconds=seconds)
+        run.llm_call("fake-70b", 100, 20)
+        registry.add(run)
+
+    text = registry.prometheus()
+
+    assert 'content_pipeline_node_wall_seconds_bucket{node="build_faq",le="0.005"} 1' in text
+    assert 'content_pipeline_node_wall_seconds_bucket{node="build_faq",le="0.25"} 3' in text
+    assert 'content_pipeline_node_wall_seconds_bucket{node="build_faq",le="+Inf"} 4' in text
+    assert 'content_pipeline_node_wall_seconds_count{node="build_faq"} 4' in text
+    assert 'content_pipeline_node_tokens_total{node="build_faq",kind="prompt"} 400' in text
+    assert 'content_pipeline_node_llm_calls_total{node="build_faq",model="fake-70b"} 4' in text
+    assert registry.summary()["nodes"]["build_faq"]["p50_wall_seconds_le"] == 0.25
@@ -0,0 +1,94 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from ..main import read_previous_states
+from ..utils.bundle import BundleReader, BundleWriter
+from ..utils.output_writer import ResultWriter, product_dir, write_json_atomic, write_pages
+
+
+def test_failed_write_keeps_the_previous_file(tmp_path):
+    path = tmp_path / "faq.json"
+    write_json_atomic(path, {"title": "v1"})
+
+    with patch("os.replace", side_effect=OSError("disk went away")):
+        with pytest.raises(OSError):
+            write_json_atomic(path, {"title": "v2"})
+
+    assert json.loads(path.read_text()) == {"title": "v1"}
+    assert [p.name for p in tmp_path.iterdir()] == ["faq.json"]
+
+
+def test_pages_are_laid_out_per_product(tmp_path):
+    results = {"faq_page": {"title": "FAQ — Sérum"}, "product_page": {"name": "Sérum"}, "comparison_page": {}}
+
+    paths = write_pages(tmp_path, "sku/42", results)
+
+    assert product_dir(tmp_path, "sku/42") == tmp_path / "sku_42"
+    assert sorted(p.relative_to(tmp_path).as_posix() for p in paths) == [
+        "sku_42/comparison_page.json", "sku_42/faq.json", "sku_42/product_page.json"]
+    assert json.loads((tmp_path / "sku_42" / "faq.json").read_text(encoding="utf-8")) == {"title": "FAQ — Sérum"}
+    assert product_dir(tmp_path, "..") == tmp_path / "_"
+
+
+def test_result_writer_appends_in_order_off_the_loop(tmp_path):
+    records = [{"index": i, "product_id": f"p{i}", "faq_page": {"i": i}, "errors": [],
+                "state": {"faq_page": {"i": i}, "input_fingerprints": {"build_faq": f"f{i}"}}} for i in range(20)]
+
+    async def write_all():
+        with ResultWriter(tmp_path / "results.jsonl", pages_dir=tmp_path / "pages",
+                          bundle=BundleWriter(tmp_path / "pages.jsonl.zst")) as writer:
+            for record in records:
+                await writer.awrite(record)
+
+    asyncio.run(write_all())
+
+    lines = [json.loads(line) for line in (tmp_path / "results.jsonl").read_text().splitlines()]
+    assert [line["index"] for line in lines] == list(range(20))
+    # The bundle holds the pages, so the results records are slim
+    assert lines[7] == {"index": 7, "product_id": "p7", "errors": [], "bundle": str(tmp_path / "pages.jsonl.zst"),
+                        "state": {"input_fingerprints": {"build_faq": "f7"}}}
+    assert json.loads((tmp_path / "pages" / "p7" / "faq.json").read_text()) == {"i": 7}
+    assert BundleReader(tmp_path / "pages.jsonl.zst").page("p7", "faq_page") == {"i": 7}
+    # An incremental rerun still gets the previous pages, from the bundle
+    assert read_previous_states(str(tmp_path / "results.jsonl"))["p7"] == {
+        "input_fingerprints": {"build_faq": "f7"}, "faq_page": {"i": 7}, "product_page": {}, "comparison_page": {}}
+
+
+def test_bundle_pages_are_read_back_by_product_id(tmp_path):
+    path = tmp_path / "pages.jsonl.zst"
+    with BundleWriter(path, frame_products=4) as bundle:
+        for i in range(10):
+            bundle.add(f"p{i}", {"faq_page": {"i": i}, "product_page": {"name": f"Serum {i}"}})
+
+    reader = BundleReader(path)
+    offsets = {entry["offset"] for entry in reader.index.values()}
+
+    assert len(reader) == 10 and len(offsets) == 3
+    assert reader.page("p6", "product_page") == {"name": "Serum 6"}
+    assert reader.pages("p9") == {"faq_page": {"i": 9}, "product_page": {"name": "Serum 9"}, "comparison_page": {}}
+    # The concatenated frames are one ordinary zstd stream
+    assert [line["data"] for line in reader if line["page"] == "faq_page"] == [{"i": i} for i in range(10)]
+
+
+def test_bundle_reopened_after_a_crash_drops_the_torn_tail(tmp_path):
+    path = tmp_path / "pages.jsonl.zst"
+    with BundleWriter(path, frame_products=2) as bundle:
+        assert bundle.add("p0", {"faq_page": {"i": 0}}) == []
+        assert bundle.add("p1", {"faq_page": {"i": 1}}) == ["p0", "p1"]
+    # Killed halfway through the next frame and its index line
+    with open(path, "ab") as f:
+        f.write(b"\x28\xb5\x2f\xfd half a frame")
+    with open(f"{path}.idx", "ab") as f:
+        f.write(b'{"product_id": "p2", "off')
+    assert len(BundleReader(path)) == 2
+
+    with BundleWriter(path, frame_products=2, append=True) as bundle:
+        bundle.add("p2", {"faq_page": {"i": 2}})
+        assert bundle.flush() == ["p2"]
+
+    reader = BundleReader(path)
+    assert reader.page("p2", "faq_page") == {"i": 2}
+    assert [line["data"] for line in reader if line["page"] == "faq_page"] == [{"i": i} for i in range(3)]
@@ -0,0 +1,39 @@
+from ..Agents.product_page import ProductPageAgent
+from ..benchmarks.fake_llm import FakeChatModel, fake_instance
+from ..model.schema import BenefitsBlock, IngredientsBlock, OverviewBlock, SafetyBlock, UsageBlock
+
+
+def _state(product):
+    return {
+        "product_model": product,
+        "benefits_block": fake_instance(BenefitsBlock).model_dump(),
+        "usage_block": fake_instance(UsageBlock).model_dump(),
+        "ingredients_block": fake_instance(IngredientsBlock).model_dump(),
+        "safety_block": fake_instance(SafetyBlock).model_dump(),
+        "overview_block": {"block_type": "overview", "tagline": "Glow daily", "description": "A bright serum."},
+    }
+
+
+def test_page_is_assembled_without_the_llm(sample_product_data):
+    llm = FakeChatModel(latency=0)
+    state = _state(sample_product_data)
+
+    page = ProductPageAgent(llm).build(state)["product_page"]
+
+    assert llm.calls == 0
+    assert page["hero"] == {"product_name": sample_product_data["name"], "tagline": "Glow daily",
+                            "price": sample_product_data["price"]}
+    assert page["overview"]["description"] == "A bright serum."
+    assert page["usage"] == state["usage_block"]
+    assert page["benefits"] == state["benefits_block"]["content"]
+
+
+def test_missing_tagline_costs_one_text_call(sample_product_data):
+    llm = FakeChatModel(latency=0)
+    state = {**_state(sample_product_data), "overview_block": fake_instance(OverviewBlock).model_dump()}
+    state["overview_block"]["tagline"] = ""
+
+    page = ProductPageAgent(llm).build(state)["product_page"]
+
+    assert llm.calls == 1
+    assert page["hero"]["tagline"].startswith("Both products")
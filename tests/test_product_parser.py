@@ -0,0 +1,77 @@
+import pytest
+
+from ..Agents.data_parser import DataParserAgent
+from ..benchmarks.fake_llm import FakeChatModel
+from ..logic.product_parser import ProductParser
+
+
+@pytest.mark.parametrize("raw, amount, currency", [
+    ("₹699", 699, "INR"),
+    ("Rs. 1,00,000", 100000, "INR"),
+    ("$1,299.99", 1299.99, "USD"),
+    ("1.299,50 €", 1299.5, "EUR"),
+    ("15 GBP", 15, "GBP"),
+    ("MRP ₹ 699 (incl. taxes)", 699, "INR"),
+    (899, 899, "INR"),
+])
+def test_prices_are_parsed(raw, amount, currency):
+    price = ProductParser.parse_price(raw)
+
+    assert price.amount == amount
+    assert price.currency == currency
+
+
+@pytest.mark.parametrize("raw", [
+    "₹699 30ml",
+    "$29.99 2 pack",
+    "₹699, 30ml",
+    "30ml for ₹699",
+    "₹699 - ₹899",
+    "₹699-899",
+    "Rs 699 INR",
+])
+def test_ambiguous_prices_are_left_to_the_llm(raw, raw_product):
+    assert ProductParser.parse_price(raw) is None
+
+    _, issues = ProductParser.parse({**raw_product, "price": raw})
+    assert issues == [f"unparsable price {raw!r}"]
+
+
+def test_raw_record_parses_without_issues(raw_product):
+    product, issues = ProductParser.parse(raw_product)
+
+    assert issues == []
+    assert product["skin_types"] == ["Oily", "Combination"]
+    assert product["key_ingredients"] == ["Vitamin C", "Hyaluronic Acid"]
+    assert product["price"] == {"amount": 699, "currency": "INR", "display": "₹699"}
+
+
+def test_structured_record_parses_without_issues(sample_product_data):
+    product, issues = ProductParser.parse(sample_product_data)
+
+    assert issues == []
+    assert product["benefits"] == sample_product_data["benefits"]
+
+
+def test_skin_types_are_normalised():
+    normalized, unknown = ProductParser.normalize_skin_types("oily & combination skin; Acne prone, scalp")
+
+    assert normalized == ["Oily", "Combination", "Acne-prone", "Scalp"]
+    assert unknown == ["scalp"]
+
+
+def test_agent_skips_llm_when_confident(raw_product):
+    llm = FakeChatModel(latency=0)
+
+    result = DataParserAgent(llm).parse({"raw_product_data": raw_product})
+
+    assert llm.calls == 0
+    assert result["product_model"]["name"] == raw_product["name"]
+
+
+def test_agent_asks_llm_when_unsure(raw_product):
+    llm = FakeChatModel(latency=0)
+
+    DataParserAgent(llm).parse({"raw_product_data": {**raw_product, "price": "ask in store"}})
+
+    assert llm.calls == 1
@@ -0,0 +1,81 @@
+from ..Agents.question_generator import QuestionGeneratorAgent
+from ..config import config
+from ..utils.question_library import QuestionLibrary
+
+
+def _product(name, *ingredients):
+    return {"name": name, "concentration": "10% Vitamin C", "key_ingredients": ["L-Ascorbic Acid", *ingredients]}
+
+
+def test_templates_substitute_product_attributes():
+    glow = _product("GlowBoost Vitamin C Serum")
+    bright = QuestionLibrary.attributes(_product("Bright C Serum"))
+
+    template = QuestionLibrary.template("Can I layer GlowBoost Vitamin C Serum with 10% vitamin c toners?", glow)
+
+    assert (bright["active"], bright["form"]) == ("L-Ascorbic Acid", "serum")
+    assert template == "Can I layer {name} with {concentration} toners?"
+    assert QuestionLibrary.render(template, bright) == "Can I layer Bright C Serum with 10% Vitamin C toners?"
+    assert QuestionLibrary.category(_product("Bright C Serum")) == "vitamin c|serum"
+
+
+def test_seed_specific_details_never_reach_another_product():
+    glow = {"name": "GlowBoost Vitamin C Serum", "concentration": "15% L-Ascorbic Acid",
+            "key_ingredients": ["L-Ascorbic Acid", "Ferulic Acid"], "skin_types": ["Oily", "Combination"],
+            "price": {"amount": 699, "currency": "INR", "display": "₹699"}}
+    derma = {"name": "DermaLux Radiance Vitamin C Serum", "concentration": "10% Vitamin C",
+             "key_ingredients": ["Vitamin C", "Vitamin E"], "skin_types": ["Dry"],
+             "price": {"amount": 1299, "currency": "INR", "display": "₹1,299"}}
+    assert QuestionLibrary.category(glow) == QuestionLibrary.category(derma)
+
+    def for_derma(question):
+        template = QuestionLibrary.template(question, glow)
+        return template and QuestionLibrary.render(template, QuestionLibrary.attributes(derma))
+
+    assert for_derma("Can I use GlowBoost with retinol?") == "Can I use DermaLux Radiance Vitamin C Serum with retinol?"
+    assert for_derma("Is it suitable for oily and combination skin?") == "Is it suitable for dry skin?"
+    # The question node does not read the price, so a question quoting it is not kept
+    assert QuestionLibrary.template("Is ₹699 a good price for this serum?", glow) is None
+    assert for_derma("Why pair L-Ascorbic Acid with Ferulic Acid?") == "Why pair Vitamin C with Vitamin E?"
+    # Nothing covers a stray percentage or a bare amount: the question is not kept
+    assert QuestionLibrary.template("Is 699 a good price for a 15% vitamin C serum?", glow) is None
+
+
+def test_library_questions_are_rendered_for_each_product(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "QUESTION_LIBRARY_SEEDS", 1)
+    library = QuestionLibrary(str(tmp_path / "questions.sqlite"))
+    glow = {"name": "GlowBoost Serum", "concentration": "15% Vitamin C", "key_ingredients": ["Vitamin C"],
+            "skin_types": ["Oily"], "price": {"amount": 699, "currency": "INR", "display": "₹699"}}
+    derma = {"name": "DermaLux Serum", "concentration": "10% Vitamin C", "key_ingredients": ["Vitamin C"],
+             "skin_types": ["Dry"], "price": {"amount": 899, "currency": "INR", "display": "₹899"}}
+
+    library.add(glow, [
+        {"category": "Usage", "question": "How often should I use GlowBoost?"},
+        {"category": "Safety", "question": "Is it suitable for oily skin?"},
+        {"category": "Purchase", "question": "Is ₹699 a good price for 15% Vitamin C?"},
+        {"category": "Purchase", "question": "Is a 15% strength too strong?"},
+    ], seed=True)
+
+    assert [q["question"] for q in library.questions(derma)] == [
+        "How often should I use DermaLux Serum?",
+        "Is it suitable for dry skin?",
+    ]
+
+
+def test_seeded_category_needs_the_llm_only_for_new_ingredients(tmp_path, questioning_model, monkeypatch):
+    monkeypatch.setattr(config, "QUESTION_LIBRARY_SEEDS", 2)
+    llm = questioning_model
+    agent = QuestionGeneratorAgent(llm, library=QuestionLibrary(str(tmp_path / "questions.sqlite")))
+
+    agent.generate({"product_model": _product("Glow Serum", "Ferulic Acid")})
+    agent.generate({"product_model": _product("Radiant Serum", "Vitamin E")})
+    assert llm.calls == 2
+
+    questions = agent.generate({"product_model": _product("Bright Serum", "Ferulic Acid")})["questions"]
+    assert llm.calls == 2
+    assert questions["total_count"] == config.QUESTION_LIBRARY_SIZE
+    assert "How often should I use Bright Serum, question 0?" in [q["question"] for q in questions["questions"]]
+
+    questions = agent.generate({"product_model": _product("Zinc Serum", "Zinc PCA")})["questions"]
+    assert llm.calls == 3
+    assert questions["total_count"] == config.QUESTION_LIBRARY_SIZE + config.QUESTION_EXTRAS
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage
+
+from ..benchmarks.fake_llm import FakeChatModel
+from ..model.schema import UsageBlock
+from ..utils.llm import bind_llm
+from ..utils.rate_limiter import RateLimiter, retry_after_seconds
+
+
+def test_requests_are_paced_to_the_budget():
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=10**9, burst_seconds=0.1)
+
+    delays = [limiter.reserve(1) for _ in range(5)]
+
+    # 10 requests/s with a one-request burst: each call queues 0.1s behind the last
+    assert delays[0] == 0
+    assert [round(d, 1) for d in delays[1:]] == [0.1, 0.2, 0.3, 0.4]
+
+
+def test_token_budget_queues_large_prompts():
+    limiter = RateLimiter(requests_per_minute=10**6, tokens_per_minute=6000, burst_seconds=1)
+
+    assert limiter.reserve(100) == 0
+    # 100 tokens/s: a further 300 tokens must wait for the 300-token deficit
+    assert round(limiter.reserve(300), 1) == 3.0
+
+
+def test_actual_usage_corrects_the_reservation():
+    limiter = RateLimiter(requests_per_minute=10**6, tokens_per_minute=6000, burst_seconds=1)
+
+    limiter.reserve(100)
+    # The call used 40 of its 100 reserved tokens: 60 are refunded straight away
+    limiter.settle(100, 40)
+    assert limiter.reserve(60) == 0
+    # This one used 100 more than it reserved: the next caller waits for them
+    limiter.settle(60, 160)
+    assert round(limiter.reserve(0), 1) == 1.0
+
+
+def test_provider_usage_settles_the_token_bucket(monkeypatch):
+    limiter = RateLimiter(requests_per_minute=10**6, tokens_per_minute=10**6)
+    llm = FakeChatModel(latency=0)
+    runner = bind_llm(llm, cache=None, limiter=limiter)
+    settled = []
+    monkeypatch.setattr(limiter, "settle", lambda reserved, used: settled.append((reserved, used)))
+    monkeypatch.setattr(llm, "invoke", lambda *args, **kwargs: AIMessage(
+        content="Pick by skin type.", usage_metadata={"input_tokens": 30, "output_tokens": 12, "total_tokens": 42}))
+
+    runner.invoke("recommend")
+
+    assert settled == [(runner._estimate_tokens("recommend"), 42)]
+
+
+def test_pause_holds_back_every_caller():
+    limiter = RateLimiter(requests_per_minute=10**6, tokens_per_minute=10**9)
+    limiter.pause(0.5)
+
+    assert 0.4 < limiter.reserve(1) <= 0.5
+    assert 0.4 < limiter.reserve(1) <= 0.5
+
+
+def test_concurrent_async_calls_queue_instead_of_bursting():
+    limiter = RateLimiter(requests_per_minute=1200, tokens_per_minute=10**9, burst_seconds=0.05)
+    runner = bind_llm(FakeChatModel(latency=0), UsageBlock, cache=None, limiter=limiter)
+
+    async def run():
+        started = time.perf_counter()
+        await asyncio.gather(*(runner.ainvoke(f"usage {i}") for i in range(6)))
+        return time.perf_counter() - started
+
+    # 20 requests/s: six calls need at least 5 × 50ms of spacing
+    assert asyncio.run(run()) >= 0.24
+
+
+def test_retry_after_header_is_parsed():
+    class Response:
+        headers = {"retry-after": "2.5"}
+
+    class RateLimited(Exception):
+        status_code = 429
+        response = Response()
+
+    assert retry_after_seconds(RateLimited()) == 2.5
+    assert retry_after_seconds(ValueError()) is None
+
+
+def test_provider_429_pauses_the_shared_limiter(monkeypatch):
+    limiter = RateLimiter(requests_per_minute=10**6, tokens_per_minute=10**9)
+    llm = FakeChatModel(latency=0)
+    runner = bind_llm(llm, cache=None, limiter=limiter)
+
+    class RateLimited(Exception):
+        status_code = 429
+        response = type("Response", (), {"headers": {"retry-after": "1"}})()
+
+    def rate_limited(*args, **kwargs):
+        raise RateLimited()
+
+    monkeypatch.setattr(llm, "invoke", rate_limited)
+    try:
+        runner.invoke("recommend")
+    except RateLimited:
+        pass
+
+    assert 0.9 < limiter.reserve(1) <= 1.0
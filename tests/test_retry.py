@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from ..Agents.faq_page import FAQPageAgent
+from ..model.schema import UsageBlock
+from ..utils.retry import RetryExecutor, RetryError, classify_error, RETRYABLE, REPAIRABLE, FATAL
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code, message="", retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = type("Response", (), {"headers": {"retry-after": retry_after} if retry_after else {}})()
+
+
+def validation_error():
+    try:
+        UsageBlock.model_validate({})
+    except ValidationError as e:
+        return e
+
+
+def test_errors_are_classified():
+    assert classify_error(ConnectionError("reset")) == RETRYABLE
+    assert classify_error(ProviderError(429)) == RETRYABLE
+    assert classify_error(ProviderError(503)) == RETRYABLE
+    assert classify_error(validation_error()) == REPAIRABLE
+    assert classify_error(ProviderError(400, "tool_use_failed")) == REPAIRABLE
+    assert classify_error(ProviderError(401)) == FATAL
+    assert classify_error(KeyError("name")) == FATAL
+
+
+def test_retryable_errors_back_off_and_recover(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("time.sleep", sleeps.append)
+    outcomes = iter([ProviderError(429, retry_after="3"), ConnectionError("reset"), "ok"])
+
+    def call():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    executor = RetryExecutor("Test", max_attempts=3, base_delay=0.5, max_delay=10)
+
+    assert executor.run(call) == "ok"
+    # Retry-After floors the first wait; the second is jittered within 2 × base
+    assert sleeps[0] >= 3
+    assert 0 <= sleeps[1] <= 1.0
+
+
+def test_repairable_errors_retry_without_waiting(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("time.sleep", sleeps.append)
+    outcomes = iter([validation_error(), "ok"])
+
+    def call():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert RetryExecutor("Test", base_delay=5).run(call) == "ok"
+    assert sleeps == [0.0]
+
+
+def test_fatal_errors_stop_immediately():
+    calls = []
+
+    async def call():
+        calls.append(1)
+        raise ProviderError(401, "invalid api key")
+
+    with pytest.raises(RetryError) as raised:
+        asyncio.run(RetryExecutor("Test", max_attempts=5).arun(lambda: call()))
+
+    assert len(calls) == 1
+    assert raised.value.kind == FATAL
+    assert raised.value.errors == ["[Test] Fatal error on attempt 1: invalid api key"]
+
+
+def test_exhausted_faq_build_reaches_fallback(offline_llm, sample_product_data):
+    questions = {
+        "total_count": 2,
+        "questions": [
+            {"question": "Is it gentle?", "category": "Safety"},
+            {"question": "How often?", "category": "Usage"},
+        ],
+    }
+    state = {"product_model": sample_product_data, "questions": questions}
+
+    result = FAQPageAgent(offline_llm).build(state)
+
+    # One shard per category, each retried three times
+    assert offline_llm.with_structured_output.return_value.invoke.call_count == 6
+    assert result["faq_page"]["metadata"]["question_count"] == 2
+    assert result["errors"][-1] == "[FAQPageAgent] 2 of 2 question(s) left unanswered"
@@ -0,0 +1,59 @@
+from ..benchmarks.fake_llm import FakeChatModel
+from ..config import config
+from ..main import ContentGeneration
+from ..model.schema import UsageBlock
+from ..utils.llm import RoutedModel, bind_llm
+from ..utils.llm_cache import LLMCache
+from .test_repair import ScriptedModel
+
+INVALID_USAGE = {"instructions": "Apply", "steps": ["Apply"]}
+
+
+def test_simple_nodes_are_routed_to_the_small_model():
+    models = {}
+
+    def factory(name):
+        return models.setdefault(name, FakeChatModel(latency=0, model_name=name))
+
+    orchestrator = ContentGeneration(llm_factory=factory)
+
+    assert orchestrator.usage_agent.structured_llm.model_name == config.LLM_SMALL_MODEL
+    assert orchestrator.usage_agent.structured_llm.escalation.model_name == config.LLM_MODEL
+    assert orchestrator.faq_builder.structured_llm.model_name == config.LLM_MODEL
+    assert orchestrator.comparison_builder.text_llm.model_name == config.LLM_MODEL
+    assert set(models) == {config.LLM_MODEL, config.LLM_SMALL_MODEL}
+
+
+def test_invalid_small_model_output_escalates_to_the_large_model():
+    small = ScriptedModel(INVALID_USAGE, INVALID_USAGE)
+    large = FakeChatModel(latency=0, model_name="large")
+
+    runner = bind_llm(RoutedModel(small, escalation=large), UsageBlock, cache=None, limiter=None)
+    usage = runner.invoke("usage prompt")
+
+    # Original call and its repair on the small model, then one large call
+    assert len(small.prompts) == 2
+    assert large.calls == 1
+    assert large.prompt_tokens and usage.frequency
+
+
+def test_valid_small_model_output_never_touches_the_large_model():
+    small = FakeChatModel(latency=0, model_name="small")
+    large = FakeChatModel(latency=0, model_name="large")
+
+    bind_llm(RoutedModel(small, escalation=large), UsageBlock, cache=None, limiter=None).invoke("usage prompt")
+
+    assert (small.calls, large.calls) == (1, 0)
+
+
+def test_escalated_result_is_cached_for_the_small_model_too(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.sqlite"), max_bytes=10**7, max_age_seconds=3600)
+    small = ScriptedModel(INVALID_USAGE, INVALID_USAGE)
+    large = FakeChatModel(latency=0, model_name="large")
+    bind_llm(RoutedModel(small, escalation=large), UsageBlock, cache=cache, limiter=None).invoke("usage prompt")
+
+    rerun_small, rerun_large = ScriptedModel(), FakeChatModel(latency=0, model_name="large")
+    usage = bind_llm(RoutedModel(rerun_small, escalation=rerun_large), UsageBlock, cache=cache, limiter=None).invoke("usage prompt")
+
+    assert (rerun_small.prompts, rerun_large.calls) == ([], 0)
+    assert usage.frequency
@@ -1,20 +1,36 @@
-import pytest
-from main import ContentGenerationOrchestrator
-from unittest.mock import MagicMock
-
-def test_full_pipeline_runs_without_crashing(sample_product_data, monkeypatch):
-    # Mock LLM to avoid real API calls
-    mock_llm = MagicMock()
-    mock_llm.with_structured_output.return_value.invoke.return_value = MagicMock(model_dump=lambda: {"mock": "data"})
-    
-    monkeypatch.setattr("builtins.print", lambda *args: None)  
-    orchestrator = ContentGenerationOrchestrator(api_key="fake")
-    monkeypatch.setattr(orchestrator, "llm", mock_llm)
-    
+from ..benchmarks.fake_llm import FakeChatModel
+from ..main import ContentGeneration
+from ..model.schema import ComparisonPage, FAQPage, ProductPage
+from ..utils.metrics import metrics
+
+
+def test_full_pipeline_runs_without_crashing(sample_product_data):
+    llm = FakeChatModel(latency=0)
+    orchestrator = ContentGeneration(llm=llm)
+    metrics.reset()
+
     results = orchestrator.execute(sample_product_data)
-    
-    assert "product_page" in results
-    assert "faq_page" in results
-    assert "comparison_page" in results
+
+    ProductPage.model_validate(results["product_page"])
+    FAQPage.model_validate(results["faq_page"])
+    ComparisonPage.model_validate(results["comparison_page"])
     assert len(results.get("errors", [])) == 0
-    assert len(results.get("logs", [])) > 5
\ No newline at end of file
+    assert len(results.get("logs", [])) > 5
+    assert {"parse_data", "build_faq", "build_comparison"} <= set(metrics.snapshot())
+
+
+def test_fake_model_failures_are_retried(sample_product_data):
+    llm = FakeChatModel(latency=0, failure_rate=0.3, seed=1)
+
+    results = ContentGeneration(llm=llm).execute(sample_product_data)
+
+    assert llm.failures > 0
+    ProductPage.model_validate(results["product_page"])
+
+
+def test_fake_latency_distributions_keep_their_mean():
+    for distribution in FakeChatModel.DISTRIBUTIONS:
+        llm = FakeChatModel(latency=0.1, distribution=distribution, seed=3)
+        samples = [llm._delay() for _ in range(4000)]
+        assert abs(sum(samples) / len(samples) - 0.1) < 0.01, distribution
+        assert min(samples) >= 0
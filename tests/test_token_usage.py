@@ -0,0 +1,53 @@
+import asyncio
+
+from ..benchmarks.fake_llm import FakeChatModel
+from ..model.schema import UsageBlock
+from ..utils.llm import bind_llm
+from ..utils.metrics import MetricsRegistry, NodeRun, metrics, node_run
+from ..utils.prompt_context import compact_prompt, product_context
+
+
+def test_calls_are_attributed_to_the_enclosing_node():
+    metrics.reset()
+    runner = bind_llm(FakeChatModel(latency=0), UsageBlock, cache=None, limiter=None)
+
+    with node_run("generate_usage"):
+        runner.invoke("usage prompt")
+
+    async def in_task():
+        with node_run("build_faq"):
+            await runner.ainvoke("faq prompt")
+
+    asyncio.run(in_task())
+    runner.invoke("outside any node")
+
+    usage = metrics.summary()
+    assert set(usage["nodes"]) == {"generate_usage", "build_faq", "unattributed"}
+    assert usage["nodes"]["generate_usage"]["llm_calls"] == 1
+    assert usage["nodes"]["generate_usage"]["prompt_tokens"] > 0
+    assert usage["nodes"]["unattributed"]["runs"] == 0
+    assert usage["total"]["llm_calls"] == 3
+
+
+def test_report_has_a_row_per_node_and_a_total():
+    registry = MetricsRegistry()
+    run = NodeRun("generate_usage")
+    run.add(runs=1, cache_hits=1)
+    run.llm_call("fake-8b", 100, 20)
+    registry.add(run)
+
+    lines = registry.report().splitlines()
+    assert lines[1].split()[-4:] == ["1", "1", "100", "20"]
+    assert lines[-1].split()[0] == "total" and lines[-1].split()[-4:] == ["1", "1", "100", "20"]
+
+
+def test_product_context_is_one_compact_line_per_field():
+    product = {"name": "Serum", "skin_types": ["Oily", "Combination"],
+               "price": {"amount": 699, "currency": "INR", "display": "₹699"}, "side_effects": None}
+
+    context = product_context(product, ("name", "skin_types", "price"))
+
+    assert context == "name: Serum\nskin_types: Oily, Combination\nprice: ₹699"
+    assert compact_prompt("""Line one.
+            Line two.
+        """) == "Line one.\nLine two."
@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+from ..benchmarks.fake_llm import FakeChatModel
+from ..main import ContentGeneration, product_id
+from ..utils.tracing import Tracer, tracer
+
+
+def spans_nest_strictly(events):
+    """Trace viewers need spans on one track to be disjoint or nested"""
+    tracks = {}
+    for event in events:
+        if event["ph"] == "X":
+            tracks.setdefault((event["pid"], event["tid"]), []).append((event["ts"], event["ts"] + event["dur"]))
+    for spans in tracks.values():
+        open_ends = []
+        for start, end in sorted(spans, key=lambda span: (span[0], -span[1])):
+            while open_ends and open_ends[-1] <= start:
+                open_ends.pop()
+            if open_ends and end > open_ends[-1] + 1e-3:
+                return False
+            open_ends.append(end)
+    return True
+
+
+def test_batch_trace_has_a_process_per_product_and_a_track_per_node(sample_product_data, tmp_path):
+    products = [{**sample_product_data, "name": f"Serum {i}"} for i in range(3)]
+    orchestrator = ContentGeneration(llm=FakeChatModel(latency=0.001, failure_rate=0.2, seed=2))
+
+    async def consume():
+        return [state async for _, state in orchestrator.astream_catalog(products, concurrency=3)]
+
+    tracer.start()
+    try:
+        asyncio.run(consume())
+    finally:
+        tracer.stop()
+    path = tmp_path / "trace.json"
+    tracer.write(str(path))
+    events = json.loads(path.read_text())["traceEvents"]
+
+    processes = {event["args"]["name"] for event in events if event["name"] == "process_name"}
+    assert processes == {product_id(product) for product in products}
+    threads = {event["args"]["name"] for event in events if event["name"] == "thread_name"}
+    assert {"pipeline", "parse_data", "generate_benefits", "build_faq", "build_comparison"} <= threads
+
+    categories = {event.get("cat") for event in events if event["ph"] == "X"}
+    assert {"product", "node", "retry", "llm"} <= categories
+    assert spans_nest_strictly(events)
+
+
+def test_overlapping_children_get_their_own_lane():
+    local = Tracer()
+    local.start()
+
+    async def shard(name, delay):
+        with local.span(name, "retry"):
+            await asyncio.sleep(delay)
+
+    async def build_faq():
+        with local.span("build_faq", "node", track="build_faq"):
+            await asyncio.gather(shard("shard 1", 0.01), shard("shard 2", 0.03))
+            await shard("shard 3", 0)
+
+    asyncio.run(build_faq())
+
+    events = local.events()
+    names = {event["tid"]: event["args"]["name"] for event in events if event["name"] == "thread_name"}
+    lanes = {event["name"]: names[event["tid"]] for event in events if event["ph"] == "X"}
+    assert lanes == {"build_faq": "build_faq", "shard 1": "build_faq", "shard 2": "build_faq #2", "shard 3": "build_faq"}
+
+
+def test_stopped_tracer_records_nothing():
+    local = Tracer()
+    with local.span("build_faq", "node", track="build_faq") as args:
+        args["reused"] = True
+    assert local.events() == []
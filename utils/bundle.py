@@ -0,0 +1,173 @@
+"""
+Compressed, indexed page bundle for catalog runs.
+
+Instead of three JSON files per product, a catalog run can append every
+page to one zstandard-compressed JSONL bundle. Each line is
+
+    {"product_id": ..., "page": "faq_page" | "product_page" | "comparison_page", "data": {...}}
+
+and lines are grouped into independent zstd frames of BUNDLE_FRAME_PRODUCTS
+products. Concatenated frames are themselves a valid zstd stream, so
+`zstdcat bundle.jsonl.zst` still reads the whole bundle. A side index
+(`<bundle>.idx`, one JSON line per product) records the byte offset and
+length of the product's frame and the product's first line inside it, so
+`BundleReader.page()` decompresses one small frame instead of the bundle.
+
+A frame is written and fsynced before its index lines, so after a crash
+the index never points past the data, and a product in the index has its
+pages on disk — `add`/`flush` return those products, which is when a
+catalog run may let go of their checkpoints. Reopening with `append` cuts
+off whatever a crash left past the last indexed frame.
+"""
+import os
+import threading
+from pathlib import Path
+from typing_extensions import Any, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+import zstandard
+
+from ..config import config
+from .output_writer import PAGE_FILES, dumps
+
+PAGES = tuple(PAGE_FILES.values())
+
+
+def index_path(path) -> Path:
+    return Path(f"{path}.idx")
+
+
+class BundleWriter:
+    """Appends products' pages to a bundle, one zstd frame per BUNDLE_FRAME_PRODUCTS products"""
+
+    def __init__(self, path, frame_products: Optional[int] = None, level: Optional[int] = None, append: bool = False):
+        self.path = Path(path)
+        self.frame_products = max(1, frame_products or config.BUNDLE_FRAME_PRODUCTS)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        mode = "ab" if append else "wb"
+        if append:
+            self._recover()
+        self._data = open(self.path, mode)
+        self._index = open(index_path(self.path), mode)
+        self._offset = self._data.seek(0, 2)
+        self._compressor = zstandard.ZstdCompressor(level=config.BUNDLE_COMPRESSION_LEVEL if level is None else level,
+                                                    write_content_size=True)
+        self._lines: List[bytes] = []
+        self._products: List[Tuple[str, int]] = []
+        self._lock = threading.Lock()
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+    def add(self, product_id: str, results: Dict[str, Any]) -> List[str]:
+        """
+        Queue a product's pages (from a final state or result record). A full
+        frame is flushed; returns the products it made durable, else [].
+        """
+        with self._lock:
+            self._products.append((product_id, len(self._lines)))
+            self._lines.extend(dumps({"product_id": product_id, "page": page, "data": results.get(page) or {}}) + b"\n"
+                               for page in PAGES)
+            if len(self._products) >= self.frame_products:
+                return self._flush()
+            return []
+
+    def flush(self) -> List[str]:
+        """Write out the partial frame; returns the products it made durable"""
+        with self._lock:
+            return self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._data.close()
+            self._index.close()
+
+    def __enter__(self) -> "BundleWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _flush(self) -> List[str]:
+        if not self._products:
+            return []
+        raw = b"".join(self._lines)
+        frame = self._compressor.compress(raw)
+        # Once per frame, so always on disk before the index line that vouches for it
+        self._data.write(frame)
+        self._data.flush()
+        os.fsync(self._data.fileno())
+        self._index.write(b"".join(
+            dumps({"product_id": product_id, "offset": self._offset, "length": len(frame), "line": line}) + b"\n"
+            for product_id, line in self._products
+        ))
+        self._index.flush()
+        os.fsync(self._index.fileno())
+        flushed = [product_id for product_id, _ in self._products]
+        self._offset += len(frame)
+        self.raw_bytes += len(raw)
+        self.compressed_bytes += len(frame)
+        self._lines, self._products = [], []
+        return flushed
+
+    def _recover(self) -> None:
+        """Drop a half-written index line and any data past the last indexed frame"""
+        end = 0
+        if index_path(self.path).exists():
+            with open(index_path(self.path), "r+b") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    data = data[:data.rfind(b"\n") + 1]
+                    f.truncate(len(data))
+            for line in data.splitlines():
+                if line.strip():
+                    entry = orjson.loads(line)
+                    end = max(end, entry["offset"] + entry["length"])
+        if self.path.exists() and self.path.stat().st_size > end:
+            os.truncate(self.path, end)
+
+
+class BundleReader:
+    """Random access to a bundle's pages through its side index"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        # A product written twice (e.g. a rerun appended to the bundle) resolves to its latest frame
+        self.index: Dict[str, Dict[str, int]] = {}
+        with open(index_path(self.path), "rb") as f:
+            for line in f:
+                # A line a crash cut short vouches for nothing
+                if line.endswith(b"\n") and line.strip():
+                    entry = orjson.loads(line)
+                    self.index[entry["product_id"]] = entry
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, product_id: str) -> bool:
+        return product_id in self.index
+
+    def pages(self, product_id: str) -> Dict[str, Any]:
+        """All pages of one product; decompresses only the frame holding it"""
+        entry = self.index[product_id]
+        with open(self.path, "rb") as f:
+            f.seek(entry["offset"])
+            frame = f.read(entry["length"])
+        lines = self._decompressor.decompress(frame).splitlines()
+        records = (orjson.loads(line) for line in lines[entry["line"]:entry["line"] + len(PAGES)])
+        return {record["page"]: record["data"] for record in records}
+
+    def page(self, product_id: str, page: str) -> Any:
+        return self.pages(product_id)[page]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Every line of the bundle in write order, streamed across frames"""
+        with open(self.path, "rb") as f:
+            reader = self._decompressor.stream_reader(f, read_across_frames=True)
+            buffered = b""
+            while chunk := reader.read(1 << 20):
+                buffered += chunk
+                *lines, buffered = buffered.split(b"\n")
+                for line in lines:
+                    yield orjson.loads(line)
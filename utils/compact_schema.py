@@ -0,0 +1,113 @@
+"""
+Compact tool schemas for structured output.
+
+`with_structured_output(Model)` sends the model's full JSON schema with
+every request: each `Field(description=...)`, examples, defaults and the
+nested models' docstrings. `compact_schema(Model)` builds a minimised
+schema once per model — refs inlined, titles, examples and defaults
+dropped, descriptions cut to one short sentence and left out entirely when
+they only restate the field name — and caches it. The model is bound with
+the compact schema; its output is still validated against the full
+pydantic model (see LLMRunner).
+"""
+import json
+import re
+import threading
+from typing_extensions import Any, Dict, Iterable, List, Optional, Type
+
+from pydantic import BaseModel
+
+from ..config import config
+from .rate_limiter import estimate_tokens
+
+_cache: Dict[Type[BaseModel], Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+# Keys that shape the output; everything else (title, examples, default, ...) is dropped
+_KEEP = ("type", "properties", "required", "items", "enum", "anyOf", "const", "description")
+# Words that add nothing to a description beyond the field name
+_FILLER = {"the", "a", "an", "of", "text", "list", "identifier", "info", "information"}
+
+
+def compact_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Minimised JSON schema for `model`, built on first use and cached"""
+    schema = _cache.get(model)
+    if schema is None:
+        with _lock:
+            schema = _cache.setdefault(model, _build(model))
+    return schema
+
+
+def _build(model: Type[BaseModel]) -> Dict[str, Any]:
+    full = model.model_json_schema()
+    body = _compact(full, full.get("$defs", {}), field_name=None)
+    body.pop("description", None)
+    schema = {"title": model.__name__}
+    description = _trim((model.__doc__ or "").strip())
+    if description:
+        schema["description"] = description
+    return {**schema, **body}
+
+
+def _compact(node: Dict[str, Any], defs: Dict[str, Any], field_name: Optional[str]) -> Dict[str, Any]:
+    if "$ref" in node:
+        node = defs[node["$ref"].rsplit("/", 1)[-1]]
+        # A nested model's docstring describes the class, not this field
+        node = {k: v for k, v in node.items() if k != "description"}
+    out = {}
+    for key in _KEEP:
+        if key not in node:
+            continue
+        value = node[key]
+        if key == "properties":
+            value = {name: _compact(prop, defs, name) for name, prop in value.items()}
+        elif key == "items":
+            value = _compact(value, defs, None)
+        elif key == "anyOf":
+            value = [_compact(option, defs, None) for option in value]
+        elif key == "description":
+            value = _trim(value, field_name)
+            if not value:
+                continue
+        out[key] = value
+    return out
+
+
+def _trim(description: str, field_name: Optional[str] = None) -> str:
+    """First sentence, capped at LLM_SCHEMA_DESCRIPTION_CHARS; empty when it only restates the field name"""
+    sentence = re.split(r"(?<=[.!?])\s", description.strip(), maxsplit=1)[0].rstrip(".")
+    if field_name is not None:
+        words = set(re.findall(r"[a-z]+", sentence.lower())) - _FILLER
+        if words <= set(field_name.lower().split("_")):
+            return ""
+    limit = config.LLM_SCHEMA_DESCRIPTION_CHARS
+    if len(sentence) > limit:
+        sentence = sentence[:limit].rsplit(" ", 1)[0]
+    return sentence
+
+
+def schema_tokens(schema: Any) -> int:
+    """Estimated tokens of the tool definition sent for `schema` (a pydantic model or a dict schema)"""
+    from langchain_core.utils.function_calling import convert_to_openai_tool
+    return estimate_tokens(json.dumps(convert_to_openai_tool(schema)))
+
+
+def savings(models: Iterable[Type[BaseModel]]) -> List[Dict[str, Any]]:
+    """Per-schema tool-definition tokens, full vs compact"""
+    rows = []
+    for model in models:
+        full, compact = schema_tokens(model), schema_tokens(compact_schema(model))
+        rows.append({"schema": model.__name__, "full_tokens": full, "compact_tokens": compact,
+                     "saved": 1 - compact / full if full else 0.0})
+    return rows
+
+
+def savings_report(models: Iterable[Type[BaseModel]]) -> str:
+    """Fixed-width table of per-schema token savings"""
+    rows = savings(models)
+    lines = [f"{'schema':<22} {'full':>6} {'compact':>8} {'saved':>7}"]
+    for row in rows:
+        lines.append(f"{row['schema']:<22} {row['full_tokens']:>6} {row['compact_tokens']:>8} {row['saved']:>7.0%}")
+    full, compact = sum(r["full_tokens"] for r in rows), sum(r["compact_tokens"] for r in rows)
+    lines.append(f"{'total':<22} {full:>6} {compact:>8} {(1 - compact / full) if full else 0:>7.0%}")
+    return "\n".join(lines)
@@ -0,0 +1,109 @@
+"""
+Field-level incremental regeneration.
+
+Every agent declares the state paths it `reads` (e.g. "product_model.benefits")
+and the state keys it `writes`. When a node succeeds, a fingerprint of its
+read values is stored under `input_fingerprints[node]`. A later run that is
+given the previous final state reuses a node's prior outputs whenever the
+fingerprint of its inputs is unchanged, and only re-executes the rest.
+Outputs produced by a fallback (an update carrying `errors`) are never
+fingerprinted, so they are regenerated on the next run. An agent whose
+output also depends on something outside the state (another catalog
+entry) exposes it through `external_inputs(state)`, which is hashed into
+the fingerprint alongside its reads.
+"""
+import json
+from typing_extensions import Any, Callable, Dict, Optional, Sequence
+
+import xxhash
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+
+from .metrics import node_run
+from .tracing import tracer
+
+_MISSING = "<missing>"
+
+
+def product_fields(*fields: str) -> tuple:
+    """State paths for the given product_model fields"""
+    return tuple(f"product_model.{field}" for field in fields)
+
+
+def resolve(state: Dict[str, Any], path: str) -> Any:
+    """Value at a dotted state path, or a sentinel when any segment is absent"""
+    value = state
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def fingerprint(state: Dict[str, Any], reads: Sequence[str], external: Any = None) -> str:
+    values = [resolve(state, path) for path in reads]
+    if external is not None:
+        values.append(external)
+    return xxhash.xxh3_64_hexdigest(json.dumps(values, sort_keys=True, ensure_ascii=False, default=str))
+
+
+def reuse_previous(node: str, previous: Optional[Dict[str, Any]], input_fingerprint: str,
+                   writes: Sequence[str]) -> Optional[Dict[str, Any]]:
+    """Prior outputs of `node` if its inputs are unchanged since `previous`, else None"""
+    if not previous:
+        return None
+    if previous.get("input_fingerprints", {}).get(node) != input_fingerprint:
+        return None
+    if not all(previous.get(key) for key in writes):
+        return None
+
+    update = {key: previous[key] for key in writes}
+    update["input_fingerprints"] = {node: input_fingerprint}
+    update["logs"] = [f"[{node}] Reused previous output — inputs unchanged"]
+    return update
+
+
+def record(node: str, update: Dict[str, Any], input_fingerprint: str, writes: Sequence[str]) -> Dict[str, Any]:
+    """Attach the input fingerprint to a successful, complete update"""
+    if update.get("errors") or not all(update.get(key) for key in writes):
+        return update
+    return {**update, "input_fingerprints": {node: input_fingerprint}}
+
+
+def incremental_node(node: str, agent, func: Callable, afunc: Callable) -> RunnableLambda:
+    """Wrap an agent's sync/async node functions with reuse of unchanged outputs, per-node metrics (token accounting included) and trace spans"""
+    reads, writes = agent.reads, agent.writes
+    external_inputs = getattr(agent, "external_inputs", None)
+
+    def input_fingerprint_of(state) -> str:
+        return fingerprint(state, reads, external_inputs(state) if external_inputs else None)
+
+    def previous_state(config: RunnableConfig) -> Optional[Dict[str, Any]]:
+        return (config or {}).get("configurable", {}).get("previous_state")
+
+    def run(state, config: RunnableConfig):
+        with node_run(node) as node_metrics, tracer.span(node, "node", track=node) as trace_args:
+            input_fingerprint = input_fingerprint_of(state)
+            update = reuse_previous(node, previous_state(config), input_fingerprint, writes)
+            if update is None:
+                update = record(node, func(state), input_fingerprint, writes)
+            else:
+                node_metrics.add(reused=1)
+                trace_args["reused"] = True
+            node_metrics.add(fallbacks=int(bool(update.get("errors"))))
+            trace_args["fallback"] = bool(update.get("errors"))
+        return update
+
+    async def arun(state, config: RunnableConfig):
+        with node_run(node) as node_metrics, tracer.span(node, "node", track=node) as trace_args:
+            input_fingerprint = input_fingerprint_of(state)
+            update = reuse_previous(node, previous_state(config), input_fingerprint, writes)
+            if update is None:
+                update = record(node, await afunc(state), input_fingerprint, writes)
+            else:
+                node_metrics.add(reused=1)
+                trace_args["reused"] = True
+            node_metrics.add(fallbacks=int(bool(update.get("errors"))))
+            trace_args["fallback"] = bool(update.get("errors"))
+        return update
+
+    return RunnableLambda(run, afunc=arun, name=node)
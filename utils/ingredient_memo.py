@@ -0,0 +1,131 @@
+"""
+Persistent memo of ingredient purposes shared across products.
+
+An ingredient's purpose ("Brightens and protects against free radicals")
+hardly changes between SKUs, so once the model has described it the
+IngredientsBlockAgent reuses the description for every later product and
+only sends unseen ingredients to the LLM. Names are folded to a canonical
+form first — "L-Ascorbic Acid" and "vitamin c" both become "Vitamin C" —
+so synonyms share one entry, keyed by `key()`. Names are only folded for
+the lookup: pages keep the product's own ingredient names. Entries live in a local SQLite file and are
+loaded into memory on open; lookups never touch the disk.
+"""
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing_extensions import Dict, Iterable, List, Optional, Tuple
+
+from ..config import config
+
+
+class IngredientMemo:
+    """Canonical ingredient name -> purpose, backed by SQLite"""
+
+    # Lower-cased alias -> canonical name
+    SYNONYMS = {
+        "l-ascorbic acid": "Vitamin C",
+        "l ascorbic acid": "Vitamin C",
+        "ascorbic acid": "Vitamin C",
+        "vit c": "Vitamin C",
+        "vitamin c": "Vitamin C",
+        "sodium hyaluronate": "Hyaluronic Acid",
+        "hyaluronan": "Hyaluronic Acid",
+        "hyaluronic acid": "Hyaluronic Acid",
+        "nicotinamide": "Niacinamide",
+        "vitamin b3": "Niacinamide",
+        "niacinamide": "Niacinamide",
+        "d-panthenol": "Panthenol",
+        "provitamin b5": "Panthenol",
+        "vitamin b5": "Panthenol",
+        "panthenol": "Panthenol",
+        "tocopherol": "Vitamin E",
+        "tocopheryl acetate": "Vitamin E",
+        "vitamin e": "Vitamin E",
+        "retinol": "Retinol",
+        "vitamin a": "Retinol",
+        "beta hydroxy acid": "Salicylic Acid",
+        "bha": "Salicylic Acid",
+        "salicylic acid": "Salicylic Acid",
+        "ferulic acid": "Ferulic Acid",
+    }
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS ingredients (
+                key TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                purpose TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._entries: Dict[str, Tuple[str, str]] = {
+            key: (name, purpose) for key, name, purpose in self._conn.execute("SELECT key, name, purpose FROM ingredients")
+        }
+
+    @classmethod
+    def canonical(cls, name: str) -> str:
+        """Canonical display name: the synonym table's entry, else the name with whitespace tidied"""
+        tidy = " ".join(str(name).split())
+        return cls.SYNONYMS.get(tidy.lower(), tidy)
+
+    @classmethod
+    def key(cls, name: str) -> str:
+        return re.sub(r"[^a-z0-9]+", " ", cls.canonical(name).lower()).strip()
+
+    def lookup(self, names: Iterable[str]) -> Tuple[Dict[str, str], List[str]]:
+        """(key -> purpose for known ingredients, the given names not yet described, one per key)"""
+        known, unknown = {}, {}
+        with self._lock:
+            for name in names:
+                key = self.key(name)
+                entry = self._entries.get(key)
+                if entry is not None:
+                    known[key] = entry[1]
+                else:
+                    unknown.setdefault(key, name)
+            self.hits += len(known)
+            self.misses += len(unknown)
+        return known, list(unknown.values())
+
+    def put_many(self, purposes: Dict[str, str]) -> None:
+        now = time.time()
+        rows = [(self.key(name), self.canonical(name), purpose, now) for name, purpose in purposes.items() if purpose]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ingredients (key, name, purpose, updated_at) VALUES (?, ?, ?, ?)", rows
+            )
+            for key, name, purpose, _ in rows:
+                self._entries[key] = (name, purpose)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_memo: Optional[IngredientMemo] = None
+_memo_lock = threading.Lock()
+
+
+def get_ingredient_memo() -> Optional[IngredientMemo]:
+    """Process-wide memo built from config, or None when it is disabled"""
+    global _memo
+    if not config.INGREDIENT_MEMO_ENABLED:
+        return None
+    with _memo_lock:
+        if _memo is None:
+            _memo = IngredientMemo(config.INGREDIENT_MEMO_PATH)
+        return _memo
@@ -0,0 +1,286 @@
+"""
+Single entry point for every LLM call the agents make.
+
+`bind_llm(llm, Schema)` replaces `llm.with_structured_output(Schema)` in the
+agents: it returns an `LLMRunner` exposing the same `invoke`/`ainvoke`, with
+the response cache consulted before the provider is called and every
+provider call queued through the process-wide rate limiter.
+`bind_llm(llm)` does the same for plain-text calls and returns the message
+content as a string. `include_raw=True` mirrors LangChain's option of the
+same name: the result is `{"raw", "parsed", "parsing_error"}` so callers can
+salvage the valid parts of an output that failed validation as a whole.
+
+Structured output that fails validation is repaired before anyone retries
+(see utils/repair.py): local shape fixes first, then one short call that
+sends back only the raw output and the validation errors. Only if that
+fails does the error reach the retry executor, which re-asks the original
+prompt — or, for a node routed to a smaller model (`RoutedModel`), the
+original prompt goes to the larger model first.
+
+With LLM_COMPACT_SCHEMAS the model is bound with the compact tool schema
+from utils/compact_schema.py; its dict output is validated here against the
+full pydantic model, so callers still receive model instances.
+"""
+import json
+import logging
+import time
+from typing_extensions import Any, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+from ..config import config
+from . import metrics
+from .compact_schema import compact_schema
+from .llm_cache import LLMCache, get_llm_cache
+from .rate_limiter import DEFAULT_RATE_LIMIT_PAUSE, RateLimiter, estimate_tokens, get_rate_limiter, is_rate_limit_error, retry_after_seconds
+from .repair import failed_generation, raw_arguments, repair_prompt, validate_with_fixes
+from .tracing import tracer
+from langchain_core.exceptions import OutputParserException
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT = object()
+
+
+def model_name_of(llm) -> str:
+    """Provider model identifier, used in cache keys and logs"""
+    return str(getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__)
+
+
+class RoutedModel:
+    """A node's chat model plus the larger model it escalates to when output fails validation"""
+
+    def __init__(self, llm, escalation=None):
+        self.llm = llm
+        self.escalation = escalation
+        self.model_name = model_name_of(llm)
+
+
+class LLMRunner:
+    """Cached wrapper around a structured-output (or plain) chat model runnable"""
+
+    def __init__(self, llm, schema: Optional[Type[BaseModel]] = None, cache: Optional[LLMCache] = _DEFAULT,
+                 limiter: Optional[RateLimiter] = _DEFAULT, include_raw: bool = False,
+                 escalation: Optional["LLMRunner"] = None):
+        self.llm = llm
+        self.escalation = escalation
+        self.schema = schema
+        self.include_raw = bool(schema) and include_raw
+        self.model_name = model_name_of(llm)
+        # The schema the provider sees; validation always uses the full model
+        self.bound_schema = (compact_schema(schema) if config.LLM_COMPACT_SCHEMAS else schema) if schema else None
+        # Structured calls always keep the raw message so invalid output can be repaired
+        self.runnable = llm.with_structured_output(self.bound_schema, include_raw=True) if schema else llm
+        self.cache = get_llm_cache() if cache is _DEFAULT else cache
+        self.limiter = get_rate_limiter() if limiter is _DEFAULT else limiter
+        if not schema:
+            self._schema_key = "text"
+        elif isinstance(self.bound_schema, dict):
+            self._schema_key = json.dumps(self.bound_schema, sort_keys=True)
+        else:
+            self._schema_key = json.dumps(schema.model_json_schema(), sort_keys=True)
+        # The tool schema is resent with every structured request
+        self._schema_tokens = estimate_tokens(self._schema_key) if schema else 0
+        self._fixed_tokens = self._schema_tokens + config.LLM_EXPECTED_COMPLETION_TOKENS
+
+    def invoke(self, prompt: Any, **kwargs) -> Any:
+        key = self._cache_key(prompt)
+        cached = self._lookup(key)
+        if cached is not None:
+            metrics.record(cache_hits=1)
+            return cached
+
+        result = self._call(prompt, **kwargs)
+        if self.schema:
+            result = self._settle(result)
+            if result["parsed"] is None and result.get("repair_prompt") and config.LLM_REPAIR_ENABLED:
+                result = self._settle(self._call(result["repair_prompt"], **kwargs), fallback=result)
+            if result["parsed"] is None and self.escalation is not None:
+                logger.info(f"[LLMRunner] Escalating {self.schema.__name__} from {self.model_name} to {self.escalation.model_name}")
+                return self._remember(key, self.escalation.invoke(prompt, **kwargs))
+        return self._store(key, result)
+
+    async def ainvoke(self, prompt: Any, **kwargs) -> Any:
+        key = self._cache_key(prompt)
+        cached = self._lookup(key)
+        if cached is not None:
+            metrics.record(cache_hits=1)
+            return cached
+
+        result = await self._acall(prompt, **kwargs)
+        if self.schema:
+            result = self._settle(result)
+            if result["parsed"] is None and result.get("repair_prompt") and config.LLM_REPAIR_ENABLED:
+                result = self._settle(await self._acall(result["repair_prompt"], **kwargs), fallback=result)
+            if result["parsed"] is None and self.escalation is not None:
+                logger.info(f"[LLMRunner] Escalating {self.schema.__name__} from {self.model_name} to {self.escalation.model_name}")
+                return self._remember(key, await self.escalation.ainvoke(prompt, **kwargs))
+        return self._store(key, result)
+
+    def _call(self, prompt: Any, **kwargs) -> Any:
+        with tracer.span("llm_call", "llm", model=self.model_name) as trace_args:
+            if self.limiter is not None:
+                queued = time.perf_counter()
+                reserved = self._estimate_tokens(prompt)
+                self.limiter.acquire(reserved)
+                trace_args["queue_ms"] = self._record_queue(queued)
+            try:
+                result = self.runnable.invoke(prompt, **kwargs)
+            except Exception as e:
+                trace_args["error"] = type(e).__name__
+                return self._on_provider_error(e)
+            used = self._account(prompt, result)
+            if self.limiter is not None:
+                self.limiter.settle(reserved, used)
+            return result
+
+    async def _acall(self, prompt: Any, **kwargs) -> Any:
+        with tracer.span("llm_call", "llm", model=self.model_name) as trace_args:
+            if self.limiter is not None:
+                queued = time.perf_counter()
+                reserved = self._estimate_tokens(prompt)
+                await self.limiter.aacquire(reserved)
+                trace_args["queue_ms"] = self._record_queue(queued)
+            try:
+                result = await self.runnable.ainvoke(prompt, **kwargs)
+            except Exception as e:
+                trace_args["error"] = type(e).__name__
+                return self._on_provider_error(e)
+            used = self._account(prompt, result)
+            if self.limiter is not None:
+                self.limiter.settle(reserved, used)
+            return result
+
+    @staticmethod
+    def _record_queue(queued: float) -> float:
+        """Add the time spent waiting for the rate limiter to the node's metrics; returns it in ms"""
+        seconds = time.perf_counter() - queued
+        metrics.record(queue_seconds=seconds)
+        return round(seconds * 1e3, 3)
+
+    def _settle(self, result: Any, fallback: Optional[dict] = None) -> dict:
+        """
+        Normalise a structured result to {"raw", "parsed", "parsing_error"},
+        fixing invalid output locally where possible. An unfixable result
+        carries a `repair_prompt` for one follow-up call.
+        """
+        if isinstance(result, BaseModel):
+            return {"raw": None, "parsed": result, "parsing_error": None}
+        parsed = result.get("parsed")
+        if isinstance(parsed, BaseModel):
+            return result
+        if isinstance(parsed, dict):
+            # Bound with a compact dict schema: the provider returns plain arguments
+            try:
+                return {**result, "parsed": self.schema.model_validate(parsed), "parsing_error": None}
+            except ValidationError:
+                pass
+
+        args = parsed if isinstance(parsed, dict) else result.get("args") or raw_arguments(result.get("raw"))
+        if args is None:
+            return fallback or {**result, "parsed": None, "parsing_error": result.get("parsing_error") or
+                                OutputParserException(f"No {self.schema.__name__} in model output")}
+
+        parsed, error = validate_with_fixes(self.schema, args)
+        if parsed is not None:
+            logger.info(f"[LLMRunner] Repaired {self.schema.__name__} output {'with a repair call' if fallback else 'locally'}")
+            return {"raw": result.get("raw"), "parsed": parsed, "parsing_error": None}
+        if fallback is not None:
+            return {**fallback, "parsing_error": error, "repair_prompt": None}
+        return {**result, "parsed": None, "parsing_error": error, "repair_prompt": repair_prompt(self.schema, args, error)}
+
+    def _estimate_tokens(self, prompt: Any) -> int:
+        return self._prompt_tokens(prompt) + config.LLM_EXPECTED_COMPLETION_TOKENS
+
+    def _prompt_tokens(self, prompt: Any) -> int:
+        text = prompt if isinstance(prompt, str) else json.dumps(prompt, ensure_ascii=False, default=str)
+        return estimate_tokens(text) + self._schema_tokens
+
+    def _account(self, prompt: Any, result: Any) -> int:
+        """
+        Record the call's tokens against the running node — provider usage
+        if reported, else estimates — and return their total
+        """
+        raw = result.get("raw") if isinstance(result, dict) else result
+        usage = getattr(raw, "usage_metadata", None) or {}
+
+        completion = usage.get("output_tokens")
+        if completion is None:
+            if isinstance(result, BaseModel):
+                completion = estimate_tokens(result.model_dump_json())
+            elif isinstance(result, dict) and isinstance(result.get("parsed"), BaseModel):
+                completion = estimate_tokens(result["parsed"].model_dump_json())
+            elif isinstance(result, dict) and isinstance(result.get("parsed"), dict):
+                completion = estimate_tokens(json.dumps(result["parsed"], ensure_ascii=False))
+            elif isinstance(result, dict):
+                completion = estimate_tokens(json.dumps(raw_arguments(raw) or {}, ensure_ascii=False))
+            else:
+                completion = estimate_tokens(str(getattr(result, "content", "")))
+
+        prompt_tokens = usage.get("input_tokens") or self._prompt_tokens(prompt)
+        metrics.record_llm_call(self.model_name, prompt_tokens, completion)
+        return prompt_tokens + completion
+
+    def _on_provider_error(self, error: Exception) -> dict:
+        # A 429 means the shared budget is exhausted for everyone: hold all
+        # callers back instead of letting each agent hammer the provider
+        if self.limiter is not None and is_rate_limit_error(error):
+            self.limiter.pause(retry_after_seconds(error) or DEFAULT_RATE_LIMIT_PAUSE)
+        # A rejected tool call still carries the model's attempt — repair it
+        args = failed_generation(error) if self.schema else None
+        if args is None:
+            raise error
+        return {"raw": None, "parsed": None, "parsing_error": error, "args": args}
+
+    def _cache_key(self, prompt: Any) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return LLMCache.make_key(self.model_name, self._schema_key, prompt)
+
+    def _lookup(self, key: Optional[str]) -> Any:
+        if key is None:
+            return None
+        value = self.cache.get(key)
+        if value is None:
+            return None
+        if self.include_raw:
+            return {"raw": None, "parsed": self.schema.model_validate_json(value), "parsing_error": None}
+        if self.schema:
+            return self.schema.model_validate_json(value)
+        return json.loads(value)
+
+    def _remember(self, key: Optional[str], value: Any) -> Any:
+        """Also cache an escalated result under this model's key, so a re-run skips the failing small-model call"""
+        parsed = value.get("parsed") if self.include_raw else value
+        if key is not None and parsed is not None:
+            self.cache.put(key, parsed.model_dump_json())
+        return value
+
+    def _store(self, key: Optional[str], result: Any) -> Any:
+        if not self.schema:
+            if key is not None:
+                self.cache.put(key, json.dumps(result.content))
+            return result.content
+
+        parsed = result["parsed"]
+        # Only fully valid outputs are worth replaying
+        if key is not None and parsed is not None:
+            self.cache.put(key, parsed.model_dump_json())
+        if self.include_raw:
+            # A rejected tool call has no raw message; its arguments still let callers salvage parts
+            return {k: result.get(k) for k in ("raw", "parsed", "parsing_error", "args")}
+        if parsed is None:
+            raise result["parsing_error"]
+        return parsed
+
+
+def bind_llm(llm, schema: Optional[Type[BaseModel]] = None, cache: Optional[LLMCache] = _DEFAULT,
+             limiter: Optional[RateLimiter] = _DEFAULT, include_raw: bool = False) -> LLMRunner:
+    """Drop-in for `llm.with_structured_output(schema)`, routed through the cache and rate limiter"""
+    if isinstance(llm, RoutedModel):
+        # Plain text has no validation to fail, so only structured calls escalate
+        escalation = None
+        if schema and llm.escalation is not None:
+            escalation = bind_llm(llm.escalation, schema, cache=cache, limiter=limiter, include_raw=include_raw)
+        return LLMRunner(llm.llm, schema, cache=cache, limiter=limiter, include_raw=include_raw, escalation=escalation)
+    return LLMRunner(llm, schema, cache=cache, limiter=limiter, include_raw=include_raw)
@@ -0,0 +1,157 @@
+"""
+Persistent, content-addressed cache for LLM responses.
+
+Entries live in a local SQLite file keyed by an xxhash of (model, schema,
+prompt). Entries older than `max_age_seconds` are dropped on read and on
+open; when the stored payload exceeds `max_bytes` the least recently used
+entries are evicted.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing_extensions import Any, Dict, Optional
+
+import xxhash
+
+from ..config import config
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """SQLite-backed response store with age/size eviction and hit/miss counters"""
+
+    def __init__(self, path: str, max_bytes: int, max_age_seconds: float):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._expire()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(model_name: str, schema: str, prompt: Any) -> str:
+        """Content address of a request: hash of model name, schema and prompt"""
+        if not isinstance(prompt, str):
+            prompt = json.dumps(prompt, sort_keys=True, ensure_ascii=False, default=str)
+        digest = xxhash.xxh3_128()
+        for part in (model_name, schema, prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, size, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and now - row[2] > self.max_age_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_bytes -= row[1]
+                self.evictions += 1
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict_lru()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": self._total_bytes,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._total_bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _expire(self) -> None:
+        cursor = self._conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (time.time() - self.max_age_seconds,)
+        )
+        self.evictions += cursor.rowcount
+
+    def _evict_lru(self) -> None:
+        # Drop least recently used entries until the store is back under 90% of
+        # its budget, so a full cache doesn't evict on every single insert
+        target = int(self.max_bytes * 0.9)
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if self._total_bytes <= target:
+                break
+            evicted.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self.evictions += len(evicted)
+        logger.info(f"[LLMCache] Evicted {len(evicted)} entries ({self._total_bytes} bytes kept)")
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Process-wide cache built from config, or None when caching is disabled"""
+    global _cache
+    if not config.LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache(
+                config.LLM_CACHE_PATH,
+                max_bytes=config.LLM_CACHE_MAX_BYTES,
+                max_age_seconds=config.LLM_CACHE_MAX_AGE_SECONDS,
+            )
+        return _cache
@@ -0,0 +1,237 @@
+"""
+Structured per-node metrics.
+
+Every graph node registered through `incremental_node` runs inside
+`node_run(node)`, which puts a `NodeRun` record in a context variable. The
+layers underneath add to whichever run is current:
+
+- LLMRunner: provider calls per model, prompt/completion tokens, cache
+  hits and the time spent queued in the rate limiter;
+- RetryExecutor: attempts, retries and the time spent backing off.
+
+When the node finishes, its wall time and whether it reused a previous
+output or fell back (an update carrying `errors`) are added, and the run is
+folded into the process-wide `metrics` registry. Work done outside any node
+(a direct LLMRunner call) is counted under "unattributed". The registry is
+the one place LLM calls and tokens are accounted. The registry keeps counters
+and fixed-bucket histograms only, so its memory does not grow with the
+catalog. It exports Prometheus text format and a JSON summary.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing_extensions import Any, Dict, List, Optional
+
+# Upper bounds (seconds) of the wall-time histogram buckets; +Inf is implicit
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+COUNTERS = ("runs", "reused", "fallbacks", "attempts", "retries", "llm_calls", "cache_hits",
+            "prompt_tokens", "completion_tokens")
+SECONDS = ("wall_seconds", "queue_seconds", "backoff_seconds")
+# Entry for LLM calls and retries made outside any graph node
+UNATTRIBUTED = "unattributed"
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of `values` (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+class NodeRun:
+    """Metrics of one execution of one node; shared by the threads the node fans out to"""
+
+    def __init__(self, node: str):
+        self.node = node
+        self.values: Dict[str, float] = dict.fromkeys(COUNTERS + SECONDS, 0)
+        self.models: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, **values: float) -> None:
+        with self._lock:
+            for key, value in values.items():
+                self.values[key] += value
+
+    def llm_call(self, model: str, prompt_tokens: int, completion_tokens: int) -> None:
+        with self._lock:
+            self.models[model] += 1
+            self.values["llm_calls"] += 1
+            self.values["prompt_tokens"] += prompt_tokens
+            self.values["completion_tokens"] += completion_tokens
+
+
+_current_run: ContextVar[Optional[NodeRun]] = ContextVar("node_run", default=None)
+
+
+def current_run() -> Optional[NodeRun]:
+    return _current_run.get()
+
+
+def record(**values: float) -> None:
+    """Add to the current node run's counters, or to "unattributed" outside any node"""
+    run = _current_run.get()
+    if run is not None:
+        run.add(**values)
+    else:
+        unattributed = NodeRun(UNATTRIBUTED)
+        unattributed.add(**values)
+        metrics.add(unattributed)
+
+
+def record_llm_call(model: str, prompt_tokens: int, completion_tokens: int) -> None:
+    """Count one provider call and its tokens against the current node run, or against the unattributed entry"""
+    run = _current_run.get()
+    if run is not None:
+        run.llm_call(model, prompt_tokens, completion_tokens)
+    else:
+        unattributed = NodeRun(UNATTRIBUTED)
+        unattributed.llm_call(model, prompt_tokens, completion_tokens)
+        metrics.add(unattributed)
+
+
+@contextmanager
+def node_run(node: str):
+    """Collect metrics of the code inside the block as one run of `node`"""
+    run = NodeRun(node)
+    token = _current_run.set(run)
+    started = time.perf_counter()
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+        run.add(runs=1, wall_seconds=time.perf_counter() - started)
+        metrics.add(run)
+
+
+class MetricsRegistry:
+    """Process-wide per-node counters and wall-time histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nodes: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, run: NodeRun) -> None:
+        with self._lock:
+            totals = self._nodes.setdefault(run.node, {
+                **dict.fromkeys(COUNTERS + SECONDS, 0),
+                "models": Counter(),
+                "buckets": [0] * (len(BUCKETS) + 1),
+            })
+            for key, value in run.values.items():
+                totals[key] += value
+            totals["models"].update(run.models)
+            if run.values["runs"]:
+                totals["buckets"][bisect_left(BUCKETS, run.values["wall_seconds"])] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                node: {**totals, "models": dict(totals["models"]), "buckets": list(totals["buckets"])}
+                for node, totals in sorted(self._nodes.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._nodes.clear()
+
+    @staticmethod
+    def bucket_percentile(buckets: List[int], q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (inf past the last bound)"""
+        target, seen = q / 100 * sum(buckets), 0
+        for bound, count in zip((*BUCKETS, float("inf")), buckets):
+            seen += count
+            if count and seen >= target:
+                return bound
+        return 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-serialisable per-node summary plus totals"""
+        nodes = {}
+        for node, totals in self.snapshot().items():
+            runs = totals["runs"] or 1
+            nodes[node] = {
+                **{key: totals[key] for key in COUNTERS},
+                **{key: round(totals[key], 6) for key in SECONDS},
+                "mean_wall_seconds": round(totals["wall_seconds"] / runs, 6),
+                "p50_wall_seconds_le": self.bucket_percentile(totals["buckets"], 50),
+                "p95_wall_seconds_le": self.bucket_percentile(totals["buckets"], 95),
+                "models": totals["models"],
+            }
+        total = {key: sum(stats[key] for stats in nodes.values()) for key in COUNTERS + SECONDS}
+        return {"nodes": nodes, "total": total}
+
+    def prometheus(self, prefix: str = "content_pipeline") -> str:
+        """Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        family("node_wall_seconds", "histogram", "Wall time per node run")
+        for node, totals in snapshot.items():
+            cumulative = 0
+            for bound, count in zip((*BUCKETS, "+Inf"), totals["buckets"]):
+                cumulative += count
+                lines.append(f'{prefix}_node_wall_seconds_bucket{{node="{node}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_node_wall_seconds_sum{{node="{node}"}} {totals["wall_seconds"]:.6f}')
+            lines.append(f'{prefix}_node_wall_seconds_count{{node="{node}"}} {totals["runs"]}')
+
+        for key, help_text in (
+            ("queue_seconds", "Time spent waiting for the LLM rate limiter"),
+            ("backoff_seconds", "Time spent backing off between retries"),
+        ):
+            family(f"node_{key}_total", "counter", help_text)
+            for node, totals in snapshot.items():
+                lines.append(f'{prefix}_node_{key}_total{{node="{node}"}} {totals[key]:.6f}')
+
+        for key, help_text in (
+            ("runs", "Node executions"),
+            ("reused", "Node executions that reused a previous output"),
+            ("fallbacks", "Node executions that fell back after errors"),
+            ("attempts", "LLM call attempts made by the node's retry executor"),
+            ("retries", "Attempts that were retried"),
+            ("cache_hits", "LLM responses served from the response cache"),
+        ):
+            family(f"node_{key}_total", "counter", help_text)
+            for node, totals in snapshot.items():
+                lines.append(f'{prefix}_node_{key}_total{{node="{node}"}} {totals[key]}')
+
+        family("node_tokens_total", "counter", "Prompt and completion tokens")
+        for node, totals in snapshot.items():
+            for kind in ("prompt", "completion"):
+                lines.append(f'{prefix}_node_tokens_total{{node="{node}",kind="{kind}"}} {totals[f"{kind}_tokens"]}')
+
+        family("node_llm_calls_total", "counter", "Provider calls per model")
+        for node, totals in snapshot.items():
+            for model, count in sorted(totals["models"].items()):
+                lines.append(f'{prefix}_node_llm_calls_total{{node="{node}",model="{model}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+    def report(self) -> str:
+        """Fixed-width table: where the time and tokens went, per node"""
+        rows = [f"{'node':<26} {'runs':>6} {'wall s':>8} {'mean ms':>8} {'p95 ≤ms':>8} {'queue s':>8} "
+                f"{'retries':>8} {'fallback':>8} {'calls':>6} {'cached':>7} {'prompt':>9} {'compl.':>8}"]
+        summary = self.summary()
+        for node, stats in summary["nodes"].items():
+            rows.append(f"{node:<26} {stats['runs']:>6} {stats['wall_seconds']:>8.2f} "
+                        f"{stats['mean_wall_seconds'] * 1e3:>8.1f} {stats['p95_wall_seconds_le'] * 1e3:>8.0f} "
+                        f"{stats['queue_seconds']:>8.2f} {stats['retries']:>8} {stats['fallbacks']:>8} "
+                        f"{stats['llm_calls']:>6} {stats['cache_hits']:>7} {stats['prompt_tokens']:>9} "
+                        f"{stats['completion_tokens']:>8}")
+        total = summary["total"]
+        rows.append(f"{'total':<26} {total['runs']:>6} {total['wall_seconds']:>8.2f} {'':>8} {'':>8} "
+                    f"{total['queue_seconds']:>8.2f} {total['retries']:>8} {total['fallbacks']:>8} "
+                    f"{total['llm_calls']:>6} {total['cache_hits']:>7} {total['prompt_tokens']:>9} "
+                    f"{total['completion_tokens']:>8}")
+        return "\n".join(rows)
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,161 @@
+"""
+Atomic, orjson-backed output writing.
+
+Every file is written to a temporary sibling and renamed over the target,
+so a crash leaves either the previous file or the complete new one, never
+a truncated one. Page files are laid out per product:
+
+    <pages dir>/<product id>/faq.json
+                            /product_page.json
+                            /comparison_page.json
+
+In batch mode `ResultWriter` serialises and writes on one background
+thread, so the event loop running the product pipelines never blocks on
+disk, and appends to the results JSONL stay in completion order.
+"""
+import asyncio
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing_extensions import Any, Dict, List
+
+import orjson
+
+from ..config import config
+
+# Page file name -> final state key
+PAGE_FILES = {
+    "faq.json": "faq_page",
+    "product_page.json": "product_page",
+    "comparison_page.json": "comparison_page",
+}
+
+
+def dumps(data: Any, pretty: bool = False) -> bytes:
+    """orjson serialisation; anything orjson does not know (Decimal, Path, ...) becomes its str"""
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+    return orjson.dumps(data, default=str, option=option)
+
+
+def write_atomic(path, payload: bytes) -> Path:
+    """Write `payload` to `path` through a temporary file in the same directory and a rename"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            if config.OUTPUT_FSYNC:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    return path
+
+
+def write_json_atomic(path, data: Any, pretty: bool = True) -> Path:
+    return write_atomic(path, dumps(data, pretty=pretty) + (b"\n" if pretty else b""))
+
+
+def product_dir(root, product_id: str) -> Path:
+    """Directory of one product's page files; the ID is made safe to use as a single path segment"""
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", str(product_id)).strip(".") or "_"
+    return Path(root) / name
+
+
+def write_pages(root, product_id: str, results: Dict[str, Any]) -> List[Path]:
+    """Write a product's three pages (from a final state or result record) under `root/<product id>/`"""
+    directory = product_dir(root, product_id)
+    return [write_json_atomic(directory / filename, results.get(key) or {}, pretty=config.OUTPUT_PRETTY)
+            for filename, key in PAGE_FILES.items()]
+
+
+class ResultWriter:
+    """
+    Batch-mode writer: appends one JSON line per product to the results
+    file, and with `pages_dir` / `bundle` also writes the product's
+    page files / adds its pages to a bundle — all on a single background
+    thread. The results file is a log rather than a document, so it is
+    appended to in place, not replaced. With a bundle, the pages live only
+    there and the results file keeps slim records. With `append` (a resumed
+    run) the records of the interrupted run are kept; a line the crash
+    left half-written is dropped first.
+    """
+
+    def __init__(self, results_path, pages_dir=None, bundle=None, append: bool = False):
+        self.results_path = Path(results_path)
+        self.pages_dir = Path(pages_dir) if pages_dir else None
+        # A utils.bundle.BundleWriter, closed with this writer
+        self.bundle = bundle
+        self.results_path.parent.mkdir(parents=True, exist_ok=True)
+        if append and self.results_path.exists():
+            self._drop_partial_line()
+        self._results = open(self.results_path, "ab" if append else "wb")
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="result-writer")
+
+    def write(self, record: Dict[str, Any]) -> List[str]:
+        """
+        Append a product's result record (one line, one write call), its page
+        files and its bundle pages. Returns the products whose output is now
+        complete on disk: this one, or with a bundle those of a frame it filled.
+        """
+        if self.pages_dir is not None:
+            write_pages(self.pages_dir, record["product_id"], record)
+        if self.bundle is None:
+            done = [record["product_id"]]
+        else:
+            done = self.bundle.add(record["product_id"], record)
+            record = self.slim(record, self.bundle.path)
+        self._results.write(dumps(record) + b"\n")
+        self._results.flush()
+        return done
+
+    def flush(self) -> List[str]:
+        """Write out the bundle's partial frame; returns the products it completed"""
+        return self.bundle.flush() if self.bundle is not None else []
+
+    @staticmethod
+    def slim(record: Dict[str, Any], bundle_path) -> Dict[str, Any]:
+        """
+        The record without page bodies — neither at the top level nor in
+        its reusable state — pointing at the bundle that holds them instead
+        """
+        pages = set(PAGE_FILES.values())
+        slim = {key: value for key, value in record.items() if key not in pages}
+        if isinstance(record.get("state"), dict):
+            slim["state"] = {key: value for key, value in record["state"].items() if key not in pages}
+        slim["bundle"] = str(bundle_path)
+        return slim
+
+    async def awrite(self, record: Dict[str, Any]) -> List[str]:
+        """Serialise and write on the writer thread; the event loop keeps running the pipelines"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.write, record)
+
+    async def aflush(self) -> List[str]:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.flush)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self._results.close()
+        if self.bundle is not None:
+            self.bundle.close()
+
+    def _drop_partial_line(self) -> None:
+        with open(self.results_path, "r+b") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
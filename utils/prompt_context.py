@@ -0,0 +1,36 @@
+"""
+Compact prompt context.
+
+Agents describe the product to the model with only the fields they need,
+one `field: value` line each — lists comma-joined, the price as its display
+string — instead of the whole model as indented JSON.
+"""
+import json
+from typing_extensions import Any, Dict, Iterable, Optional
+
+
+def format_value(value: Any) -> str:
+    if isinstance(value, dict) and "display" in value:
+        # PriceInfo — the display string already carries amount and currency
+        return str(value["display"])
+    if isinstance(value, (list, tuple)):
+        return ", ".join(format_value(v) for v in value)
+    if isinstance(value, dict):
+        return compact_json(value)
+    return "" if value is None else str(value)
+
+
+def product_context(product: Dict[str, Any], fields: Optional[Iterable[str]] = None) -> str:
+    """`field: value` lines for the requested product fields (all fields when None)"""
+    fields = product.keys() if fields is None else fields
+    return "\n".join(f"{field}: {format_value(product.get(field))}" for field in fields)
+
+
+def compact_json(value: Any) -> str:
+    """JSON without indentation or spaces after separators"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def compact_prompt(text: str) -> str:
+    """Strip source indentation and surrounding blank lines from a prompt template"""
+    return "\n".join(line.strip() for line in text.strip().splitlines())
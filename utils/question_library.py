@@ -0,0 +1,276 @@
+"""
+Category-level library of FAQ question templates.
+
+Products of one category — vitamin C serums, niacinamide serums, retinol
+creams — mostly get the same customer questions. The first
+QUESTION_LIBRARY_SEEDS products of a category have their questions generated
+by the LLM as before; each answer is turned into a template by replacing
+the product's name and brand words, concentration, ingredients and skin
+types with placeholders, and merged into the category's entry — questions
+still mentioning something specific to the seed are dropped. Prices are
+never templated: the question node does not read the price, so questions
+quoting one are dropped too and a price change never stales them. Once a
+category is seeded, a product gets the most common templates rendered with
+its own attributes, and the LLM is only asked for a few extras about
+ingredients the category has not seen.
+The questions a product ended up with are also kept, keyed by the question
+node's input fingerprint, so a product whose inputs have not changed gets
+the same questions on the next run however the category has grown since —
+and every prompt built from them hits the LLM cache.
+Entries live in a local SQLite file and are loaded into memory on open.
+"""
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing_extensions import Any, Dict, List, Optional
+
+from ..config import config
+from .ingredient_memo import IngredientMemo
+
+# Placeholders with a fallback when a product lacks the value; any other
+# placeholder ({skin_types}, {ingredient2}, ...) without a value drops the question
+CORE_PLACEHOLDERS = ("name", "concentration", "active")
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+_PERCENT = re.compile(r"\d+(?:\.\d+)?\s*%")
+# Words in a product name that say nothing about the seed product itself
+_GENERIC_WORDS = {"the", "a", "an", "and", "with", "for", "of", "by", "in", "plus", "new", "daily", "face", "skin"}
+
+
+class QuestionLibrary:
+    """Category -> question templates with usage counts, backed by SQLite"""
+
+    FORMS = ("serum", "cream", "moisturizer", "moisturiser", "cleanser", "toner", "sunscreen", "mask",
+             "oil", "gel", "lotion", "essence", "balm", "exfoliant", "mist")
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS question_templates (
+                category TEXT PRIMARY KEY,
+                entry TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS product_questions (
+                key TEXT PRIMARY KEY,
+                questions TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._entries: Dict[str, Dict[str, Any]] = {
+            category: json.loads(entry)
+            for category, entry in self._conn.execute("SELECT category, entry FROM question_templates")
+        }
+
+    # Product attributes
+
+    @classmethod
+    def attributes(cls, product: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Values substituted for the placeholders: name, concentration, the
+        primary active, form, skin types and the other ingredients
+        as ingredient2, ingredient3, ... in product order. Ingredient names
+        are the product's own; synonyms are only folded to pick the active.
+        """
+        ingredients = list(dict.fromkeys(str(name).strip() for name in product.get("key_ingredients") or []))
+        concentration = str(product.get("concentration") or "")
+        active = next((name for name in ingredients
+                       if name.lower() in concentration.lower()
+                       or IngredientMemo.canonical(name).lower() in concentration.lower()),
+                      ingredients[0] if ingredients else "")
+        name = str(product.get("name") or "")
+        form = next((form for form in cls.FORMS if re.search(rf"\b{form}\b", name.lower())), "product")
+        skin_types = [str(skin_type).lower() for skin_type in product.get("skin_types") or []]
+
+        attributes = {
+            "name": name, "concentration": concentration, "active": active, "form": form,
+            "skin_types": " and ".join(filter(None, [", ".join(skin_types[:-1]), skin_types[-1]])) if skin_types else "",
+        }
+        for position, ingredient in enumerate((name for name in ingredients if name != active), start=2):
+            attributes[f"ingredient{position}"] = ingredient
+        return attributes
+
+    @classmethod
+    def category(cls, product: Dict[str, Any]) -> str:
+        attributes = cls.attributes(product)
+        active = IngredientMemo.canonical(attributes["active"]).lower()
+        return f"{active or 'general'}|{attributes['form']}"
+
+    @classmethod
+    def template(cls, question: str, product: Dict[str, Any]) -> Optional[str]:
+        """
+        Replace everything specific to `product` in a question with
+        placeholders, or None when something product-specific is left that
+        no placeholder covers (a stray percentage, price or brand word).
+        """
+        attributes = cls.attributes(product)
+        values = [(attributes["name"], "name"), (attributes["concentration"], "concentration")]
+        for key, value in attributes.items():
+            if key == "active" or key.startswith("ingredient"):
+                # The product's own name and its canonical synonym ("L-Ascorbic Acid" / "Vitamin C")
+                values += [(value, key), (IngredientMemo.canonical(value), key)]
+        values += [(skin_type, "skin_types") for skin_type in product.get("skin_types") or []]
+        values += [(word, "name") for word in cls._name_words(product)]
+
+        # Longest first, so the name wins over the active it contains
+        for value, key in sorted(values, key=lambda item: -len(item[0])):
+            if value:
+                question = re.sub(rf"(?<!\w){re.escape(value)}(?!\w)", "{" + key + "}", question, flags=re.IGNORECASE)
+        # "GlowBoost Glow" -> "{name} {name}" -> "{name}"; "oily and combination" -> one {skin_types}
+        question = re.sub(r"\{name\}(?:\s+\{name\})+", "{name}", question)
+        question = re.sub(r"\{skin_types\}(?:\s*(?:,|/|&|\band\b|\bor\b)\s*\{skin_types\})+", "{skin_types}", question)
+
+        return None if cls._specific_tokens(question, product) else question
+
+    @classmethod
+    def render(cls, template: str, attributes: Dict[str, str]) -> Optional[str]:
+        """The template filled in for a product, or None when it lacks a value the template needs"""
+        def value(match: re.Match) -> str:
+            key = match.group(1)
+            if attributes.get(key):
+                return attributes[key]
+            if key in CORE_PLACEHOLDERS:
+                return f"this {attributes['form']}"
+            raise KeyError(key)
+
+        try:
+            return _PLACEHOLDER.sub(value, template)
+        except KeyError:
+            return None
+
+    @classmethod
+    def _name_words(cls, product: Dict[str, Any]) -> List[str]:
+        """Words of the product name that identify it — brand and line names, not its active or form"""
+        described = " ".join([str(product.get("concentration") or "")] + [
+            f"{name} {IngredientMemo.canonical(name)}" for name in product.get("key_ingredients") or []
+        ]).lower()
+        described_words = set(re.findall(r"\w+", described))
+        return [word for word in re.findall(r"[\w'-]+", str(product.get("name") or ""))
+                if word.lower() not in described_words and word.lower() not in cls.FORMS
+                and word.lower() not in _GENERIC_WORDS]
+
+    @classmethod
+    def _specific_tokens(cls, template: str, product: Dict[str, Any]) -> List[str]:
+        """Seed-product tokens still present in a template"""
+        text = _PLACEHOLDER.sub(" ", template).lower()
+        tokens = [word.lower() for word in cls._name_words(product)]
+        tokens += [name.lower() for name in product.get("key_ingredients") or []]
+        tokens += [str(skin_type).lower() for skin_type in product.get("skin_types") or []]
+        price = product.get("price")
+        if isinstance(price, dict) and price.get("amount"):
+            amount = float(price["amount"])
+            tokens += [f"{amount:g}", f"{amount:,.0f}", f"{amount:.2f}"]
+        found = [token for token in dict.fromkeys(tokens)
+                 if token and re.search(rf"(?<!\w){re.escape(token)}(?!\w)", text)]
+        return found + _PERCENT.findall(text)
+
+    # Library
+
+    def is_seeded(self, category: str) -> bool:
+        with self._lock:
+            return self._entries.get(category, {}).get("seeds", 0) >= config.QUESTION_LIBRARY_SEEDS
+
+    def questions(self, product: Dict[str, Any]) -> List[Dict[str, str]]:
+        """The category's most common templates, rendered for `product`"""
+        attributes = self.attributes(product)
+        with self._lock:
+            templates = list(self._entries.get(self.category(product), {}).get("templates", []))
+        # Most seeds first; ties keep the order they were first seen in
+        templates.sort(key=lambda item: -item["count"])
+        questions = []
+        for item in templates:
+            question = self.render(item["question"], attributes)
+            if question is not None:
+                questions.append({"category": item["category"], "question": question})
+                if len(questions) == config.QUESTION_LIBRARY_SIZE:
+                    break
+        return questions
+
+    def new_ingredients(self, product: Dict[str, Any]) -> List[str]:
+        """Ingredients of `product` (its own names) that no product of its category has had"""
+        with self._lock:
+            seen = set(self._entries.get(self.category(product), {}).get("ingredients", []))
+        names = {}
+        for name in product.get("key_ingredients") or []:
+            names.setdefault(IngredientMemo.key(name), name)
+        return [name for key, name in names.items() if key not in seen]
+
+    def add(self, product: Dict[str, Any], questions: List[Dict[str, str]], seed: bool) -> None:
+        """
+        Merge a product's questions (a seed run, or its extras) into its
+        category. Questions that stay specific to the product after
+        templating are not kept.
+        """
+        category = self.category(product)
+        templates = [(question["category"], self.template(question["question"], product)) for question in questions]
+        with self._lock:
+            entry = self._entries.setdefault(category, {"seeds": 0, "templates": [], "ingredients": []})
+            by_text = {self._normalize(item["question"]): item for item in entry["templates"]}
+            for question_category, text in templates:
+                if text is None:
+                    continue
+                item = by_text.get(self._normalize(text))
+                if item is None:
+                    item = by_text[self._normalize(text)] = {"category": question_category, "question": text, "count": 0}
+                    entry["templates"].append(item)
+                item["count"] += 1
+            entry["seeds"] += seed
+            entry["ingredients"] = sorted(set(entry["ingredients"]) | {
+                IngredientMemo.key(name) for name in product.get("key_ingredients") or []
+            })
+            self._conn.execute(
+                "INSERT OR REPLACE INTO question_templates (category, entry, updated_at) VALUES (?, ?, ?)",
+                (category, json.dumps(entry, ensure_ascii=False), time.time()),
+            )
+
+    def used(self, key: str) -> Optional[List[Dict[str, str]]]:
+        """Questions a product with these inputs was given before, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT questions FROM product_questions WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def keep(self, key: str, questions: List[Dict[str, str]]) -> None:
+        """Remember the questions a product with these inputs was given"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO product_questions (key, questions, updated_at) VALUES (?, ?, ?)",
+                (key, json.dumps(questions, ensure_ascii=False), time.time()),
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "categories": len(self._entries),
+                "seeded": sum(entry["seeds"] >= config.QUESTION_LIBRARY_SEEDS for entry in self._entries.values()),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _normalize(question: str) -> str:
+        return " ".join(question.lower().split()).rstrip("?.! ")
+
+
+_library: Optional[QuestionLibrary] = None
+_library_lock = threading.Lock()
+
+
+def get_question_library() -> Optional[QuestionLibrary]:
+    """Process-wide library built from config, or None when it is disabled"""
+    global _library
+    if not config.QUESTION_LIBRARY_ENABLED:
+        return None
+    with _library_lock:
+        if _library is None:
+            _library = QuestionLibrary(config.QUESTION_LIBRARY_PATH)
+        return _library
@@ -0,0 +1,128 @@
+"""
+Process-wide token-bucket scheduler for provider calls.
+
+Two buckets — requests per minute and tokens per minute — refill
+continuously. A caller reserves one request and its estimated tokens up
+front; if either bucket goes negative the caller sleeps until the deficit
+would have refilled. Once the provider reports what the call really used,
+the difference is refunded to or charged against the token bucket. Reservations are taken in arrival order under a lock,
+so concurrent callers queue behind each other instead of all firing and
+collecting 429s. A 429 from the provider pauses every caller for the
+Retry-After interval.
+"""
+import asyncio
+import threading
+import time
+from typing_extensions import Optional
+
+from ..config import config
+
+# Pause applied on a 429 that carries no Retry-After header
+DEFAULT_RATE_LIMIT_PAUSE = 5.0
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limiter shared by all agents"""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, burst_seconds: float = 2.0):
+        self.request_rate = requests_per_minute / 60.0
+        self.token_rate = tokens_per_minute / 60.0
+        # Small buckets keep the send rate smooth: at most `burst_seconds` of
+        # budget can be spent at once, so usage never spikes then stalls
+        self.request_capacity = max(1.0, self.request_rate * burst_seconds)
+        self.token_capacity = max(1.0, self.token_rate * burst_seconds)
+
+        self._lock = threading.Lock()
+        self._requests = self.request_capacity
+        self._tokens = self.token_capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def reserve(self, tokens: int) -> float:
+        """Book one request of `tokens` and return how long the caller must wait before sending it"""
+        with self._lock:
+            now = self._refill()
+            self._requests -= 1
+            self._tokens -= tokens
+
+            return max(
+                0.0,
+                -self._requests / self.request_rate if self.request_rate else 0.0,
+                -self._tokens / self.token_rate if self.token_rate else 0.0,
+                self._paused_until - now,
+            )
+
+    def settle(self, reserved: int, used: int) -> None:
+        """Correct a reservation with the tokens the call actually used: refund an overestimate, charge an underestimate"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.token_capacity, self._tokens + reserved - used)
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.request_capacity, self._requests + elapsed * self.request_rate)
+        self._tokens = min(self.token_capacity, self._tokens + elapsed * self.token_rate)
+        return now
+
+    def acquire(self, tokens: int) -> float:
+        """Block until the call fits the budget; returns the time spent queued"""
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    async def aacquire(self, tokens: int) -> float:
+        """Async variant of acquire — queues on the event loop"""
+        delay = self.reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for `seconds` (the provider asked us to slow down)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting: ~4 characters per token"""
+    return len(text) // 4 + 1
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Retry-After hint carried by a provider HTTP error, if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") if hasattr(headers, "get") else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    return getattr(error, "status_code", None) == 429
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Process-wide limiter built from config, or None when no budget is configured"""
+    global _limiter
+    if config.LLM_REQUESTS_PER_MINUTE <= 0 and config.LLM_TOKENS_PER_MINUTE <= 0:
+        return None
+    with _limiter_lock:
+        if _limiter is None:
+            # Budget slightly under the provider's limits so sustained load
+            # settles below them rather than bouncing off 429s
+            headroom = config.LLM_RATE_HEADROOM
+            _limiter = RateLimiter(
+                requests_per_minute=max(0.0, config.LLM_REQUESTS_PER_MINUTE) * headroom,
+                tokens_per_minute=max(0.0, config.LLM_TOKENS_PER_MINUTE) * headroom,
+                burst_seconds=config.LLM_RATE_BURST_SECONDS,
+            )
+        return _limiter
@@ -0,0 +1,141 @@
+"""
+Structured-output repair.
+
+When a structured call comes back but fails validation, regenerating from
+the original prompt pays for the whole prompt and output again. Usually the
+output is nearly right: a string where a one-element list was expected, a
+null `block_type`, the arguments wrapped in an extra object. These helpers
+fix such shapes locally, and otherwise build a short follow-up prompt that
+carries only the raw output and the validation errors.
+"""
+import json
+import re
+from typing import Union, get_args, get_origin
+from typing_extensions import Any, Dict, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+# Longest raw output quoted back to the model in a repair prompt
+MAX_REPAIR_CHARS = 6000
+
+
+def raw_arguments(raw) -> Optional[Dict[str, Any]]:
+    """Tool-call arguments (or JSON content) of a raw model message"""
+    tool_calls = getattr(raw, "tool_calls", None) or []
+    if tool_calls:
+        args = tool_calls[0].get("args")
+        return args if isinstance(args, dict) else None
+    return _json_object(getattr(raw, "content", None))
+
+
+def failed_generation(error: BaseException) -> Optional[Dict[str, Any]]:
+    """Arguments the model produced when the provider rejected its tool call (Groq's tool_use_failed)"""
+    body = getattr(error, "body", None)
+    if isinstance(body, dict):
+        body = body.get("error", body)
+        text = body.get("failed_generation") if isinstance(body, dict) else None
+    else:
+        text = None
+    return _json_object(text)
+
+
+def _json_object(text: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(text, str) or "{" not in text:
+        return None
+    # Tolerate prose or <function=...> wrappers around the JSON object
+    candidate = text[text.index("{"):text.rindex("}") + 1]
+    try:
+        value = json.loads(candidate)
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def apply_local_fixes(schema: Type[BaseModel], data: Dict[str, Any]) -> Dict[str, Any]:
+    """Coerce common near-miss shapes into what `schema` expects, without any LLM call"""
+    data = _unwrap(schema, data)
+    fixed = {}
+    for name, field in schema.model_fields.items():
+        if name not in data:
+            continue
+        value = data[name]
+        if value is None and not field.is_required():
+            # Null for a defaulted field (e.g. block_type) — let the default apply
+            continue
+        fixed[name] = _coerce(field.annotation, value)
+    # Unknown keys are kept so validation errors still point at them
+    return {**{k: v for k, v in data.items() if k not in schema.model_fields}, **fixed}
+
+
+def _unwrap(schema: Type[BaseModel], data: Dict[str, Any]) -> Dict[str, Any]:
+    """Arguments nested under the schema name, "properties" or "arguments" are lifted out"""
+    while len(data) == 1:
+        (key, inner), = data.items()
+        if key in schema.model_fields or not isinstance(inner, dict):
+            break
+        if key not in (schema.__name__, "properties", "arguments", "parameters", "input"):
+            break
+        data = inner
+    return data
+
+
+def _coerce(annotation, value: Any) -> Any:
+    origin = get_origin(annotation)
+    if origin is Union:
+        options = [a for a in get_args(annotation) if a is not type(None)]
+        return _coerce(options[0], value) if len(options) == 1 else value
+
+    if origin is list:
+        (item_type,) = get_args(annotation) or (Any,)
+        if isinstance(value, (str, dict)):
+            value = [value]
+        if isinstance(value, list):
+            return [_coerce(item_type, item) for item in value]
+        return value
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return apply_local_fixes(annotation, value) if isinstance(value, dict) else value
+
+    if annotation is str:
+        if isinstance(value, list) and all(isinstance(v, str) for v in value):
+            return "\n".join(value) if any(len(v) > 60 for v in value) else ", ".join(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        return value
+
+    if annotation in (int, float) and isinstance(value, str):
+        number = re.sub(r"[^\d.\-]", "", value.replace(",", ""))
+        try:
+            return annotation(float(number)) if annotation is int else float(number)
+        except ValueError:
+            return value
+    return value
+
+
+def validate_with_fixes(schema: Type[BaseModel], data: Dict[str, Any]):
+    """Validate `data` after local fixes; returns (instance or None, error or None)"""
+    try:
+        return schema.model_validate(apply_local_fixes(schema, data)), None
+    except ValidationError as e:
+        return None, e
+
+
+def repair_prompt(schema: Type[BaseModel], data: Dict[str, Any], error: BaseException) -> str:
+    """Short follow-up asking the model to correct its own output"""
+    if isinstance(error, ValidationError):
+        problems = "\n".join(
+            f"- {'.'.join(str(p) for p in e['loc']) or '(root)'}: {e['msg']}" for e in error.errors()
+        )
+    else:
+        problems = f"- {str(error)[:500]}"
+    output = json.dumps(data, ensure_ascii=False)[:MAX_REPAIR_CHARS]
+
+    return f"""Your previous {schema.__name__} output failed validation.
+
+Errors:
+{problems}
+
+Previous output:
+{output}
+
+Return the corrected {schema.__name__}. Fix only what the errors require and keep every other value unchanged."""
@@ -0,0 +1,131 @@
+"""
+Shared retry executor for every agent's LLM call.
+
+Failures are sorted into three kinds before deciding what to do:
+
+- retryable  — transient provider trouble (timeouts, dropped connections,
+               429, 5xx). Retried after exponential backoff with full
+               jitter, never sooner than the provider's Retry-After.
+- repairable — the call went through but the output was unusable
+               (schema validation, unparsable tool call). Re-asked
+               straight away; waiting does not make the model more correct.
+- fatal      — retrying cannot help (bad credentials, unknown model,
+               programming errors). Stops immediately.
+
+When attempts run out, or on a fatal error, `RetryError` is raised with
+the per-attempt messages so the agent can fall back deterministically.
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+from typing_extensions import Awaitable, Callable, List, Optional, TypeVar
+
+import httpx
+from groq import APIConnectionError
+from langchain_core.exceptions import OutputParserException
+from pydantic import ValidationError
+
+from ..config import config
+from . import metrics
+from .tracing import tracer
+from .rate_limiter import retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE = "retryable"
+REPAIRABLE = "repairable"
+FATAL = "fatal"
+
+# HTTP statuses worth another try: timeout, conflict, too-early, rate limit
+RETRYABLE_STATUS = {408, 409, 425, 429}
+# Groq answers a tool call the model botched with a 400 carrying this code
+TOOL_USE_FAILED = ("tool_use_failed", "failed_generation")
+
+
+def classify_error(error: BaseException) -> str:
+    """Sort an exception from an LLM call into retryable / repairable / fatal"""
+    if isinstance(error, (ValidationError, OutputParserException, json.JSONDecodeError)):
+        return REPAIRABLE
+
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        if status in RETRYABLE_STATUS or status >= 500:
+            return RETRYABLE
+        if status == 400 and any(code in str(error) for code in TOOL_USE_FAILED):
+            return REPAIRABLE
+        return FATAL
+
+    if isinstance(error, (APIConnectionError, httpx.TransportError, ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return RETRYABLE
+    return FATAL
+
+
+class RetryError(Exception):
+    """Raised when a call could not be completed; carries one message per attempt"""
+
+    def __init__(self, name: str, errors: List[str], last_error: BaseException, kind: str):
+        super().__init__(f"[{name}] {kind} failure after {len(errors)} attempt(s): {last_error}")
+        self.errors = errors
+        self.last_error = last_error
+        self.kind = kind
+
+
+class RetryExecutor:
+    """Runs one agent's LLM call under the shared retry policy"""
+
+    def __init__(self, name: str, max_attempts: int = 3,
+                 base_delay: Optional[float] = None, max_delay: Optional[float] = None):
+        self.name = name
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = config.LLM_RETRY_BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = config.LLM_RETRY_MAX_DELAY if max_delay is None else max_delay
+
+    def run(self, call: Callable[[], T]) -> T:
+        errors: List[str] = []
+        for attempt in range(1, self.max_attempts + 1):
+            metrics.record(attempts=1)
+            try:
+                with tracer.span(f"attempt {attempt}", "retry", agent=self.name):
+                    return call()
+            except Exception as e:
+                delay = self._on_error(attempt, e, errors)
+                with tracer.span("backoff", "retry", agent=self.name, seconds=round(delay, 3)):
+                    time.sleep(delay)
+
+    async def arun(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Async variant of run — backs off on the event loop"""
+        errors: List[str] = []
+        for attempt in range(1, self.max_attempts + 1):
+            metrics.record(attempts=1)
+            try:
+                with tracer.span(f"attempt {attempt}", "retry", agent=self.name):
+                    return await call()
+            except Exception as e:
+                delay = self._on_error(attempt, e, errors)
+                with tracer.span("backoff", "retry", agent=self.name, seconds=round(delay, 3)):
+                    await asyncio.sleep(delay)
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        """Full-jitter exponential backoff, floored at the provider's Retry-After"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = random.uniform(0, ceiling)
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _on_error(self, attempt: int, error: BaseException, errors: List[str]) -> float:
+        """Record a failed attempt; raise RetryError if it was the last, else return the wait"""
+        kind = classify_error(error)
+        errors.append(f"[{self.name}] {kind.capitalize()} error on attempt {attempt}: {error}")
+        logger.error(errors[-1])
+
+        if kind == FATAL or attempt == self.max_attempts:
+            raise RetryError(self.name, errors, error, kind) from error
+        delay = self.backoff(attempt, error) if kind == RETRYABLE else 0.0
+        metrics.record(retries=1, backoff_seconds=delay)
+        return delay
@@ -0,0 +1,148 @@
+"""
+Chrome / Perfetto trace-event export of pipeline execution.
+
+When the process-wide `tracer` is started (`--trace out.json`), spans are
+recorded for every product pipeline, every graph node, every retry attempt
+and backoff, and every LLM call. Open the file in https://ui.perfetto.dev
+or chrome://tracing.
+
+Layout: each product is a process (one per product in batch mode) and each
+graph node is a thread, so the branches fanned out after
+`parse_data_checkpoint` sit on parallel tracks and serialisation shows up
+as gaps. Spans nest on their parent's track; when a node runs work
+concurrently (the FAQ shards), the overlapping children get extra lanes
+("build_faq #2", ...), because trace viewers require spans on one track to
+nest strictly. When the tracer is stopped every span is a no-op.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing_extensions import Any, Dict, List, Optional, Tuple
+
+from .output_writer import dumps, write_atomic
+
+
+class Span:
+    __slots__ = ("name", "pid", "label", "tid", "lane", "has_nested_child")
+
+    def __init__(self, name: str, pid: int, label: str, tid: int, lane: Optional[Tuple[int, str, int]]):
+        self.name = name
+        self.pid = pid
+        self.label = label
+        self.tid = tid
+        # The lane this span claimed, released when it ends; None when it nests on its parent's
+        self.lane = lane
+        # Whether a child span is currently nested on this span's track
+        self.has_nested_child = False
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+_current_process: ContextVar[Optional[int]] = ContextVar("trace_process", default=None)
+
+
+class Tracer:
+    """Collects complete ("X") trace events in memory until written"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.enabled = False
+        self._origin = 0
+        self._events: List[Dict[str, Any]] = []
+        self._processes: Dict[str, int] = {}
+        self._threads: Dict[Tuple[int, str, int], int] = {}
+        self._busy: set = set()
+
+    def start(self) -> None:
+        with self._lock:
+            self._events.clear()
+            self._processes.clear()
+            self._threads.clear()
+            self._busy.clear()
+            self._origin = time.perf_counter_ns()
+            self.enabled = True
+
+    def stop(self) -> None:
+        self.enabled = False
+
+    @contextmanager
+    def process(self, label: str):
+        """Record spans started inside the block (and tasks created in it) under one process track"""
+        if not self.enabled:
+            yield
+            return
+        with self._lock:
+            pid = self._processes.setdefault(label, len(self._processes) + 1)
+        token = _current_process.set(pid)
+        try:
+            yield
+        finally:
+            _current_process.reset(token)
+
+    @contextmanager
+    def span(self, name: str, category: str, track: Optional[str] = None, **args: Any):
+        """
+        Record the block as one span. With `track` it gets a track of that
+        name; otherwise it nests on its parent's, or on a new lane of it
+        when a sibling is still open.
+        """
+        if not self.enabled:
+            yield args
+            return
+        parent = _current_span.get()
+        span = self._open(name, parent, track)
+        token = _current_span.set(span)
+        started = time.perf_counter_ns()
+        try:
+            yield args
+        finally:
+            ended = time.perf_counter_ns()
+            _current_span.reset(token)
+            self._close(span, parent, category, started, ended, args)
+
+    def events(self) -> List[Dict[str, Any]]:
+        """Recorded spans plus the metadata events naming processes and threads"""
+        with self._lock:
+            metadata = [{"ph": "M", "name": "process_name", "pid": pid, "tid": 0, "args": {"name": label}}
+                        for label, pid in self._processes.items()]
+            for (pid, label, lane), tid in self._threads.items():
+                name = label if lane == 0 else f"{label} #{lane + 1}"
+                metadata.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": name}})
+                metadata.append({"ph": "M", "name": "thread_sort_index", "pid": pid, "tid": tid, "args": {"sort_index": tid}})
+            return metadata + list(self._events)
+
+    def write(self, path: str) -> None:
+        write_atomic(path, dumps({"traceEvents": self.events(), "displayTimeUnit": "ms"}))
+
+    def _open(self, name: str, parent: Optional[Span], track: Optional[str]) -> Span:
+        with self._lock:
+            if track is None and parent is not None:
+                if not parent.has_nested_child:
+                    parent.has_nested_child = True
+                    return Span(name, parent.pid, parent.label, parent.tid, None)
+                track = parent.label
+            pid = parent.pid if parent is not None else (_current_process.get() or
+                                                         self._processes.setdefault("pipeline", len(self._processes) + 1))
+            label = track or name
+            lane = 0
+            while (pid, label, lane) in self._busy:
+                lane += 1
+            key = (pid, label, lane)
+            self._busy.add(key)
+            tid = self._threads.setdefault(key, len(self._threads) + 1)
+            return Span(name, pid, label, tid, key)
+
+    def _close(self, span: Span, parent: Optional[Span], category: str, started: int, ended: int,
+               args: Dict[str, Any]) -> None:
+        with self._lock:
+            if span.lane is not None:
+                self._busy.discard(span.lane)
+            elif parent is not None:
+                parent.has_nested_child = False
+            self._events.append({
+                "ph": "X", "name": span.name, "cat": category, "pid": span.pid, "tid": span.tid,
+                "ts": (started - self._origin) / 1e3, "dur": (ended - started) / 1e3, "args": args,
+            })
+
+
+tracer = Tracer()